@@ -0,0 +1,78 @@
+"""FastAPI dependencies providing the service instances.
+
+Service modules import numpy, requests and the GigaChat client and build
+their global instances when first imported. Endpoints receive services
+through these providers instead of module-level imports, so the modules
+are loaded on the first request that needs them (or by the background
+start-up task in ``main``) rather than while the application starts.
+
+The providers are coroutines so FastAPI calls them on the event loop
+instead of dispatching each one to the thread pool; after the first call
+the import is a ``sys.modules`` lookup.
+"""
+
+
+async def get_supabase_client():
+    """Supabase REST client."""
+    from app.services.supabase_client import supabase_client
+    return supabase_client
+
+
+async def get_csv_service():
+    """CSV parsing service."""
+    from app.services.csv_service import csv_service
+    return csv_service
+
+
+async def get_forecast_service():
+    """Forecast generation service."""
+    from app.services.forecast_service import forecast_service
+    return forecast_service
+
+
+async def get_usage_service():
+    """GigaChat token usage service."""
+    from app.services.usage_service import usage_service
+    return usage_service
+
+
+async def get_backtest_service():
+    """Rolling-origin backtesting service."""
+    from app.services.backtest import backtest_service
+    return backtest_service
+
+
+async def get_scenario_service():
+    """What-if temperature scenario service."""
+    from app.services.scenario_service import scenario_service
+    return scenario_service
+
+
+async def get_accuracy_service():
+    """Realized forecast accuracy service."""
+    from app.services.accuracy_service import accuracy_service
+    return accuracy_service
+
+
+async def get_retention_service():
+    """Forecast retention job."""
+    from app.services.retention_service import retention_service
+    return retention_service
+
+
+async def get_data_versions():
+    """Per-SKU data versions used for ETags."""
+    from app.services.data_versions import data_versions
+    return data_versions
+
+
+async def get_warmup_service():
+    """Start-up cache warm-up."""
+    from app.services.warmup_service import warmup_service
+    return warmup_service
+
+
+async def get_health_prober():
+    """Background dependency health prober."""
+    from app.services.health_service import health_prober
+    return health_prober
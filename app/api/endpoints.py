@@ -4,20 +4,28 @@ This module defines all the REST API endpoints for CSV upload,
 forecast generation, data retrieval, and health checks.
 """
 
+import asyncio
+import json
 from datetime import datetime, date
-from typing import List
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
-from fastapi.responses import Response
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
 from app.utils.logger import app_logger
 from app.models.schemas import (
     HealthResponse, CSVUploadResponse, ForecastRequest, ForecastResponse,
     ForecastHistoryResponse, SalesDataResponse, ErrorResponse, SalesDataRow,
-    ForecastHistoryItem
+    ForecastHistoryItem, BatchForecastRequest, ForecastResult, ForecastResponseV2,
+    BacktestRequest, BacktestResponse, ScenarioRequest, ScenarioResponse,
+    AccuracyResponse, SkuAccuracyResponse, ForecastPredictionsResponse, ForecastPredictionRow
+)
+from app.services.gigachat_scheduler import gigachat_scheduler
+from app.middleware.admission import admission_controller
+from app.api.dependencies import (
+    get_accuracy_service, get_backtest_service, get_csv_service, get_data_versions,
+    get_forecast_service, get_health_prober, get_retention_service, get_scenario_service,
+    get_supabase_client, get_usage_service, get_warmup_service
 )
-from app.services.csv_service import csv_service
-from app.services.supabase_client import supabase_client
-from app.services.forecast_service import forecast_service
 
 
 # Create router instance
@@ -25,40 +33,131 @@ router = APIRouter()
 
 
 @router.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check():
+async def health_check(
+    http_request: Request,
+    health_prober=Depends(get_health_prober),
+    warmup_service=Depends(get_warmup_service)
+):
     """Health check endpoint for monitoring and deployment.
 
+    Answers from the background prober's last results without querying
+    any dependency. Only a failed database probe gives 503; readiness
+    (services loaded, background jobs running) and warmth (start-up cache
+    warm-up finished) are reported separately.
+
+    Args:
+        http_request: Incoming request, used to read application state
+        health_prober: Background dependency prober (injected)
+        warmup_service: Start-up warm-up (injected)
+
     Returns:
-        Health status information
+        Health status information with the last probe of each dependency
     """
     app_logger.info("Health check requested")
 
-    try:
-        # Test Supabase REST API connection
-        health_ok = supabase_client.health_check()
-
-        if not health_ok:
-            raise Exception("Supabase REST API not accessible")
+    await health_prober.ensure_fresh()
+    status = health_prober.status
 
-        return HealthResponse(
-            status="healthy",
-            timestamp=datetime.utcnow(),
-            version="1.0.0"
-        )
-    except Exception as e:
-        app_logger.error(f"Health check failed: {e}")
+    if status == "unhealthy":
+        app_logger.error(f"Health check failed: {health_prober.results.get('supabase')}")
         raise HTTPException(
             status_code=503,
             detail="Service unavailable - database connection failed"
         )
 
+    return HealthResponse(
+        status=status,
+        timestamp=datetime.utcnow(),
+        version="1.0.0",
+        ready=getattr(http_request.app.state, "services_ready", False),
+        warm=warmup_service.warm,
+        warmup={"status": warmup_service.status, **warmup_service.report},
+        checks=health_prober.results
+    )
+
+
+@router.get("/health/live", response_model=HealthResponse, tags=["Health"])
+async def liveness():
+    """Liveness probe: the process is up and serving.
+
+    Checks no dependency and loads no service, so a slow database never
+    gets the process restarted.
+
+    Returns:
+        Alive status
+    """
+    return HealthResponse(status="alive", timestamp=datetime.utcnow(), version="1.0.0")
+
+
+@router.get("/health/ready", response_model=HealthResponse, tags=["Health"])
+async def readiness(http_request: Request, health_prober=Depends(get_health_prober)):
+    """Readiness probe: services are loaded and the database is reachable.
+
+    Args:
+        http_request: Incoming request, used to read application state
+        health_prober: Background dependency prober (injected)
+
+    Returns:
+        Ready status with the last probe of each dependency
+
+    Raises:
+        HTTPException: 503 while services load or the database is down
+    """
+    await health_prober.ensure_fresh()
+
+    if not getattr(http_request.app.state, "services_ready", False):
+        raise HTTPException(status_code=503, detail="Service not ready - services are loading")
+    if health_prober.status == "unhealthy":
+        raise HTTPException(status_code=503, detail="Service not ready - database connection failed")
+
+    return HealthResponse(
+        status="ready",
+        timestamp=datetime.utcnow(),
+        version="1.0.0",
+        ready=True,
+        checks=health_prober.results
+    )
+
+
+@router.get("/metrics", tags=["Health"])
+async def get_metrics(
+    usage_service=Depends(get_usage_service),
+    forecast_service=Depends(get_forecast_service),
+    retention_service=Depends(get_retention_service)
+):
+    """Runtime metrics for monitoring.
+
+    Args:
+        usage_service: Token usage service (injected)
+        forecast_service: Forecast service (injected)
+        retention_service: Retention job (injected)
+
+    Returns:
+        GigaChat scheduler queue/wait metrics, token usage totals,
+        forecast write-behind backlog, the last retention report and
+        admission control load per route group
+    """
+    return {
+        "gigachat_scheduler": gigachat_scheduler.get_metrics(),
+        "gigachat_usage": usage_service.get_stats(),
+        "forecast_writes": forecast_service.writer.get_metrics(),
+        "forecast_retention": retention_service.last_report,
+        "admission": admission_controller.get_metrics()
+    }
+
 
 @router.post("/upload-csv", response_model=CSVUploadResponse, tags=["Data"])
-async def upload_csv(file: UploadFile = File(...)):
+async def upload_csv(
+    file: UploadFile = File(...),
+    csv_service=Depends(get_csv_service),
+    supabase_client=Depends(get_supabase_client)
+):
     """Upload and process CSV file with sales data.
 
     Args:
         file: CSV file containing sales data
+        csv_service: CSV service (injected)
+        supabase_client: Supabase client (injected)
 
     Returns:
         Upload processing results
@@ -133,12 +232,150 @@ async def upload_csv(file: UploadFile = File(...)):
         )
 
 
+def _serialize_prediction(pred: ForecastResult) -> dict:
+    """Build the frontend-compatible payload for a single prediction."""
+    prediction = {
+        "date": pred.date.isoformat() if hasattr(pred.date, 'isoformat') else str(pred.date),
+        "predicted_sales": pred.predicted_sales,
+        "confidence": pred.confidence
+    }
+    if getattr(pred, "predicted_temp", None) is not None:
+        prediction["predicted_temp"] = pred.predicted_temp
+    for key in ("p10", "p50", "p90"):
+        if getattr(pred, key, None) is not None:
+            prediction[key] = getattr(pred, key)
+    return prediction
+
+
+# Columns returned for stored rows, in response-model order
+SALES_ROW_FIELDS = tuple(SalesDataRow.model_fields)
+FORECAST_HISTORY_FIELDS = tuple(ForecastHistoryItem.model_fields)
+PREDICTION_ROW_FIELDS = tuple(ForecastPredictionRow.model_fields)
+
+
+def _project_row(row: dict, fields: tuple) -> dict:
+    """Select response fields of a trusted database row.
+
+    PostgREST already returns JSON-native values (ISO dates, numbers), so
+    rows are passed to orjson as-is instead of being rebuilt as models.
+    """
+    return {field: row.get(field) for field in fields}
+
+
+# Media type clients send in Accept to get the compact forecast format
+FORECAST_V2_MEDIA_TYPE = "application/vnd.khabarovsk.forecast.v2+json"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches an ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+
+    Args:
+        if_none_match: Header value, possibly a comma-separated list or ``*``
+        etag: Current quoted ETag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _not_modified(http_request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client already has the representation ``etag``."""
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def _wants_v2(response_format: Optional[str], http_request: Request) -> bool:
+    """Whether the client asked for the compact v2 forecast format."""
+    if response_format is not None:
+        return response_format == "v2"
+    return FORECAST_V2_MEDIA_TYPE in http_request.headers.get("accept", "")
+
+
+def _forecast_v2_response(forecast_responses: List[ForecastResponse], batch: bool = False) -> Response:
+    """Serialize forecasts in the v2 format straight to JSON bytes.
+
+    Args:
+        forecast_responses: Generated forecasts
+        batch: Wrap the forecasts in a ``forecasts`` array
+
+    Returns:
+        Response with the v2 media type
+    """
+    bodies = [
+        # Fields are already validated; skip re-validation
+        ForecastResponseV2.model_construct(**forecast_response.__dict__).model_dump_json(exclude_none=True)
+        for forecast_response in forecast_responses
+    ]
+    content = f'{{"format_version":2,"forecasts":[{",".join(bodies)}]}}' if batch else bodies[0]
+    return Response(content=content, media_type=FORECAST_V2_MEDIA_TYPE)
+
+
+def _serialize_forecast(forecast_response: ForecastResponse) -> dict:
+    """Build the frontend-compatible forecast payload.
+
+    Args:
+        forecast_response: Generated forecast
+
+    Returns:
+        Dictionary in the shape expected by the frontend
+    """
+    predictions_list = [_serialize_prediction(pred) for pred in forecast_response.predictions]
+
+    # Create response that matches frontend expectations
+    return {
+        "success": True,
+        "data": {
+            "sku_id": forecast_response.sku_id,
+            "forecast_period": forecast_response.forecast_period,
+            "generated_at": forecast_response.generated_at.isoformat(),
+            "predictions": predictions_list,  # For Index.tsx
+            "forecast": predictions_list,  # For useApi.ts
+            "total_predicted_sales": forecast_response.total_predicted_sales,
+            "average_confidence": forecast_response.average_confidence,
+            "model_explanation": forecast_response.model_explanation
+        },
+        # Also provide forecast at root level for backward compatibility
+        "sku_id": forecast_response.sku_id,
+        "forecast_period": forecast_response.forecast_period,
+        "generated_at": forecast_response.generated_at.isoformat(),
+        "predictions": predictions_list,  # For Index.tsx
+        "forecast": predictions_list,  # For useApi.ts
+        "total_predicted_sales": forecast_response.total_predicted_sales,
+        "average_confidence": forecast_response.average_confidence,
+        "model_explanation": forecast_response.model_explanation,
+        "generated_by_gigachat": forecast_response.generated_by_gigachat
+    }
+
+
 @router.post("/forecast", tags=["Forecasting"])
-async def generate_forecast(request: ForecastRequest):
+async def generate_forecast(
+    request: ForecastRequest,
+    http_request: Request,
+    response_format: Optional[str] = Query(
+        None, alias="format", pattern="^v[12]$",
+        description="v2 for the compact format; also selected by the v2 Accept media type"
+    ),
+    forecast_service=Depends(get_forecast_service)
+):
     """Generate sales forecast for a specific SKU.
 
+    The legacy (v1) payload repeats the predictions at the root and under
+    ``data``, each as ``predictions`` and ``forecast``. The v2 payload is
+    a ``ForecastResponseV2`` with a single predictions array.
+
     Args:
         request: Forecast generation parameters
+        http_request: Incoming HTTP request (used for content negotiation)
+        response_format: Requested response format
+        forecast_service: Forecast service (injected)
 
     Returns:
         Generated forecast with predictions
@@ -152,42 +389,11 @@ async def generate_forecast(request: ForecastRequest):
         # Generate forecast using forecast service
         forecast_response = await forecast_service.generate_forecast(request)
 
-        # Create frontend-compatible response structure
-        predictions_list = []
-        for pred in forecast_response.predictions:
-            prediction = {
-                "date": pred.date.isoformat() if hasattr(pred.date, 'isoformat') else str(pred.date),
-                "predicted_sales": pred.predicted_sales,
-                "confidence": pred.confidence
-            }
-            if getattr(pred, "predicted_temp", None) is not None:
-                prediction["predicted_temp"] = pred.predicted_temp
-            predictions_list.append(prediction)
-
-        # Create response that matches frontend expectations
-        simplified_response = {
-            "success": True,
-            "data": {
-                "sku_id": forecast_response.sku_id,
-                "forecast_period": forecast_response.forecast_period,
-                "generated_at": forecast_response.generated_at.isoformat(),
-                "predictions": predictions_list,  # For Index.tsx
-                "forecast": predictions_list,  # For useApi.ts
-                "total_predicted_sales": forecast_response.total_predicted_sales,
-                "average_confidence": forecast_response.average_confidence,
-                "model_explanation": forecast_response.model_explanation
-            },
-            # Also provide forecast at root level for backward compatibility
-            "sku_id": forecast_response.sku_id,
-            "forecast_period": forecast_response.forecast_period,
-            "generated_at": forecast_response.generated_at.isoformat(),
-            "predictions": predictions_list,  # For Index.tsx
-            "forecast": predictions_list,  # For useApi.ts
-            "total_predicted_sales": forecast_response.total_predicted_sales,
-            "average_confidence": forecast_response.average_confidence,
-            "model_explanation": forecast_response.model_explanation,
-            "generated_by_gigachat": forecast_response.generated_by_gigachat
-        }
+        if _wants_v2(response_format, http_request):
+            return _forecast_v2_response([forecast_response])
+
+        simplified_response = _serialize_forecast(forecast_response)
+        predictions_list = simplified_response["predictions"]
 
         app_logger.info(f"Forecast generated successfully for SKU: {request.sku_id}, predictions count: {len(predictions_list)}")
 
@@ -201,50 +407,211 @@ async def generate_forecast(request: ForecastRequest):
         )
 
 
+@router.post("/forecast/stream", tags=["Forecasting"])
+async def stream_forecast(
+    request: ForecastRequest,
+    http_request: Request,
+    forecast_service=Depends(get_forecast_service)
+):
+    """Generate sales forecast and stream predictions as they are produced.
+
+    Each day is sent as soon as GigaChat closes its JSON element, followed by
+    a final ``complete`` event with totals and the model explanation. The
+    stream is NDJSON by default, or Server-Sent Events when the client sends
+    ``Accept: text/event-stream``.
+
+    Args:
+        request: Forecast generation parameters
+        http_request: Incoming HTTP request (used for content negotiation)
+        forecast_service: Forecast service (injected)
+
+    Returns:
+        Streaming response with prediction and completion events
+    """
+    app_logger.info(f"Streaming forecast request for SKU: {request.sku_id}, period: {request.period}")
+
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    def event_stream():
+        for kind, payload in forecast_service.stream_forecast(request):
+            if kind == "prediction":
+                data = _serialize_prediction(payload)
+            else:
+                data = _serialize_forecast(payload)["data"]
+                data.pop("predictions")
+                data.pop("forecast")
+                data["generated_by_gigachat"] = payload.generated_by_gigachat
+
+            if use_sse:
+                yield f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            else:
+                yield json.dumps({"event": kind, "data": data}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.post("/forecast/batch", tags=["Forecasting"])
+async def generate_forecasts_batch(
+    request: BatchForecastRequest,
+    http_request: Request,
+    response_format: Optional[str] = Query(
+        None, alias="format", pattern="^v[12]$",
+        description="v2 for the compact format; also selected by the v2 Accept media type"
+    ),
+    forecast_service=Depends(get_forecast_service)
+):
+    """Generate sales forecasts for several SKUs in one request.
+
+    SKUs are packed into shared GigaChat prompts; any SKU whose part of the
+    answer is invalid falls back individually.
+
+    Args:
+        request: Batch forecast generation parameters
+        http_request: Incoming HTTP request (used for content negotiation)
+        response_format: Requested response format
+        forecast_service: Forecast service (injected)
+
+    Returns:
+        List of generated forecasts, one per SKU
+
+    Raises:
+        HTTPException: If forecast generation fails
+    """
+    app_logger.info(f"Batch forecast request for {len(request.sku_ids)} SKUs, period: {request.period}")
+
+    try:
+        forecast_responses = await forecast_service.generate_forecasts_batch(request)
+
+        if _wants_v2(response_format, http_request):
+            return _forecast_v2_response(forecast_responses, batch=True)
+
+        forecasts = [_serialize_forecast(forecast_response) for forecast_response in forecast_responses]
+
+        app_logger.info(f"Batch forecast generated successfully for {len(forecasts)} SKUs")
+
+        return {
+            "success": True,
+            "data": forecasts,
+            "count": len(forecasts)
+        }
+
+    except Exception as e:
+        app_logger.error(f"Error generating batch forecast: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate forecasts. Please try again later."
+        )
+
+
+@router.post("/backtest", response_model=BacktestResponse, tags=["Forecasting"])
+async def run_backtest(request: BacktestRequest, backtest_service=Depends(get_backtest_service)):
+    """Evaluate forecast models on stored history with rolling cutoffs.
+
+    Args:
+        request: Backtest parameters (SKUs, models, horizon, cutoffs)
+        backtest_service: Backtesting service (injected)
+
+    Returns:
+        MAPE, WAPE and bias per model, overall and per SKU
+
+    Raises:
+        HTTPException: If a model is unknown or the backtest fails
+    """
+    app_logger.info(f"Backtest requested for models: {request.models}")
+
+    try:
+        # CPU-bound; keep the event loop free while it runs
+        return await asyncio.to_thread(backtest_service.run, request)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        app_logger.error(f"Error running backtest: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to run backtest"
+        )
+
+
+@router.post("/scenarios", response_model=ScenarioResponse, tags=["Forecasting"])
+async def run_scenarios(request: ScenarioRequest, scenario_service=Depends(get_scenario_service)):
+    """Evaluate demand under what-if temperature scenarios.
+
+    Args:
+        request: SKUs, horizon, temperature offsets and custom curves
+        scenario_service: Scenario service (injected)
+
+    Returns:
+        Demand surface (scenario x day) for each SKU
+
+    Raises:
+        HTTPException: If the scenarios are invalid or evaluation fails
+    """
+    app_logger.info(f"Scenario sweep requested for {len(request.sku_ids)} SKUs")
+
+    try:
+        return await asyncio.to_thread(scenario_service.run, request)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        app_logger.error(f"Error running scenarios: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to run scenarios"
+        )
+
+
 @router.get("/data/{sku_id}", response_model=SalesDataResponse, tags=["Data"])
 async def get_sales_data(
     sku_id: str,
-    limit: int = Query(52, ge=1, le=200, description="Number of records to return")
+    http_request: Request,
+    limit: int = Query(52, ge=1, le=200, description="Number of records to return"),
+    supabase_client=Depends(get_supabase_client),
+    data_versions=Depends(get_data_versions)
 ):
     """Retrieve sales data for a specific SKU.
 
     Args:
         sku_id: SKU identifier
+        http_request: Incoming request, checked for If-None-Match
         limit: Maximum number of records to return (1-200)
+        supabase_client: Supabase client (injected)
+        data_versions: Data versions for the ETag (injected)
 
     Returns:
-        Historical sales data
+        Historical sales data, or 304 if the client's ETag is current
 
     Raises:
         HTTPException: If data retrieval fails
     """
     app_logger.info(f"Sales data request for SKU: {sku_id}, limit: {limit}")
 
+    # Taken before the query, so a concurrent ingest yields a stale tag, not a stale body
+    etag = await asyncio.to_thread(data_versions.etag, "sales", sku_id, limit)
+    not_modified = _not_modified(http_request, etag)
+    if not_modified:
+        return not_modified
+
     try:
         # Get sales data from database via REST API
         db_results = supabase_client.get_sales_data(sku_id, limit)
 
-        # Convert to our schema format
-        sales_data = []
-        for row in db_results:
-            sales_row = SalesDataRow(
-                id=row.get("id"),
-                sku_id=row["sku_id"],
-                date=datetime.fromisoformat(row["date"]).date() if isinstance(row["date"], str) else row["date"],
-                sales_quantity=row["sales_quantity"],
-                avg_temp=row.get("avg_temp"),
-                created_at=datetime.fromisoformat(row["created_at"]) if row.get("created_at") and isinstance(row["created_at"], str) else row.get("created_at")
-            )
-            sales_data.append(sales_row)
+        # Rows come from our own table; project them without re-validation
+        sales_data = [_project_row(row, SALES_ROW_FIELDS) for row in db_results]
 
         if len(sales_data) == 0:
             app_logger.warning(f"No sales data found for SKU: {sku_id}")
 
-        return SalesDataResponse(
-            sku_id=sku_id,
-            data=sales_data,
-            total_records=len(sales_data)
-        )
+        return ORJSONResponse({
+            "sku_id": sku_id,
+            "data": sales_data,
+            "total_records": len(sales_data)
+        }, headers={"ETag": etag})
 
     except Exception as e:
         app_logger.error(f"Error retrieving sales data: {e}")
@@ -257,48 +624,50 @@ async def get_sales_data(
 @router.get("/forecast-history/{sku_id}", response_model=ForecastHistoryResponse, tags=["Forecasting"])
 async def get_forecast_history(
     sku_id: str,
-    limit: int = Query(10, ge=1, le=50, description="Number of forecasts to return")
+    http_request: Request,
+    limit: int = Query(10, ge=1, le=50, description="Number of forecasts to return"),
+    supabase_client=Depends(get_supabase_client),
+    data_versions=Depends(get_data_versions)
 ):
     """Retrieve forecast history for a specific SKU.
 
     Args:
         sku_id: SKU identifier
+        http_request: Incoming request, checked for If-None-Match
         limit: Maximum number of forecasts to return (1-50)
+        supabase_client: Supabase client (injected)
+        data_versions: Data versions for the ETag (injected)
 
     Returns:
-        Historical forecast data
+        Historical forecast data, or 304 if the client's ETag is current
 
     Raises:
         HTTPException: If data retrieval fails
     """
     app_logger.info(f"Forecast history request for SKU: {sku_id}, limit: {limit}")
 
+    etag = await asyncio.to_thread(data_versions.etag, "forecasts", sku_id, limit)
+    not_modified = _not_modified(http_request, etag)
+    if not_modified:
+        return not_modified
+
     try:
         # Get forecast history from database via REST API
         db_results = supabase_client.get_forecast_history(sku_id, limit)
 
-        # Convert to our schema format
-        forecasts = []
-        for row in db_results:
-            forecast_item = ForecastHistoryItem(
-                id=row["id"],
-                sku_id=row["sku_id"],
-                forecast_date=datetime.fromisoformat(row["forecast_date"]).date() if isinstance(row["forecast_date"], str) else row["forecast_date"],
-                predicted_sales=row["predicted_sales"],
-                confidence_score=row.get("confidence_score"),
-                key_factors=row.get("key_factors", []),
-                created_at=datetime.fromisoformat(row["created_at"]) if isinstance(row["created_at"], str) else row["created_at"]
-            )
-            forecasts.append(forecast_item)
+        forecasts = [_project_row(row, FORECAST_HISTORY_FIELDS) for row in db_results]
+        for forecast in forecasts:
+            if forecast["key_factors"] is None:
+                forecast["key_factors"] = []
 
         if len(forecasts) == 0:
             app_logger.warning(f"No forecast history found for SKU: {sku_id}")
 
-        return ForecastHistoryResponse(
-            sku_id=sku_id,
-            forecasts=forecasts,
-            total_count=len(forecasts)
-        )
+        return ORJSONResponse({
+            "sku_id": sku_id,
+            "forecasts": forecasts,
+            "total_count": len(forecasts)
+        }, headers={"ETag": etag})
 
     except Exception as e:
         app_logger.error(f"Error retrieving forecast history: {e}")
@@ -308,18 +677,107 @@ async def get_forecast_history(
         )
 
 
+@router.get("/forecast-predictions/{sku_id}", response_model=ForecastPredictionsResponse, tags=["Forecasting"])
+async def get_forecast_predictions(
+    sku_id: str,
+    start_date: Optional[date] = Query(None, description="First prediction date (inclusive)"),
+    end_date: Optional[date] = Query(None, description="Last prediction date (inclusive)"),
+    forecast_id: Optional[str] = Query(None, description="Only predictions of this forecast (integer or UUID)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of rows"),
+    supabase_client=Depends(get_supabase_client)
+):
+    """Retrieve stored daily predictions of a SKU for a date range.
+
+    Args:
+        sku_id: SKU identifier
+        start_date: First date to include
+        end_date: Last date to include
+        forecast_id: Restrict to one forecast
+        limit: Maximum number of rows
+        supabase_client: Supabase client (injected)
+
+    Returns:
+        Prediction rows ordered by date
+
+    Raises:
+        HTTPException: If the range is invalid or retrieval fails
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    try:
+        rows = supabase_client.get_forecast_predictions(
+            sku_id=sku_id, start_date=start_date, end_date=end_date,
+            forecast_id=forecast_id, limit=limit
+        )
+        predictions = [_project_row(row, PREDICTION_ROW_FIELDS) for row in rows]
+        return ORJSONResponse({"sku_id": sku_id, "predictions": predictions, "total_count": len(predictions)})
+
+    except Exception as e:
+        app_logger.error(f"Error retrieving forecast predictions: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve forecast predictions"
+        )
+
+
+@router.get("/accuracy", response_model=AccuracyResponse, tags=["Forecasting"])
+async def get_accuracy(accuracy_service=Depends(get_accuracy_service)):
+    """Realized forecast accuracy per model and per SKU.
+
+    Args:
+        accuracy_service: Accuracy service (injected)
+
+    Returns:
+        MAPE, WAPE, bias and MAE of stored forecasts against actual sales
+    """
+    return await asyncio.to_thread(accuracy_service.get_summary)
+
+
+@router.get("/accuracy/{sku_id}", response_model=SkuAccuracyResponse, tags=["Forecasting"])
+async def get_sku_accuracy(sku_id: str, accuracy_service=Depends(get_accuracy_service)):
+    """Realized forecast accuracy of one SKU per model.
+
+    Args:
+        sku_id: SKU identifier
+        accuracy_service: Accuracy service (injected)
+
+    Returns:
+        Error metrics per model and the number of predictions awaiting actuals
+
+    Raises:
+        HTTPException: If no forecasts are tracked for the SKU
+    """
+    accuracy = await asyncio.to_thread(accuracy_service.get_sku_accuracy, sku_id)
+    if accuracy is None:
+        raise HTTPException(status_code=404, detail=f"No tracked forecasts for SKU: {sku_id}")
+    return accuracy
+
+
 @router.get("/sku-list", tags=["Data"])
-async def get_sku_list():
+async def get_sku_list(
+    http_request: Request,
+    supabase_client=Depends(get_supabase_client),
+    data_versions=Depends(get_data_versions)
+):
     """Get list of all available SKU IDs.
 
+    Args:
+        http_request: Incoming request, checked for If-None-Match
+        supabase_client: Supabase client (injected)
+        data_versions: Data versions holding the cached list (injected)
+
     Returns:
-        List of SKU identifiers
+        List of SKU identifiers, or 304 if the client's ETag is current
     """
     app_logger.info("SKU list requested")
 
     try:
-        sku_ids = supabase_client.get_all_sku_ids()
-        return {"sku_ids": sku_ids, "count": len(sku_ids)}
+        sku_ids, etag = await asyncio.to_thread(data_versions.sku_list, supabase_client.get_all_sku_ids)
+        not_modified = _not_modified(http_request, etag)
+        if not_modified:
+            return not_modified
+        return ORJSONResponse({"sku_ids": sku_ids, "count": len(sku_ids)}, headers={"ETag": etag})
 
     except Exception as e:
         app_logger.error(f"Error retrieving SKU list: {e}")
@@ -330,9 +788,12 @@ async def get_sku_list():
 
 
 @router.get("/sample-csv", tags=["Data"])
-async def download_sample_csv():
+async def download_sample_csv(csv_service=Depends(get_csv_service)):
     """Download sample CSV file for reference.
 
+    Args:
+        csv_service: CSV service (injected)
+
     Returns:
         CSV file with sample data format
     """
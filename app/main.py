@@ -4,15 +4,20 @@ This module initializes the FastAPI application with all necessary
 configurations, middleware, and route handlers.
 """
 
+import asyncio
 import os
+import sys
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
 
 from app.utils.logger import app_logger
 from app.api.endpoints import router
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.compression import CacheControlMiddleware, CompressionMiddleware
 from app.models.schemas import ErrorResponse
 
 
@@ -20,19 +25,18 @@ from app.models.schemas import ErrorResponse
 load_dotenv(override=True)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan context manager.
+def _load_services() -> None:
+    """Import the service modules and probe the database.
 
-    Handles startup and shutdown events for the application.
+    Importing builds the global service instances (and pulls in numpy,
+    requests and the GigaChat client); doing it here, off the event loop,
+    keeps that work off both the start-up path and the first request.
     """
-    # Startup
-    app_logger.info("Starting Habarovsk Forecast Buddy API")
-
-    # Test database connection on startup
     try:
-        from app.services.supabase_client import supabase_client
-        if supabase_client.health_check():
+        # First probe of Supabase and GigaChat; the prober repeats it periodically
+        from app.services.health_service import health_prober
+        health_prober.probe_once()
+        if health_prober.is_up("supabase"):
             app_logger.info("Database connection established")
         else:
             app_logger.warning("Database health check failed")
@@ -40,18 +44,117 @@ async def lifespan(app: FastAPI):
         app_logger.error(f"Database connection failed: {e}")
         # Don't stop the app, but log the error
 
-    # Test GigaChat service initialization
     try:
         from app.services.gigachat_service import gigachat_service
         app_logger.info(f"GigaChat service initialized (mock_mode: {gigachat_service.mock_mode})")
     except Exception as e:
         app_logger.error(f"GigaChat service initialization failed: {e}")
 
+    # Remaining services used by the endpoints and background jobs
+    import app.services.forecast_service  # noqa: F401
+    import app.services.retention_service  # noqa: F401
+    import app.services.csv_service  # noqa: F401
+    import app.services.backtest  # noqa: F401
+    import app.services.scenario_service  # noqa: F401
+
+
+async def _start_services(app: FastAPI) -> None:
+    """Load services in a thread, start the background jobs, then warm caches.
+
+    Args:
+        app: Application whose ``state.services_ready`` is set once serving
+            no longer needs to load anything
+    """
+    started = time.perf_counter()
+    await asyncio.to_thread(_load_services)
+
+    # Persist forecasts in the background instead of inside requests
+    from app.services.forecast_service import forecast_service
+    forecast_service.writer.start()
+
+    # Periodic forecast retention; first pass runs right away in a thread
+    from app.services.retention_service import retention_service
+    retention_service.start()
+
+    # Dependency probes answered from cache by /health
+    from app.services.health_service import health_prober
+    health_prober.start()
+
+    app.state.services_ready = True
+    app_logger.info(f"Background services started in {time.perf_counter() - started:.3f}s")
+
+    # Temperature normals from stored history, the same in every worker
+    from app.services.climatology import climatology
+    try:
+        await asyncio.to_thread(climatology.load_stored_history)
+    except Exception as e:
+        app_logger.error(f"Loading stored temperatures failed: {e}")
+
+    # Predictions awaiting actuals, so accuracy survives restarts
+    from app.services.accuracy_service import accuracy_service
+    try:
+        await asyncio.to_thread(accuracy_service.load_stored_predictions)
+    except Exception as e:
+        app_logger.error(f"Loading stored predictions failed: {e}")
+
+    # Preload hot SKUs; readiness does not wait for it
+    from app.services.warmup_service import warmup_service
+    await asyncio.to_thread(warmup_service.run)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan context manager.
+
+    Handles startup and shutdown events for the application. Start-up
+    only schedules service loading and cache warm-up, so the server
+    accepts requests at once; endpoints load any service they need on
+    first use.
+    """
+    # Startup
+    app_logger.info("Starting Habarovsk Forecast Buddy API")
+    app.state.services_ready = False
+    services_task = asyncio.create_task(_start_services(app))
+
     yield
 
     # Shutdown
     app_logger.info("Shutting down Habarovsk Forecast Buddy API")
 
+    if not services_task.done():
+        if "app.services.warmup_service" in sys.modules:
+            from app.services.warmup_service import warmup_service
+            warmup_service.cancel()
+        services_task.cancel()
+    try:
+        await services_task
+    except (asyncio.CancelledError, Exception) as e:
+        app_logger.warning(f"Background services did not finish starting: {e!r}")
+
+    if "app.services.health_service" in sys.modules:
+        from app.services.health_service import health_prober
+        await health_prober.stop()
+
+    if "app.services.retention_service" in sys.modules:
+        from app.services.retention_service import retention_service
+        await retention_service.stop()
+
+    # Write forecasts still waiting in the write-behind queue
+    if "app.services.forecast_service" in sys.modules:
+        try:
+            from app.services.forecast_service import forecast_service
+            forecast_service.writer.stop(timeout=float(os.getenv("WRITE_BEHIND_DRAIN_TIMEOUT", 10)))
+        except Exception as e:
+            app_logger.error(f"Failed to drain forecast writes: {e}")
+
+    # Persist any buffered GigaChat token usage
+    if "app.services.usage_service" in sys.modules:
+        try:
+            from app.services.usage_service import usage_service
+            usage_service.flush()
+        except Exception as e:
+            app_logger.error(f"Failed to flush usage stats: {e}")
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -60,9 +163,15 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    # orjson renders responses several times faster than stdlib json
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Shed excess forecast/upload load before bodies are read; registered
+# before CORS so rejections still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -72,6 +181,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies and tell clients how long they may reuse them
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(CacheControlMiddleware)
+
 
 # Custom exception handler for validation errors
 @app.exception_handler(422)
@@ -143,10 +256,6 @@ async def root():
     }
 
 
-# Add import for time module
-import time
-
-
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,294 @@
+"""Admission control for expensive endpoints.
+
+Forecast and upload requests are admitted by two checks before the
+request body is read:
+
+* a per-client token bucket (``TokenBucket`` from the GigaChat
+  scheduler) answers clients that exceed their rate with 429;
+* a per-route concurrency limit with a bounded wait queue answers
+  requests that cannot get a slot in time with 503.
+
+Both set ``Retry-After``. Other routes, such as ``/health`` and
+``/data``, are never queued behind expensive work.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+import orjson
+
+from app.utils.logger import app_logger
+from app.services.gigachat_scheduler import TokenBucket
+
+
+class ConcurrencyLimit:
+    """Concurrency cap with a bounded FIFO wait queue for one route group."""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        """Initialize concurrency limit.
+
+        Args:
+            name: Route group name used in logs and metrics
+            max_concurrency: Requests served at the same time
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before it is rejected
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of request duration, used for Retry-After
+        self._avg_duration = 1.0
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @property
+    def waiting(self) -> int:
+        """Requests currently waiting for a slot."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> bool:
+        """Wait for a slot.
+
+        Returns:
+            True if a slot was taken, False if the queue is full or the
+            wait timed out
+        """
+        if self.active < self.max_concurrency and not self.waiting:
+            self.active += 1
+            self.admitted += 1
+            return True
+
+        if self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release(0.0)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+        self.admitted += 1
+        return True
+
+    def release(self, duration: float) -> None:
+        """Free a slot, handing it to the oldest waiter if there is one.
+
+        Args:
+            duration: Seconds the finished request held the slot
+        """
+        self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def retry_after(self) -> int:
+        """Seconds after which a rejected request is likely to be served."""
+        backlog = self.waiting + 1
+        return max(1, math.ceil(self._avg_duration * backlog / self.max_concurrency))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Current load and rejection counters."""
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_duration_seconds": round(self._avg_duration, 3)
+        }
+
+
+class RouteGroup:
+    """Routes sharing a concurrency limit and per-client rate limits."""
+
+    def __init__(self, name: str, paths: FrozenSet[str], env_prefix: str, defaults: Dict[str, float],
+                 queue_timeout: float):
+        """Initialize route group from ``<env_prefix>_*`` variables.
+
+        Args:
+            name: Group name
+            paths: Exact request paths (POST) covered by the group
+            env_prefix: Prefix of the group's environment variables
+            defaults: Defaults for max_concurrency, max_queue, client_rps and client_burst
+            queue_timeout: Seconds a request may wait for a slot
+        """
+        self.name = name
+        self.paths = paths
+        self.limit = ConcurrencyLimit(
+            name,
+            int(os.getenv(f"{env_prefix}_MAX_CONCURRENCY", defaults["max_concurrency"])),
+            int(os.getenv(f"{env_prefix}_MAX_QUEUE", defaults["max_queue"])),
+            queue_timeout
+        )
+        self.client_rps = float(os.getenv(f"{env_prefix}_CLIENT_RPS", defaults["client_rps"]))
+        self.client_burst = float(os.getenv(f"{env_prefix}_CLIENT_BURST", defaults["client_burst"]))
+        self.rate_limited = 0
+
+
+class AdmissionController:
+    """Route groups, client buckets and counters shared by the middleware."""
+
+    def __init__(self):
+        """Initialize admission control from environment configuration."""
+        self.enabled = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+        self.trust_forwarded = os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() == "true"
+        self.max_clients = int(os.getenv("ADMISSION_MAX_CLIENTS", 10000))
+        queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10))
+
+        self.groups: List[RouteGroup] = [
+            RouteGroup(
+                "forecast",
+                frozenset({"/api/v1/forecast", "/api/v1/forecast/stream", "/api/v1/forecast/batch"}),
+                "ADMISSION_FORECAST",
+                {"max_concurrency": 8, "max_queue": 16, "client_rps": 2, "client_burst": 10},
+                queue_timeout
+            ),
+            RouteGroup(
+                "upload",
+                frozenset({"/api/v1/upload-csv"}),
+                "ADMISSION_UPLOAD",
+                {"max_concurrency": 2, "max_queue": 4, "client_rps": 0.2, "client_burst": 3},
+                queue_timeout
+            ),
+        ]
+        self._by_path = {path: group for group in self.groups for path in group.paths}
+
+        # (group, client) -> bucket; least recently seen clients are evicted
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+
+        app_logger.info(
+            f"AdmissionController initialized (enabled: {self.enabled}, "
+            + ", ".join(f"{g.name}: {g.limit.max_concurrency}+{g.limit.max_queue}" for g in self.groups)
+            + ")"
+        )
+
+    def group_for(self, scope: Dict[str, Any]) -> Optional[RouteGroup]:
+        """Route group of a request, or None for unrestricted routes."""
+        if scope["method"] != "POST":
+            return None
+        return self._by_path.get(scope["path"])
+
+    def client_id(self, scope: Dict[str, Any]) -> str:
+        """Identify the client by address, or X-Forwarded-For behind a trusted proxy."""
+        if self.trust_forwarded:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def check_rate(self, group: RouteGroup, client_id: str) -> float:
+        """Take a token from the client's bucket.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until the next token
+        """
+        if group.client_rps <= 0:
+            return 0.0
+        key = (group.name, client_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(group.client_rps, group.client_burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.try_acquire()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Load and rejections per route group."""
+        return {
+            group.name: {**group.limit.get_metrics(), "rate_limited": group.rate_limited}
+            for group in self.groups
+        }
+
+
+async def _reject(send, status: int, error: str, detail: str, retry_after: float) -> None:
+    """Send an error response with Retry-After without touching the request body."""
+    body = orjson.dumps({"error": error, "detail": detail, "timestamp": datetime.utcnow()})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying ``AdmissionController`` limits."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        """Initialize admission middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            controller: Limits to apply; defaults to the global controller
+        """
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        group = None
+        if scope["type"] == "http" and self.controller.enabled:
+            group = self.controller.group_for(scope)
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        client_id = self.controller.client_id(scope)
+        wait = self.controller.check_rate(group, client_id)
+        if wait > 0:
+            group.rate_limited += 1
+            app_logger.warning(f"Admission: {group.name} rate limit exceeded by {client_id}")
+            await _reject(send, 429, "Too Many Requests", f"Rate limit exceeded for {group.name} requests", wait)
+            return
+
+        if not await group.limit.acquire():
+            app_logger.warning(f"Admission: {group.name} overloaded, rejecting request from {client_id}")
+            await _reject(
+                send, 503, "Service Unavailable", f"Too many concurrent {group.name} requests",
+                group.limit.retry_after()
+            )
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.limit.release(time.monotonic() - started)
+
+
+# Global instance
+admission_controller = AdmissionController()
@@ -0,0 +1,217 @@
+"""Response compression and Cache-Control middleware.
+
+Both are plain ASGI middleware rather than ``BaseHTTPMiddleware``, so
+they add no task or stream wrapping per request. Compression only
+touches responses that arrive as a single body message; streamed
+responses (NDJSON/SSE forecasts, file downloads) pass through untouched.
+"""
+
+import gzip
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.logger import app_logger
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used when it is not installed
+    brotli = None
+
+
+DEFAULT_CACHE_CONTROL_RULES = (
+    "/api/v1/sample-csv=public, max-age=86400;"
+    "/api/v1/sku-list=private, max-age=60;"
+    "/api/v1/data/=private, max-age=30;"
+    "/api/v1/forecast-history/=private, max-age=30;"
+    "/api/v1/forecast-predictions/=private, max-age=30;"
+    "/api/v1/health=no-store"
+)
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into encoding -> q-value."""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether a media type is text-like and worth compressing."""
+    content_type = content_type.lower()
+    return (
+        content_type.startswith("text/")
+        or "json" in content_type
+        or "xml" in content_type
+        or "javascript" in content_type
+    )
+
+
+def parse_cache_control_rules(spec: str) -> List[Tuple[str, str]]:
+    """Parse ``prefix=value;prefix=value`` rules, longest prefix first.
+
+    Args:
+        spec: Rules separated by ``;``; a value may itself contain commas
+
+    Returns:
+        List of (path prefix, Cache-Control value)
+    """
+    rules = []
+    for rule in spec.split(";"):
+        prefix, _, value = rule.partition("=")
+        if prefix.strip() and value.strip():
+            rules.append((prefix.strip(), value.strip()))
+    return sorted(rules, key=lambda rule: len(rule[0]), reverse=True)
+
+
+def _weak_etag(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Mark a strong ETag weak: compressed bytes differ from the tagged ones."""
+    return [
+        (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+        for name, value in headers
+    ]
+
+
+class CompressionMiddleware:
+    """Compress complete response bodies with brotli or gzip."""
+
+    def __init__(self, app):
+        """Initialize compression middleware.
+
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+        self.enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.minimum_size = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+        self.gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+        app_logger.info(
+            f"CompressionMiddleware initialized (enabled: {self.enabled}, "
+            f"min_size: {self.minimum_size}, brotli: {brotli is not None})"
+        )
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the best encoding the client accepts, or None."""
+        encodings = accepted_encodings(accept_encoding)
+        if brotli is not None and encodings.get("br", 0) > 0:
+            return "br"
+        if encodings.get("gzip", encodings.get("*", 0)) > 0:
+            return "gzip"
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a body with the given encoding."""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        encoding = self.choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = list(start_message.get("headers", []))
+            names = {name.lower(): value for name, value in headers}
+
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in names
+                or start_message["status"] < 200
+                or start_message["status"] in (204, 304)
+                or len(body) < self.minimum_size
+                or not is_compressible(names.get(b"content-type", b"").decode("latin-1"))
+            ):
+                # Streamed or not worth compressing: send everything as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding)
+            rewritten = [(name, value) for name, value in _weak_etag(headers) if name.lower() != b"content-length"]
+            rewritten.append((b"content-encoding", encoding.encode()))
+            rewritten.append((b"content-length", str(len(compressed)).encode()))
+            rewritten.append((b"vary", b"Accept-Encoding"))
+
+            await send({**start_message, "headers": rewritten})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class CacheControlMiddleware:
+    """Add a per-route Cache-Control header to successful GET responses."""
+
+    def __init__(self, app):
+        """Initialize Cache-Control middleware.
+
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+        self.rules = parse_cache_control_rules(os.getenv("CACHE_CONTROL_RULES", DEFAULT_CACHE_CONTROL_RULES))
+        app_logger.info(f"CacheControlMiddleware initialized ({len(self.rules)} rules)")
+
+    def cache_control_for(self, path: str) -> Optional[str]:
+        """Cache-Control value of the longest matching prefix, or None."""
+        for prefix, value in self.rules:
+            if path.startswith(prefix):
+                return value
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        cache_control = self.cache_control_for(scope["path"])
+        if cache_control is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            # 304 carries the same Cache-Control the 200 would have
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                headers = list(message.get("headers", []))
+                if not any(name.lower() == b"cache-control" for name, _ in headers):
+                    headers.append((b"cache-control", cache_control.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
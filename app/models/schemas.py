@@ -1,7 +1,8 @@
 """Minimal Pydantic models for testing"""
 
 from datetime import datetime, date
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict
 from enum import Enum
 
@@ -13,11 +14,24 @@ class ForecastPeriod(str, Enum):
     MONTH = "30"
 
 
+class ProbeResult(BaseModel):
+    """Last background health probe of one dependency."""
+    ok: bool
+    latency_ms: float
+    checked_at: datetime
+    consecutive_failures: int = 0
+    error: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     """Health check response model."""
     status: str = "healthy"
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     version: str = "1.0.0"
+    ready: Optional[bool] = None  # Services loaded and background jobs started
+    warm: Optional[bool] = None  # Start-up cache warm-up completed
+    warmup: Optional[Dict[str, Any]] = None  # Last warm-up report
+    checks: Optional[Dict[str, ProbeResult]] = None  # Last probe per dependency
 
 
 class CSVUploadResponse(BaseModel):
@@ -49,6 +63,19 @@ class ForecastRequest(BaseModel):
     sku_id: str
     period: ForecastPeriod
     context: Optional[str] = None
+    latency_budget: Optional[float] = Field(
+        None, gt=0, le=60,
+        description="Seconds to wait for GigaChat before answering with the local model"
+    )
+
+
+class BatchForecastRequest(BaseModel):
+    """Request model for multi-SKU forecast generation."""
+    sku_ids: List[str] = Field(..., min_length=1, max_length=50)
+    period: ForecastPeriod
+    context: Optional[str] = None
+    # "gigachat" for batched LLM prompts, "matrix" for the in-process catalog engine
+    model: str = Field("gigachat", pattern="^(gigachat|matrix)$")
 
 
 class ForecastResult(BaseModel):
@@ -57,6 +84,10 @@ class ForecastResult(BaseModel):
     predicted_sales: int
     confidence: float
     predicted_temp: Optional[float] = None  # New: forecasted average temperature
+    # Prediction interval quantiles, set by models that simulate uncertainty
+    p10: Optional[int] = None
+    p50: Optional[int] = None
+    p90: Optional[int] = None
 
 
 class ForecastResponse(BaseModel):
@@ -71,6 +102,12 @@ class ForecastResponse(BaseModel):
     average_confidence: float
     model_explanation: Optional[str] = None
     generated_by_gigachat: bool = True  # True if main GigaChat model used, False if fallback/mock
+    forecast_model: str = "gigachat"  # gigachat, local, matrix, mock or fallback
+
+
+class ForecastResponseV2(ForecastResponse):
+    """Compact forecast response: one typed predictions array, no copies."""
+    format_version: int = 2
 
 
 class ForecastHistoryItem(BaseModel):
@@ -91,6 +128,108 @@ class ForecastHistoryResponse(BaseModel):
     total_count: int
 
 
+class ForecastPredictionRow(BaseModel):
+    """One stored daily prediction."""
+    forecast_id: Union[int, UUID]  # SERIAL in setup_database.sql, UUID in supabase_schema.sql
+    date: date
+    predicted_sales: int
+    predicted_temp: Optional[float] = None
+    confidence: Optional[float] = None
+    p10: Optional[int] = None
+    p50: Optional[int] = None
+    p90: Optional[int] = None
+    forecast_model: Optional[str] = None
+
+
+class ForecastPredictionsResponse(BaseModel):
+    """Response model for stored predictions in a date range."""
+    sku_id: str
+    predictions: List[ForecastPredictionRow]
+    total_count: int
+
+
+class BacktestRequest(BaseModel):
+    """Request model for rolling-origin backtesting."""
+    sku_ids: Optional[List[str]] = None
+    models: List[str] = Field(default_factory=lambda: ["local", "naive", "mean", "mock"])
+    horizon: int = Field(4, ge=1, le=52, description="Records forecast after each cutoff")
+    step: int = Field(1, ge=1, le=52, description="Records between consecutive cutoffs")
+    min_train: int = Field(8, ge=2, le=520, description="Records required before the first cutoff")
+    max_cutoffs: int = Field(20, ge=1, le=500, description="Most recent cutoffs evaluated per SKU")
+
+
+class BacktestMetrics(BaseModel):
+    """Forecast error metrics of one model."""
+    mape: Optional[float] = None
+    wape: Optional[float] = None
+    bias: Optional[float] = None
+    forecasts: int = 0
+    points: int = 0
+
+
+class BacktestResponse(BaseModel):
+    """Response model for backtesting."""
+    models: Dict[str, BacktestMetrics]
+    per_sku: Dict[str, Dict[str, BacktestMetrics]]
+    sku_count: int
+    cutoff_count: int
+    elapsed_seconds: float
+
+
+class ScenarioRequest(BaseModel):
+    """Request model for what-if temperature scenarios."""
+    sku_ids: List[str] = Field(..., min_length=1, max_length=50)
+    period: ForecastPeriod
+    temperature_offsets: List[float] = Field(
+        default_factory=lambda: [0.0], max_length=50,
+        description="Shifts in °C applied to the climatology temperature curve"
+    )
+    temperature_curves: Optional[Dict[str, List[float]]] = Field(
+        None, max_length=20,
+        description="Named custom daily temperature curves, one value per forecast day"
+    )
+
+
+class ScenarioSkuResult(BaseModel):
+    """Demand surface of one SKU."""
+    sku_id: str
+    demand: List[List[float]]  # scenario x day
+    totals: List[float]  # one per scenario
+    temp_elasticity: float  # daily units per °C
+    observations: int
+
+
+class ScenarioResponse(BaseModel):
+    """Response model for what-if temperature scenarios."""
+    dates: List[date]
+    scenarios: List[str]
+    temperatures: List[List[float]]  # scenario x day
+    results: List[ScenarioSkuResult]
+
+
+class AccuracyMetrics(BaseModel):
+    """Realized forecast error of one model."""
+    mape: Optional[float] = None
+    wape: Optional[float] = None
+    bias: Optional[float] = None
+    mae: Optional[float] = None
+    points: int = 0
+
+
+class AccuracyResponse(BaseModel):
+    """Forecast accuracy against actual sales, per model and per SKU."""
+    models: Dict[str, AccuracyMetrics]
+    per_sku: Dict[str, Dict[str, AccuracyMetrics]]
+    pending_predictions: int
+
+
+class SkuAccuracyResponse(BaseModel):
+    """Forecast accuracy of one SKU."""
+    sku_id: str
+    models: Dict[str, AccuracyMetrics]
+    pending_predictions: int
+
+
 class ErrorResponse(BaseModel):
     """Standard error response model."""
     error: str
@@ -110,3 +249,5 @@ class GigaChatResponse(BaseModel):
     predictions: List[dict]
     explanation: str
     confidence_scores: List[float]
+    generated_by_gigachat: bool = True  # False when produced by the mock/fallback generator
+    forecast_model: str = "gigachat"  # Model that produced the predictions
@@ -0,0 +1,379 @@
+"""Forecast accuracy tracking.
+
+This module matches stored daily predictions against actual sales as they
+are ingested and keeps running error sums per SKU and forecast model, so
+accuracy queries never rescan forecasts or sales.
+
+Predictions are daily, while actuals cover ``ACCURACY_PERIOD_DAYS`` days:
+7 (the default) for weekly totals dated on the Monday, as in the sample
+data, or 1 for daily sales. A period is scored against the sum of its
+daily predictions, and only if a model predicted every day of it.
+
+Pending predictions and error sums live in the shared cache, one record
+per SKU updated atomically, so every worker process reports the same
+accuracy and a restart keeps it. Pending predictions are also rebuilt
+from ``forecast_predictions`` at start-up.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+
+from app.utils.logger import app_logger
+from app.models.schemas import (
+    AccuracyMetrics, AccuracyResponse, ForecastResponse, SkuAccuracyResponse
+)
+from app.services.supabase_client import supabase_client
+from app.services.shared_cache import SharedCache, shared_cache
+
+
+NAMESPACE = "accuracy"
+
+# A SKU's record: {"pending": {period start: {model: {date: predicted}}},
+#                  "sums": {model: error sums}, "scored": {period start: 1}}
+Record = Dict[str, Dict[str, Any]]
+
+
+def _empty_sums() -> Dict[str, float]:
+    """Additive error sums of one SKU and model."""
+    return {"abs_error": 0.0, "error": 0.0, "actual": 0.0, "ape": 0.0, "ape_points": 0, "points": 0}
+
+
+def _empty_record() -> Record:
+    """Record of a SKU without tracked predictions."""
+    return {"pending": {}, "sums": {}, "scored": {}}
+
+
+def _date_key(value: Any) -> str:
+    """ISO date string of a date, datetime or string value."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+
+def _period_start(day: str, period_days: int) -> str:
+    """First day of the actuals period containing an ISO date."""
+    if period_days == 1:
+        return day
+    value = date.fromisoformat(day)
+    return (value - timedelta(days=value.weekday())).isoformat()
+
+
+def _pending_count(record: Record) -> int:
+    """Number of daily predictions awaiting actuals in a record."""
+    return sum(len(days) for models in record["pending"].values() for days in models.values())
+
+
+class AccuracyService:
+    """Incremental forecast-vs-actual error aggregates."""
+
+    def __init__(self, period_days: Optional[int] = None, cache: Optional[SharedCache] = None):
+        """Initialize accuracy service.
+
+        Args:
+            period_days: Days covered by one actual sales row, 1 or 7;
+                defaults to ACCURACY_PERIOD_DAYS
+            cache: Store for pending predictions and error sums; defaults
+                to the shared cache
+
+        Raises:
+            ValueError: If the period is neither daily nor weekly
+        """
+        self.period_days = period_days or int(os.getenv("ACCURACY_PERIOD_DAYS", 7))
+        if self.period_days not in (1, 7):
+            raise ValueError(f"ACCURACY_PERIOD_DAYS must be 1 or 7, got {self.period_days}")
+        # Predictions older than this are neither loaded nor kept pending
+        self.pending_max_age_days = int(os.getenv("ACCURACY_PENDING_MAX_AGE_DAYS", 90))
+        self.cache = cache or shared_cache
+        app_logger.info(f"AccuracyService initialized (period_days: {self.period_days})")
+
+    def _sku_ids(self) -> List[str]:
+        """SKUs that have a record."""
+        value = self.cache.get(NAMESPACE, "skus")
+        return orjson.loads(value) if value is not None else []
+
+    def _record(self, sku_id: str) -> Optional[Record]:
+        """Current record of a SKU, or None."""
+        value = self.cache.get(NAMESPACE, f"sku:{sku_id}")
+        return orjson.loads(value) if value is not None else None
+
+    def _update(self, sku_id: str, change: Callable[[Record], int]) -> int:
+        """Apply ``change`` to a SKU's record atomically.
+
+        Args:
+            sku_id: SKU identifier
+            change: Modifies the record in place and returns a count; a
+                count of 0 means nothing changed and nothing is written
+
+        Returns:
+            Count returned by ``change``
+        """
+        result = {"count": 0, "created": False}
+
+        def apply(value: Optional[bytes]) -> Optional[bytes]:
+            record = orjson.loads(value) if value is not None else _empty_record()
+            result["count"] = change(record)
+            if not result["count"]:
+                return None
+            result["created"] = value is None
+            return orjson.dumps(record)
+
+        self.cache.update(NAMESPACE, f"sku:{sku_id}", apply)
+        if result["created"]:
+            self.cache.update(
+                NAMESPACE, "skus",
+                lambda value: None if value is not None and sku_id in orjson.loads(value)
+                else orjson.dumps((orjson.loads(value) if value is not None else []) + [sku_id])
+            )
+        return result["count"]
+
+    def _add_pending(self, record: Record, day: Any, model: str, predicted: float, replace: bool) -> int:
+        """Add a pending prediction to a record; returns 1 if it was stored.
+
+        Args:
+            record: SKU record to modify
+            day: Prediction date
+            model: Forecast model
+            predicted: Predicted units
+            replace: Whether to replace an existing prediction of the day
+        """
+        day = _date_key(day)
+        period = _period_start(day, self.period_days)
+        if period in record["scored"]:
+            return 0
+        days = record["pending"].setdefault(period, {}).setdefault(model, {})
+        if not replace and day in days:
+            return 0
+        days[day] = float(predicted)
+        return 1
+
+    def register_forecast(self, forecast_response: ForecastResponse) -> int:
+        """Start tracking the daily predictions of a saved forecast.
+
+        A newer forecast from the same model replaces the pending prediction
+        for the same day, so each day is scored against the latest forecast
+        issued before its actuals arrived.
+
+        Args:
+            forecast_response: Forecast that was just stored
+
+        Returns:
+            Number of predictions registered
+        """
+        def change(record: Record) -> int:
+            return sum(
+                self._add_pending(
+                    record, pred.date, forecast_response.forecast_model, pred.predicted_sales, replace=True
+                )
+                for pred in forecast_response.predictions
+            )
+
+        return self._update(forecast_response.sku_id, change)
+
+    def load_pending(self, prediction_rows: List[Dict[str, Any]]) -> int:
+        """Track stored predictions, e.g. after a restart.
+
+        Predictions already pending, and periods already scored, are kept.
+
+        Args:
+            prediction_rows: Rows from ``supabase_client.get_forecast_predictions``
+                ordered newest forecast first within a day
+
+        Returns:
+            Number of predictions registered
+        """
+        by_sku: Dict[str, List[Dict[str, Any]]] = {}
+        for row in prediction_rows:
+            by_sku.setdefault(row["sku_id"], []).append(row)
+
+        loaded = 0
+        for sku_id, rows in by_sku.items():
+            def change(record: Record, rows: List[Dict[str, Any]] = rows) -> int:
+                # Keep the newest forecast of each model for a day
+                return sum(
+                    self._add_pending(
+                        record, row["date"], row.get("forecast_model") or "gigachat",
+                        row["predicted_sales"], replace=False
+                    )
+                    for row in rows
+                )
+
+            loaded += self._update(sku_id, change)
+        return loaded
+
+    def load_stored_predictions(self, page_size: int = 1000) -> int:
+        """Rebuild pending predictions from ``forecast_predictions``.
+
+        Blocking; run once at start-up in a background thread.
+
+        Args:
+            page_size: Rows fetched per request
+
+        Returns:
+            Number of predictions registered
+        """
+        start = date.today() - timedelta(days=self.pending_max_age_days + self.period_days)
+        loaded = offset = 0
+        while True:
+            rows = supabase_client.get_forecast_predictions(start_date=start, limit=page_size, offset=offset)
+            loaded += self.load_pending(rows)
+            if len(rows) < page_size:
+                break
+            offset += page_size
+
+        app_logger.info(f"Loaded {loaded} stored predictions awaiting actuals")
+        return loaded
+
+    def update_from_actuals(self, rows: List[Dict[str, Any]]) -> int:
+        """Score pending predictions against newly ingested sales.
+
+        Each row is the actual of the period starting on its date. Rows for
+        the same SKU and period within one ingest are summed before
+        matching; rows not dated on a period start (a Monday for weekly
+        actuals) are ignored. A model's predictions are summed over the
+        period and scored if they cover all of it. Matched predictions
+        stop being pending, whether scored or not.
+
+        Args:
+            rows: Sales records with sku_id, date and sales_quantity
+
+        Returns:
+            Number of periods scored, counted per model
+        """
+        actuals: Dict[str, Dict[str, float]] = {}
+        misaligned = 0
+        for row in rows:
+            if not row.get("sku_id") or not row.get("date"):
+                continue
+            day = _date_key(row["date"])
+            if _period_start(day, self.period_days) != day:
+                misaligned += 1
+                continue
+            periods = actuals.setdefault(row["sku_id"], {})
+            periods[day] = periods.get(day, 0.0) + float(row.get("sales_quantity") or 0)
+
+        if misaligned:
+            app_logger.warning(
+                f"Ignored {misaligned} actuals not dated on the start of a {self.period_days}-day period"
+            )
+
+        scored = 0
+        for sku_id, periods in actuals.items():
+            # Skip SKUs without pending predictions without taking the write lock
+            record = self._record(sku_id)
+            if record is None or not any(period in record["pending"] for period in periods):
+                continue
+
+            counts = {"scored": 0}
+
+            def change(record: Record, periods: Dict[str, float] = periods) -> int:
+                counts["scored"] = matched = 0
+                for period, actual in periods.items():
+                    predictions = record["pending"].pop(period, None)
+                    if not predictions:
+                        continue
+                    record["scored"][period] = 1
+                    matched += 1
+                    for model, days in predictions.items():
+                        # A partly predicted period cannot be compared with its total
+                        if len(days) < self.period_days:
+                            continue
+                        error = sum(days.values()) - actual
+                        sums = record["sums"].setdefault(model, _empty_sums())
+                        sums["abs_error"] += abs(error)
+                        sums["error"] += error
+                        sums["actual"] += actual
+                        sums["points"] += 1
+                        if actual > 0:
+                            sums["ape"] += abs(error) / actual
+                            sums["ape_points"] += 1
+                        counts["scored"] += 1
+                return matched
+
+            self._update(sku_id, change)
+            scored += counts["scored"]
+
+        if scored:
+            app_logger.info(f"Scored {scored} predictions against actuals")
+        return scored
+
+    def prune_pending(self, older_than_days: int) -> int:
+        """Forget pending predictions for days that will not get actuals.
+
+        Markers of periods scored before the cutoff are dropped as well.
+
+        Args:
+            older_than_days: Age in days after which a prediction is dropped
+
+        Returns:
+            Number of (SKU, period) entries removed
+        """
+        # Compare period starts, so a period is dropped once its last day is old
+        cutoff = (datetime.now() - timedelta(days=older_than_days + self.period_days - 1)).date().isoformat()
+        counts = {"pending": 0}
+
+        def change(record: Record) -> int:
+            stale = [period for period in record["pending"] if period < cutoff]
+            for period in stale:
+                del record["pending"][period]
+            counts["pending"] += len(stale)
+            old_scored = [period for period in record["scored"] if period < cutoff]
+            for period in old_scored:
+                del record["scored"][period]
+            return len(stale) + len(old_scored)
+
+        for sku_id in self._sku_ids():
+            self._update(sku_id, change)
+        return counts["pending"]
+
+    @staticmethod
+    def _metrics(sums: Dict[str, float]) -> AccuracyMetrics:
+        """Convert error sums to percentage metrics."""
+        return AccuracyMetrics(
+            mape=round(sums["ape"] / sums["ape_points"] * 100, 3) if sums["ape_points"] else None,
+            wape=round(sums["abs_error"] / sums["actual"] * 100, 3) if sums["actual"] else None,
+            bias=round(sums["error"] / sums["actual"] * 100, 3) if sums["actual"] else None,
+            mae=round(sums["abs_error"] / sums["points"], 3) if sums["points"] else None,
+            points=int(sums["points"])
+        )
+
+    def get_summary(self) -> AccuracyResponse:
+        """Accuracy per model over all SKUs, and per SKU and model."""
+        totals: Dict[str, Dict[str, float]] = {}
+        per_sku: Dict[str, Dict[str, AccuracyMetrics]] = {}
+        pending = 0
+
+        for sku_id in self._sku_ids():
+            record = self._record(sku_id)
+            if record is None:
+                continue
+            pending += _pending_count(record)
+            if record["sums"]:
+                per_sku[sku_id] = {model: self._metrics(sums) for model, sums in record["sums"].items()}
+            for model, sums in record["sums"].items():
+                model_totals = totals.setdefault(model, _empty_sums())
+                for name, value in sums.items():
+                    model_totals[name] += value
+
+        return AccuracyResponse(
+            models={model: self._metrics(sums) for model, sums in totals.items()},
+            per_sku=per_sku,
+            pending_predictions=pending
+        )
+
+    def get_sku_accuracy(self, sku_id: str) -> Optional[SkuAccuracyResponse]:
+        """Accuracy per model for one SKU, or None if nothing is tracked."""
+        record = self._record(sku_id) or _empty_record()
+        models = {model: self._metrics(sums) for model, sums in record["sums"].items()}
+        pending = _pending_count(record)
+
+        if not models and not pending:
+            return None
+        return SkuAccuracyResponse(sku_id=sku_id, models=models, pending_predictions=pending)
+
+
+# Global instance
+accuracy_service = AccuracyService()
+supabase_client.add_ingest_listener(accuracy_service.update_from_actuals)
@@ -0,0 +1,285 @@
+"""Rolling-origin backtesting of forecast models.
+
+This module replays sales history with rolling cutoffs, runs registered
+forecast models on every SKU x cutoff combination and scores them with
+MAPE, WAPE and bias. Each model forecasts all cutoffs of a SKU in one
+vectorized NumPy pass; SKUs are spread over a process pool.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.utils.logger import app_logger
+from app.models.schemas import BacktestRequest, BacktestResponse, BacktestMetrics
+from app.services.supabase_client import supabase_client
+from app.services.climatology import climatology
+from app.services.local_model import local_model
+
+
+# A model maps (series, cutoffs, horizon) to a (len(cutoffs) x horizon) forecast matrix.
+# ``series`` holds date-sorted arrays: dates, qty, temps, clim_temps plus spacing_days and sku_id.
+BacktestModel = Callable[[Dict[str, Any], np.ndarray, int], np.ndarray]
+
+MODEL_REGISTRY: Dict[str, BacktestModel] = {}
+
+# Recorded GigaChat answers for replay, keyed "SKU|cutoff-date"; set per worker
+_LLM_REPLAY: Dict[str, List[float]] = {}
+
+
+def register_model(name: str) -> Callable[[BacktestModel], BacktestModel]:
+    """Decorator registering a backtest model under ``name``."""
+    def decorator(func: BacktestModel) -> BacktestModel:
+        MODEL_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def _future_index(cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """Index matrix of the records following each cutoff."""
+    return cutoffs[:, None] + np.arange(horizon)[None, :]
+
+
+@register_model("naive")
+def _naive_model(series: Dict[str, Any], cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """Repeat the last observed quantity."""
+    return np.repeat(series["qty"][cutoffs - 1][:, None], horizon, axis=1)
+
+
+@register_model("mean")
+def _mean_model(series: Dict[str, Any], cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """Repeat the mean of the training window."""
+    cumulative = np.concatenate([[0.0], np.cumsum(series["qty"])])
+    return np.repeat((cumulative[cutoffs] / cutoffs)[:, None], horizon, axis=1)
+
+
+@register_model("mock")
+def _mock_model(series: Dict[str, Any], cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """Mirror GigaChatService._generate_mock_forecast: rolling-7 mean times a 0.8-1.1 pattern.
+
+    The base level is the mean of the last (up to) 7 training records, the
+    same ``rolling_7`` feature the production mock reads from the feature store.
+    """
+    variation = 0.8 + (np.arange(horizon) % 3) * 0.15
+    cumulative = np.concatenate([[0.0], np.cumsum(series["qty"])])
+    starts = np.maximum(cutoffs - 7, 0)
+    rolling = (cumulative[cutoffs] - cumulative[starts]) / (cutoffs - starts)
+    return np.maximum(1, np.floor(rolling[:, None] * variation[None, :]))
+
+
+@register_model("local")
+def _local_model(series: Dict[str, Any], cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """Temperature regression of LocalForecastModel, fitted for all cutoffs at once.
+
+    Training windows are prefixes of the series, so the least-squares sums for
+    every cutoff come from cumulative sums. Horizon temperatures are
+    climatology normals, as in production (no look-ahead on actual weather).
+    """
+    spacing = series["spacing_days"]
+    x = series["temps"]
+    y = series["qty"] / spacing
+
+    def prefix(values: np.ndarray) -> np.ndarray:
+        return np.concatenate([[0.0], np.cumsum(values)])[cutoffs]
+
+    n = cutoffs.astype(float)
+    sx, sy, sxy, sxx = prefix(x), prefix(y), prefix(x * y), prefix(x * x)
+    denominator = n * sxx - sx * sx
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(np.abs(denominator) > 1e-9, (n * sxy - sx * sy) / denominator, 0.0)
+    intercept = (sy - slope * sx) / n
+
+    future_temps = series["clim_temps"][_future_index(cutoffs, horizon)]
+    rates = intercept[:, None] + slope[:, None] * future_temps
+    return np.clip(rates, 0, None) * spacing
+
+
+@register_model("llm")
+def _llm_model(series: Dict[str, Any], cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """Replay recorded GigaChat answers; cutoffs without one use the local model."""
+    forecasts = _local_model(series, cutoffs, horizon)
+    if not _LLM_REPLAY:
+        return forecasts
+
+    for row, cutoff in enumerate(cutoffs):
+        key = f"{series['sku_id']}|{series['dates'][cutoff - 1]}"
+        recorded = _LLM_REPLAY.get(key)
+        if recorded and len(recorded) >= horizon:
+            forecasts[row] = np.asarray(recorded[:horizon], dtype=float)
+    return forecasts
+
+
+def _init_worker(llm_replay: Dict[str, List[float]]) -> None:
+    """Process pool initializer sharing the LLM replay table."""
+    global _LLM_REPLAY
+    _LLM_REPLAY = llm_replay
+
+
+def _error_sums(forecasts: np.ndarray, actuals: np.ndarray) -> Dict[str, float]:
+    """Additive error sums from which MAPE, WAPE and bias are derived."""
+    errors = forecasts - actuals
+    abs_errors = np.abs(errors)
+    positive = actuals > 0
+
+    return {
+        "abs_error": float(abs_errors.sum()),
+        "error": float(errors.sum()),
+        "actual": float(actuals.sum()),
+        "ape": float((abs_errors[positive] / actuals[positive]).sum()),
+        "ape_points": int(positive.sum()),
+        "points": int(actuals.size),
+        "forecasts": int(actuals.shape[0])
+    }
+
+
+def _metrics_from_sums(sums: Dict[str, float]) -> BacktestMetrics:
+    """Convert error sums to percentage metrics."""
+    return BacktestMetrics(
+        mape=round(sums["ape"] / sums["ape_points"] * 100, 3) if sums["ape_points"] else None,
+        wape=round(sums["abs_error"] / sums["actual"] * 100, 3) if sums["actual"] else None,
+        bias=round(sums["error"] / sums["actual"] * 100, 3) if sums["actual"] else None,
+        forecasts=int(sums["forecasts"]),
+        points=int(sums["points"])
+    )
+
+
+def _evaluate_sku(payload: Tuple[Dict[str, Any], List[str], int, int, int, int]) -> Tuple[str, Dict[str, Dict[str, float]]]:
+    """Backtest all requested models on one SKU series.
+
+    Returns:
+        Tuple of SKU ID and per-model error sums (empty if history is too short)
+    """
+    series, models, horizon, step, min_train, max_cutoffs = payload
+    size = series["qty"].size
+
+    cutoffs = np.arange(min_train, size - horizon + 1, step)[-max_cutoffs:]
+    if cutoffs.size == 0:
+        return series["sku_id"], {}
+
+    actuals = series["qty"][_future_index(cutoffs, horizon)]
+    return series["sku_id"], {
+        name: _error_sums(MODEL_REGISTRY[name](series, cutoffs, horizon), actuals)
+        for name in models
+    }
+
+
+class BacktestService:
+    """Service for rolling-origin evaluation of forecast models."""
+
+    def __init__(self):
+        """Initialize backtest service."""
+        self.max_workers = int(os.getenv("BACKTEST_WORKERS", os.cpu_count() or 1))
+        # Below this many SKUs the process pool costs more than it saves
+        self.parallel_min_skus = int(os.getenv("BACKTEST_PARALLEL_MIN_SKUS", 8))
+        self.llm_replay_path = os.getenv("BACKTEST_LLM_REPLAY_PATH")
+        app_logger.info(f"BacktestService initialized (workers: {self.max_workers})")
+
+    def _load_llm_replay(self) -> Dict[str, List[float]]:
+        """Load recorded GigaChat answers used by the ``llm`` model."""
+        if not self.llm_replay_path:
+            return {}
+        try:
+            with open(self.llm_replay_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            app_logger.warning(f"Cannot load LLM replay file {self.llm_replay_path}: {e}")
+            return {}
+
+    def _build_series(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group history rows into per-SKU date-sorted arrays."""
+        by_sku: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            if row.get("sku_id"):
+                by_sku.setdefault(row["sku_id"], []).append(row)
+
+        series_list = []
+        for sku_id, sku_rows in by_sku.items():
+            dates, qty, temps = local_model.history_arrays(sku_rows)
+            gaps = np.diff(dates).astype(float)
+            gaps = gaps[gaps > 0]
+            series_list.append({
+                "sku_id": sku_id,
+                "dates": dates.astype(str),
+                "qty": qty,
+                "temps": temps,
+                "clim_temps": climatology.temperatures_for(dates.astype(object)),
+                "spacing_days": float(np.median(gaps)) if gaps.size else 1.0
+            })
+        return series_list
+
+    def run(self, request: BacktestRequest) -> BacktestResponse:
+        """Run a backtest over stored sales history.
+
+        Args:
+            request: Backtest parameters
+
+        Returns:
+            Aggregate and per-SKU metrics for each model
+
+        Raises:
+            ValueError: If an unknown model is requested
+        """
+        unknown = [name for name in request.models if name not in MODEL_REGISTRY]
+        if unknown:
+            raise ValueError(f"Unknown backtest models: {', '.join(unknown)}")
+
+        started_at = time.monotonic()
+        series_list = self._build_series(supabase_client.get_sales_history(request.sku_ids))
+        payloads = [
+            (series, request.models, request.horizon, request.step, request.min_train, request.max_cutoffs)
+            for series in series_list
+        ]
+        llm_replay = self._load_llm_replay() if "llm" in request.models else {}
+
+        app_logger.info(f"Backtesting {len(request.models)} models on {len(payloads)} SKUs")
+
+        if self.max_workers > 1 and len(payloads) >= self.parallel_min_skus:
+            chunksize = max(1, len(payloads) // (self.max_workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(llm_replay,)
+            ) as executor:
+                results = list(executor.map(_evaluate_sku, payloads, chunksize=chunksize))
+        else:
+            _init_worker(llm_replay)
+            results = [_evaluate_sku(payload) for payload in payloads]
+
+        totals = {name: None for name in request.models}
+        per_sku: Dict[str, Dict[str, BacktestMetrics]] = {}
+        cutoff_count = 0
+
+        for sku_id, model_sums in results:
+            if not model_sums:
+                continue
+            per_sku[sku_id] = {name: _metrics_from_sums(sums) for name, sums in model_sums.items()}
+            cutoff_count += next(iter(model_sums.values()))["forecasts"]
+            for name, sums in model_sums.items():
+                if totals[name] is None:
+                    totals[name] = dict(sums)
+                else:
+                    for field, value in sums.items():
+                        totals[name][field] += value
+
+        elapsed = time.monotonic() - started_at
+        app_logger.info(f"Backtest finished: {cutoff_count} SKU x cutoff combinations in {elapsed:.2f}s")
+
+        return BacktestResponse(
+            models={
+                name: _metrics_from_sums(sums) if sums else BacktestMetrics()
+                for name, sums in totals.items()
+            },
+            per_sku=per_sku,
+            sku_count=len(per_sku),
+            cutoff_count=cutoff_count,
+            elapsed_seconds=round(elapsed, 3)
+        )
+
+
+# Global instance
+backtest_service = BacktestService()
@@ -0,0 +1,168 @@
+"""Day-of-year temperature normals for Khabarovsk.
+
+This module keeps a 366-element array of expected daily mean temperatures.
+It starts from built-in Khabarovsk monthly normals and is refined with the
+``avg_temp`` values of stored sales history, loaded once at start-up and
+then kept up to date by ingest events, so forecast horizons can be filled
+with realistic temperatures without external weather calls.
+
+Observations are kept per calendar date (``avg_temp`` is the city's
+temperature, repeated on every SKU's row), so the table depends only on
+the stored data and is the same in every worker after start-up.
+"""
+
+import os
+import threading
+from datetime import date, datetime, timedelta
+from collections import defaultdict
+from typing import Iterable, List, Dict, Any, Union
+
+import numpy as np
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import supabase_client
+
+
+# Approximate monthly mean air temperature in Khabarovsk, °C (January..December)
+KHABAROVSK_MONTHLY_NORMALS = (-19.7, -15.4, -6.3, 4.4, 12.1, 18.1, 21.4, 20.3, 13.9, 4.5, -7.5, -17.1)
+
+DAYS_IN_TABLE = 366
+
+
+def _day_index(value: Union[date, datetime, str]) -> int:
+    """Zero-based day-of-year index (0..365) of a date or ISO date string."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.timetuple().tm_yday - 1
+
+
+def build_default_normals(monthly_normals: Iterable[float] = KHABAROVSK_MONTHLY_NORMALS) -> np.ndarray:
+    """Interpolate monthly normals to a daily table.
+
+    Each monthly value is placed at the middle of its month and days in
+    between are linearly interpolated, wrapping around the year end.
+
+    Args:
+        monthly_normals: Twelve monthly mean temperatures
+
+    Returns:
+        Array of 366 daily normals
+    """
+    values = np.asarray(list(monthly_normals), dtype=float)
+    mid_month_days = np.array([
+        _day_index(date(2024, month, 15)) for month in range(1, 13)
+    ], dtype=float)
+
+    # Pad with the neighbouring months of the adjacent years for wrap-around
+    xp = np.concatenate([mid_month_days[-1:] - DAYS_IN_TABLE, mid_month_days, mid_month_days[:1] + DAYS_IN_TABLE])
+    fp = np.concatenate([values[-1:], values, values[:1]])
+    return np.interp(np.arange(DAYS_IN_TABLE, dtype=float), xp, fp)
+
+
+class TemperatureClimatology:
+    """Lookup table of expected temperature by day of year."""
+
+    def __init__(self):
+        """Initialize climatology with the built-in Khabarovsk normals."""
+        # Pseudo-observations given to the built-in normals when blending
+        self.prior_weight = float(os.getenv("CLIMATOLOGY_PRIOR_WEIGHT", 3))
+        # Observations are spread over +/- this many days (history is often weekly)
+        self.smoothing_days = int(os.getenv("CLIMATOLOGY_SMOOTHING_DAYS", 7))
+        # SKU whose stored rows supply the temperatures loaded at start-up
+        self.reference_sku = os.getenv("CLIMATOLOGY_REFERENCE_SKU") or None
+
+        self._default = build_default_normals()
+        # Observed mean temperature per ISO date
+        self._observations: Dict[str, float] = {}
+        self._normals = self._default.copy()
+        self._lock = threading.Lock()
+
+        app_logger.info("TemperatureClimatology initialized with Khabarovsk normals")
+
+    def _recompute(self) -> None:
+        """Blend smoothed observations with the built-in normals."""
+        sums = np.zeros(DAYS_IN_TABLE)
+        counts = np.zeros(DAYS_IN_TABLE)
+        if self._observations:
+            indices = [_day_index(day) for day in self._observations]
+            np.add.at(sums, indices, list(self._observations.values()))
+            np.add.at(counts, indices, 1)
+
+        window = np.ones(2 * self.smoothing_days + 1)
+        pad = self.smoothing_days
+
+        def circular_smooth(values: np.ndarray) -> np.ndarray:
+            padded = np.concatenate([values[-pad:], values, values[:pad]]) if pad else values
+            return np.convolve(padded, window, mode="valid")
+
+        sums = circular_smooth(sums)
+        counts = circular_smooth(counts)
+        self._normals = (sums + self.prior_weight * self._default) / (counts + self.prior_weight)
+
+    def update_from_history(self, rows: List[Dict[str, Any]]) -> int:
+        """Add observed ``avg_temp`` values to the table.
+
+        Rows of one date are averaged into a single observation, which
+        replaces any earlier observation of that date.
+
+        Args:
+            rows: Sales records with ``date`` and ``avg_temp``
+
+        Returns:
+            Number of dates observed
+        """
+        by_date: Dict[str, List[float]] = defaultdict(list)
+        for row in rows:
+            if row.get("avg_temp") is None or not row.get("date"):
+                continue
+            try:
+                day = str(row["date"])[:10]
+                _day_index(day)
+                by_date[day].append(float(row["avg_temp"]))
+            except (TypeError, ValueError):
+                continue
+
+        if not by_date:
+            return 0
+
+        with self._lock:
+            for day, temps in by_date.items():
+                self._observations[day] = sum(temps) / len(temps)
+            self._recompute()
+
+        app_logger.info(f"Climatology updated with {len(by_date)} dated temperature observations")
+        return len(by_date)
+
+    def load_stored_history(self) -> int:
+        """Build the table from the temperatures stored in ``sales_data``.
+
+        Blocking; run once at start-up in a background thread. Only the
+        reference SKU's rows are read; dates it does not cover are added
+        as other SKUs' sales are ingested.
+
+        Returns:
+            Number of dates observed
+        """
+        return self.update_from_history(supabase_client.get_temperature_history(sku_id=self.reference_sku))
+
+    def temperature_for(self, value: Union[date, datetime, str]) -> float:
+        """Expected temperature for a single date."""
+        return round(float(self._normals[_day_index(value)]), 1)
+
+    def temperatures_for(self, dates: Iterable[Union[date, datetime, str]]) -> np.ndarray:
+        """Expected temperatures for a sequence of dates."""
+        normals = self._normals
+        return np.round(normals[[_day_index(value) for value in dates]], 1)
+
+    def horizon(self, start: Union[date, datetime], days: int) -> np.ndarray:
+        """Expected temperatures for ``days`` consecutive days from ``start``."""
+        return self.temperatures_for(start + timedelta(days=i) for i in range(days))
+
+    def normals(self) -> np.ndarray:
+        """Copy of the current 366-day normals table."""
+        return self._normals.copy()
+
+
+# Global instance
+climatology = TemperatureClimatology()
+supabase_client.add_ingest_listener(climatology.update_from_history)
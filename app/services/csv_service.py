@@ -8,7 +8,6 @@ import csv
 import io
 from datetime import datetime
 from typing import List, Dict, Any, Tuple
-import pandas as pd
 
 from app.utils.logger import app_logger
 from app.models.schemas import SalesDataRow
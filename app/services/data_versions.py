@@ -0,0 +1,110 @@
+"""Per-SKU data versions for conditional GET.
+
+Every write the service makes to a SKU's sales or forecasts bumps a
+version number, so an ETag built from the version changes exactly when
+the data behind a response does. Endpoints compare ``If-None-Match``
+against it and answer 304 without querying Supabase. Versions and the
+SKU list live in the shared cache, so all worker processes issue the
+same ETags and see each other's invalidations.
+"""
+
+import hashlib
+import os
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import supabase_client
+from app.services.shared_cache import SharedCache, shared_cache
+
+
+SALES = "sales"
+FORECASTS = "forecasts"
+
+NAMESPACE = "data_versions"
+
+
+class DataVersions:
+    """Version counters per data kind and SKU, plus a cached SKU list."""
+
+    def __init__(self, cache: Optional[SharedCache] = None):
+        """Initialize data versions.
+
+        Args:
+            cache: Store for versions and the SKU list; defaults to the shared cache
+        """
+        self.cache = cache or shared_cache
+        # Versions restart at zero with a new cache; the epoch, agreed on by
+        # all workers, keeps ETags issued against an older cache from matching
+        self.epoch = self.cache.add(NAMESPACE, "epoch", f"{time.time_ns():x}".encode()).decode()
+        self.sku_list_ttl = float(os.getenv("SKU_LIST_CACHE_TTL", 300))
+        app_logger.info(f"DataVersions initialized (sku_list_ttl: {self.sku_list_ttl}s)")
+
+    def version(self, kind: str, sku_id: str) -> int:
+        """Current version of a SKU's data of one kind."""
+        return self.cache.counter(NAMESPACE, f"{kind}:{sku_id}")
+
+    def bump(self, kind: str, sku_ids: Iterable[str]) -> None:
+        """Mark data of the given SKUs as changed."""
+        for sku_id in set(sku_ids):
+            self.cache.incr(NAMESPACE, f"{kind}:{sku_id}")
+
+    def on_ingest(self, rows: List[Dict[str, Any]]) -> int:
+        """Ingest listener: bump sales versions and drop the cached SKU list.
+
+        Args:
+            rows: Sales records just written
+
+        Returns:
+            Number of SKUs bumped
+        """
+        sku_ids = {row["sku_id"] for row in rows if row.get("sku_id")}
+        self.bump(SALES, sku_ids)
+        self.cache.delete(NAMESPACE, "sku_list")
+        return len(sku_ids)
+
+    def etag(self, kind: str, sku_id: str, *params: Any) -> str:
+        """Strong ETag of a response built from one SKU's data.
+
+        Args:
+            kind: Data kind, ``SALES`` or ``FORECASTS``
+            sku_id: SKU identifier
+            *params: Query parameters that shape the response, e.g. limit
+
+        Returns:
+            Quoted ETag value
+        """
+        shape = zlib.crc32("|".join(map(str, (sku_id,) + params)).encode())
+        return f'"{self.epoch}-{kind}-{self.version(kind, sku_id)}-{shape:08x}"'
+
+    def sku_list(self, fetch: Callable[[], List[str]]) -> Tuple[List[str], str]:
+        """SKU list with an ETag hashed from its content.
+
+        The list is cached until the next ingest or for ``sku_list_ttl``
+        seconds, so matching ETags are answered without a query.
+
+        Args:
+            fetch: Loads the SKU list from the database
+
+        Returns:
+            Tuple of SKU IDs and quoted ETag
+        """
+        cached = self.cache.get(NAMESPACE, "sku_list")
+        if cached is not None:
+            sku_ids, etag = orjson.loads(cached)
+            return sku_ids, etag
+
+        sku_ids = fetch()
+        etag = f'"{hashlib.sha1(chr(0).join(sku_ids).encode()).hexdigest()}"'
+        # An empty list is what the client returns on errors; do not keep it
+        if sku_ids:
+            self.cache.set(NAMESPACE, "sku_list", orjson.dumps([sku_ids, etag]), ttl=self.sku_list_ttl)
+        return sku_ids, etag
+
+
+# Global instance
+data_versions = DataVersions()
+supabase_client.add_ingest_listener(data_versions.on_ingest)
@@ -0,0 +1,288 @@
+"""Per-SKU feature store.
+
+This module keeps running aggregates of each SKU's sales history: counts,
+sums, a rolling window of the most recent records, trend, last temperature
+and temperature elasticity. Aggregates are updated incrementally as rows
+are ingested and read in constant time by forecast prompt builders.
+
+A SKU is seeded from the history its first reader fetched, e.g. the last
+52 records for a forecast, so its aggregates cover that history plus rows
+ingested since. Each worker process keeps its own store; the SKU's sales
+version in ``data_versions`` tells a worker that another one ingested
+rows for it, and the SKU is then reseeded from the next fetched history.
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import supabase_client
+from app.services.data_versions import DataVersions, data_versions, SALES
+
+
+# Records kept for rolling means: last 7 vs the 7 before them
+ROLLING_WINDOW = 14
+
+
+def _quantity(row: Dict[str, Any]) -> float:
+    """Sales quantity of a record, accepting the legacy ``units_sold`` key."""
+    return float(row.get("sales_quantity", row.get("units_sold", 0)) or 0)
+
+
+class SkuFeatures:
+    """Running aggregates for one SKU."""
+
+    __slots__ = (
+        "count", "total_units", "sum_sq_units", "min_units", "max_units",
+        "temp_count", "sum_temp", "sum_temp_sq", "sum_temp_units", "sum_units_with_temp",
+        "last_temp", "last_temp_date", "first_date", "last_date", "window"
+    )
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self.count = 0
+        self.total_units = 0.0
+        self.sum_sq_units = 0.0
+        self.min_units: Optional[float] = None
+        self.max_units: Optional[float] = None
+        # Sums over records with a temperature, for mean and elasticity
+        self.temp_count = 0
+        self.sum_temp = 0.0
+        self.sum_temp_sq = 0.0
+        self.sum_temp_units = 0.0
+        self.sum_units_with_temp = 0.0
+        self.last_temp: Optional[float] = None
+        self.last_temp_date = ""
+        self.first_date = ""
+        self.last_date = ""
+        # Most recent records as (date, quantity), oldest first
+        self.window: List[Tuple[str, float]] = []
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Fold one sales record into the aggregates."""
+        row_date = str(row.get("date") or "")[:10]
+        qty = _quantity(row)
+
+        self.count += 1
+        self.total_units += qty
+        self.sum_sq_units += qty * qty
+        self.min_units = qty if self.min_units is None else min(self.min_units, qty)
+        self.max_units = qty if self.max_units is None else max(self.max_units, qty)
+
+        if row_date:
+            self.first_date = min(self.first_date, row_date) if self.first_date else row_date
+            self.last_date = max(self.last_date, row_date)
+            # Rows may arrive out of order; only keep the most recent ones
+            if len(self.window) < ROLLING_WINDOW or row_date > self.window[0][0]:
+                bisect.insort(self.window, (row_date, qty))
+                if len(self.window) > ROLLING_WINDOW:
+                    self.window.pop(0)
+
+        temp = row.get("avg_temp")
+        if temp is not None:
+            temp = float(temp)
+            self.temp_count += 1
+            self.sum_temp += temp
+            self.sum_temp_sq += temp * temp
+            self.sum_temp_units += temp * qty
+            self.sum_units_with_temp += qty
+            if row_date >= self.last_temp_date:
+                self.last_temp = temp
+                self.last_temp_date = row_date
+
+    def summary(self) -> Dict[str, Any]:
+        """Derive features from the aggregates.
+
+        Returns:
+            Dictionary with count, total_units, avg_units, min_units,
+            max_units, std_units, rolling_7, rolling_14, trend_pct, avg_temp,
+            last_temp, temp_elasticity, first_date and last_date
+        """
+        if not self.count:
+            return FeatureStore.empty_summary()
+
+        avg_units = self.total_units / self.count
+        variance = max(self.sum_sq_units / self.count - avg_units ** 2, 0.0)
+
+        recent = [qty for _, qty in self.window[-7:]]
+        older = [qty for _, qty in self.window[:-7]]
+        rolling_7 = sum(recent) / len(recent) if recent else None
+        rolling_14 = sum(qty for _, qty in self.window) / len(self.window) if self.window else None
+
+        trend_pct = None
+        if recent and older:
+            older_avg = sum(older) / len(older)
+            if older_avg:
+                trend_pct = (rolling_7 - older_avg) / older_avg * 100
+
+        # Least-squares slope of quantity on temperature
+        elasticity = None
+        if self.temp_count >= 2:
+            temp_var = self.temp_count * self.sum_temp_sq - self.sum_temp ** 2
+            if temp_var > 1e-9:
+                elasticity = (
+                    self.temp_count * self.sum_temp_units - self.sum_temp * self.sum_units_with_temp
+                ) / temp_var
+
+        return {
+            "count": self.count,
+            "total_units": _as_number(self.total_units),
+            "avg_units": avg_units,
+            "min_units": _as_number(self.min_units),
+            "max_units": _as_number(self.max_units),
+            "std_units": variance ** 0.5,
+            "rolling_7": rolling_7,
+            "rolling_14": rolling_14,
+            "trend_pct": trend_pct,
+            "avg_temp": self.sum_temp / self.temp_count if self.temp_count else None,
+            "last_temp": self.last_temp,
+            "temp_elasticity": elasticity,
+            "first_date": self.first_date or None,
+            "last_date": self.last_date or None
+        }
+
+
+def _as_number(value: float):
+    """Show whole quantities as ints, as they appear in the source data."""
+    return int(value) if float(value).is_integer() else value
+
+
+class FeatureStore:
+    """In-memory store of per-SKU features updated on ingest."""
+
+    def __init__(self, versions: Optional[DataVersions] = None):
+        """Initialize feature store.
+
+        Args:
+            versions: Shared sales versions; defaults to the global data versions
+        """
+        self.versions = versions or data_versions
+        self._features: Dict[str, SkuFeatures] = {}
+        # Sales version each SKU's aggregates reflect
+        self._seen_versions: Dict[str, int] = {}
+        # Rows ingested for SKUs not yet seeded from fetched history;
+        # their aggregates cover these rows only until the next seed
+        self._unseeded: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        app_logger.info("FeatureStore initialized")
+
+    @staticmethod
+    def empty_summary() -> Dict[str, Any]:
+        """Features of a SKU without history."""
+        return {
+            "count": 0,
+            "total_units": 0,
+            "avg_units": 0.0,
+            "min_units": 0,
+            "max_units": 0,
+            "std_units": 0.0,
+            "rolling_7": None,
+            "rolling_14": None,
+            "trend_pct": None,
+            "avg_temp": None,
+            "last_temp": None,
+            "temp_elasticity": None,
+            "first_date": None,
+            "last_date": None
+        }
+
+    def update(self, rows: List[Dict[str, Any]]) -> int:
+        """Fold newly ingested sales rows into the per-SKU aggregates.
+
+        Rows of SKUs not yet seeded from history are also kept, so the next
+        ``features_for`` can seed from fetched history and re-apply them.
+        When the SKU's sales version moved by exactly this ingest, the
+        aggregates are marked current; otherwise another worker also
+        ingested rows and the next read reseeds the SKU.
+
+        Args:
+            rows: Sales records with sku_id, date, sales_quantity and avg_temp
+
+        Returns:
+            Number of rows applied
+        """
+        sku_ids = {row["sku_id"] for row in rows if row.get("sku_id")}
+        # The data versions listener runs first and bumps each SKU once
+        versions = {sku_id: self.versions.version(SALES, sku_id) for sku_id in sku_ids}
+
+        applied = 0
+        with self._lock:
+            for row in rows:
+                sku_id = row.get("sku_id")
+                if not sku_id:
+                    continue
+                if sku_id not in self._features or sku_id in self._unseeded:
+                    self._unseeded.setdefault(sku_id, []).append(row)
+                self._features.setdefault(sku_id, SkuFeatures()).add(row)
+                applied += 1
+            for sku_id, version in versions.items():
+                if self._seen_versions.get(sku_id) == version - 1:
+                    self._seen_versions[sku_id] = version
+        return applied
+
+    def get(self, sku_id: str) -> Optional[Dict[str, Any]]:
+        """Features of a SKU, or None if the store has not seen it."""
+        with self._lock:
+            features = self._features.get(sku_id)
+            return features.summary() if features else None
+
+    def features_for(self, sku_id: str, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Features of a SKU, seeding the store from fetched history if needed.
+
+        The store is in-memory, so after a restart SKUs are seeded from the
+        first history fetched for them and then maintained incrementally.
+        A SKU only known from ingested rows is seeded from the history too;
+        ingested rows of dates missing from it are applied on top. A SKU
+        whose sales version changed in another worker is reseeded.
+
+        Args:
+            sku_id: SKU identifier
+            historical_data: History already loaded by the caller
+
+        Returns:
+            Feature dictionary, see ``SkuFeatures.summary``
+        """
+        version = self.versions.version(SALES, sku_id)
+
+        def current() -> bool:
+            return sku_id not in self._unseeded and self._seen_versions.get(sku_id) == version
+
+        with self._lock:
+            features = self._features.get(sku_id)
+            if features is not None and (current() or not historical_data):
+                return features.summary()
+
+        if not historical_data:
+            return self.empty_summary()
+
+        with self._lock:
+            if sku_id not in self._features or not current():
+                seeded = SkuFeatures()
+                for row in historical_data:
+                    seeded.add(row)
+                # The fetched history may predate rows ingested since
+                history_dates = {str(row.get("date"))[:10] for row in historical_data}
+                for row in self._unseeded.pop(sku_id, []):
+                    if str(row.get("date"))[:10] not in history_dates:
+                        seeded.add(row)
+                self._features[sku_id] = seeded
+                self._seen_versions[sku_id] = version
+            return self._features[sku_id].summary()
+
+    def invalidate(self, sku_id: Optional[str] = None) -> None:
+        """Drop features of one SKU, or of all SKUs."""
+        with self._lock:
+            if sku_id is None:
+                self._features.clear()
+                self._seen_versions.clear()
+                self._unseeded.clear()
+            else:
+                self._features.pop(sku_id, None)
+                self._seen_versions.pop(sku_id, None)
+                self._unseeded.pop(sku_id, None)
+
+
+# Global instance
+feature_store = FeatureStore()
+supabase_client.add_ingest_listener(feature_store.update)
@@ -0,0 +1,84 @@
+"""Cache for GigaChat forecast answers.
+
+This module keeps recent GigaChat answers so that a request which fell
+back to the local model can be served by the LLM result next time. A
+SKU's answers are dropped when new sales for it are ingested. The
+answers live in the shared cache, so every worker process can serve an
+answer obtained by any of them.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.utils.logger import app_logger
+from app.models.schemas import GigaChatResponse
+from app.services.supabase_client import supabase_client
+from app.services.shared_cache import SharedCache, shared_cache
+
+
+CacheKey = Tuple[str, int, str]
+
+NAMESPACE = "forecasts"
+
+
+class ForecastCache:
+    """TTL cache of GigaChat responses keyed by SKU, period and context."""
+
+    def __init__(self, cache: Optional[SharedCache] = None):
+        """Initialize forecast cache.
+
+        Args:
+            cache: Store for the answers; defaults to the shared cache
+        """
+        self.cache = cache or shared_cache
+        self.ttl = float(os.getenv("FORECAST_CACHE_TTL", 3600))
+        app_logger.info(f"ForecastCache initialized (ttl: {self.ttl}s)")
+
+    @staticmethod
+    def make_key(sku_id: str, forecast_period: int, context: Optional[str] = None) -> CacheKey:
+        """Build cache key for a forecast request."""
+        return sku_id, forecast_period, (context or "").strip()
+
+    @staticmethod
+    def _storage_key(key: CacheKey) -> str:
+        """Shared cache key; starts with the SKU so a SKU can be dropped by prefix."""
+        return orjson.dumps(list(key)).decode()
+
+    @staticmethod
+    def _sku_prefix(sku_id: str) -> str:
+        """Common prefix of the storage keys of one SKU."""
+        return orjson.dumps([sku_id]).decode()[:-1] + ","
+
+    def get(self, key: CacheKey) -> Optional[GigaChatResponse]:
+        """Get a cached response if it has not expired."""
+        value = self.cache.get(NAMESPACE, self._storage_key(key))
+        return GigaChatResponse.model_validate_json(value) if value is not None else None
+
+    def set(self, key: CacheKey, response: GigaChatResponse) -> None:
+        """Store a response for ``ttl`` seconds."""
+        self.cache.set(NAMESPACE, self._storage_key(key), response.model_dump_json().encode(), ttl=self.ttl)
+
+    def invalidate_sku(self, sku_id: str) -> None:
+        """Drop all cached responses for a SKU."""
+        self.cache.delete_prefix(NAMESPACE, self._sku_prefix(sku_id))
+
+    def on_ingest(self, rows: List[Dict[str, Any]]) -> int:
+        """Ingest listener: drop cached answers of SKUs with new sales.
+
+        Args:
+            rows: Sales records just written
+
+        Returns:
+            Number of SKUs invalidated
+        """
+        sku_ids = {row["sku_id"] for row in rows if row.get("sku_id")}
+        for sku_id in sku_ids:
+            self.invalidate_sku(sku_id)
+        return len(sku_ids)
+
+
+# Global instance
+forecast_cache = ForecastCache()
+supabase_client.add_ingest_listener(forecast_cache.on_ingest)
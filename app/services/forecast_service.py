@@ -4,17 +4,25 @@ This module coordinates forecast generation by integrating historical data
 retrieval, GigaChat API calls, and forecast storage.
 """
 
-import json
+import asyncio
+import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 from app.utils.logger import app_logger
 from app.models.schemas import (
     ForecastRequest, ForecastResponse, ForecastResult,
-    ForecastHistoryResponse, ForecastHistoryItem
+    BatchForecastRequest, GigaChatResponse
 )
-from app.services.supabase_client import supabase_client
+from app.services.supabase_client import ForecastId, supabase_client
 from app.services.gigachat_service import gigachat_service
+from app.services.forecast_cache import forecast_cache, ForecastCache, CacheKey
+from app.services.local_model import local_model
+from app.services.matrix_forecast import forecast_catalog
+from app.services.accuracy_service import accuracy_service
+from app.services.write_behind import WriteBehindQueue
+from app.services.climatology import climatology
+from app.services.data_versions import data_versions, FORECASTS
 
 
 class ForecastService:
@@ -22,7 +30,83 @@ class ForecastService:
 
     def __init__(self):
         """Initialize forecast service."""
-        app_logger.info("ForecastService initialized")
+        # Seconds /forecast waits for GigaChat before answering with the local model
+        self.latency_budget = float(os.getenv("FORECAST_LATENCY_BUDGET", 8.0))
+
+        # In-flight GigaChat calls, shared by concurrent requests for the same key
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+
+        # Background persistence; started and drained by the app lifespan
+        self.writer = WriteBehindQueue("forecasts", self._persist_forecasts)
+
+        app_logger.info(f"ForecastService initialized (latency_budget: {self.latency_budget}s)")
+
+    async def _llm_forecast_and_cache(
+        self,
+        key: CacheKey,
+        historical_data: List[Dict[str, Any]],
+        context: Optional[str]
+    ) -> GigaChatResponse:
+        """Call GigaChat and cache a successful answer."""
+        sku_id, forecast_period, _ = key
+        try:
+            response = await gigachat_service.generate_forecast(
+                sku_id=sku_id,
+                historical_data=historical_data,
+                forecast_period=forecast_period,
+                context=context
+            )
+            if response.generated_by_gigachat:
+                forecast_cache.set(key, response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _hedged_forecast(
+        self,
+        sku_id: str,
+        historical_data: List[Dict[str, Any]],
+        forecast_period: int,
+        context: Optional[str],
+        latency_budget: float
+    ) -> GigaChatResponse:
+        """Get a GigaChat answer within the latency budget, or a local one.
+
+        A cached GigaChat answer is returned immediately. Otherwise GigaChat is
+        called in a background task; if it does not finish within the budget
+        the local model answers and the task keeps running to fill the cache
+        for the next request.
+
+        Args:
+            sku_id: SKU identifier
+            historical_data: Sales records for the SKU
+            forecast_period: Number of days to forecast
+            context: Optional free-text context
+            latency_budget: Seconds to wait for GigaChat
+
+        Returns:
+            GigaChat, cached or local-model forecast answer
+        """
+        key = ForecastCache.make_key(sku_id, forecast_period, context)
+
+        cached = forecast_cache.get(key)
+        if cached is not None:
+            app_logger.info(f"Using cached GigaChat forecast for SKU: {sku_id}")
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._llm_forecast_and_cache(key, historical_data, context))
+            self._inflight[key] = task
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=latency_budget)
+        except asyncio.TimeoutError:
+            app_logger.warning(
+                f"GigaChat did not answer within {latency_budget:.1f}s for SKU {sku_id}, "
+                f"using local model"
+            )
+            return local_model.forecast(sku_id, historical_data, forecast_period)
 
     def _convert_gigachat_predictions_to_results(
         self,
@@ -58,7 +142,12 @@ class ForecastService:
                         float(pred.get('predicted_temp'))
                         if pred.get('predicted_temp') is not None and str(pred.get('predicted_temp')).strip() != ""
                         else None
-                    )
+                    ),
+                    **{
+                        key: int(pred[key])
+                        for key in ("p10", "p50", "p90")
+                        if pred.get(key) is not None
+                    }
                 )
                 results.append(result)
 
@@ -68,6 +157,148 @@ class ForecastService:
 
         return results
 
+    def _build_forecast_response(
+        self,
+        sku_id: str,
+        forecast_period: int,
+        gigachat_response: GigaChatResponse,
+        historical_data: List[Dict[str, Any]]
+    ) -> ForecastResponse:
+        """Turn a GigaChat answer into a ForecastResponse.
+
+        Args:
+            sku_id: SKU identifier
+            forecast_period: Number of forecast days
+            gigachat_response: Raw model answer
+            historical_data: History used for temperature fallback
+
+        Returns:
+            Forecast response with predictions, totals and averages
+
+        Raises:
+            ValueError: If the answer contains no valid predictions
+        """
+        # Convert predictions to ForecastResult objects
+        predictions = self._convert_gigachat_predictions_to_results(
+            gigachat_response.predictions
+        )
+
+        # Fill temperatures GigaChat did not provide from day-of-year normals
+        for pred in predictions:
+            if pred.predicted_temp is None:
+                pred.predicted_temp = climatology.temperature_for(pred.date)
+
+        if not predictions:
+            app_logger.error("No valid predictions generated")
+            raise ValueError("Failed to generate valid predictions")
+
+        # Calculate totals and averages
+        total_predicted_sales = sum(pred.predicted_sales for pred in predictions)
+        average_confidence = sum(pred.confidence for pred in predictions) / len(predictions)
+
+        return ForecastResponse(
+            sku_id=sku_id,
+            forecast_period=forecast_period,
+            predictions=predictions,
+            total_predicted_sales=total_predicted_sales,
+            average_confidence=average_confidence,
+            model_explanation=gigachat_response.explanation,
+            generated_by_gigachat=gigachat_response.generated_by_gigachat,
+            forecast_model=gigachat_response.forecast_model
+        )
+
+    def _forecast_header(self, forecast_response: ForecastResponse) -> Dict[str, Any]:
+        """Header row of a forecast; daily predictions go to their own table."""
+        return {
+            'sku_id': forecast_response.sku_id,
+            'forecast_date': forecast_response.predictions[0].date if forecast_response.predictions else None,
+            'predicted_sales': forecast_response.total_predicted_sales,
+            'confidence_score': forecast_response.average_confidence,
+            'key_factors': [forecast_response.forecast_model, f"period_{forecast_response.forecast_period}"]
+        }
+
+    def _persist_forecast(self, forecast_response: ForecastResponse) -> ForecastId:
+        """Write one forecast and its daily predictions.
+
+        Args:
+            forecast_response: Forecast to store
+
+        Returns:
+            Database ID of the stored forecast
+        """
+        accuracy_service.register_forecast(forecast_response)
+        forecast_id = supabase_client.insert_forecast(self._forecast_header(forecast_response))
+        app_logger.info(f"Forecast saved with ID: {forecast_id}")
+        supabase_client.insert_forecast_predictions(
+            forecast_id,
+            forecast_response.sku_id,
+            [pred.dict() for pred in forecast_response.predictions],
+            forecast_model=forecast_response.forecast_model
+        )
+        data_versions.bump(FORECASTS, [forecast_response.sku_id])
+        return forecast_id
+
+    def _persist_forecasts(self, items: List[Dict[str, Any]]) -> List[ForecastId]:
+        """Write a batch of forecasts with one header and one predictions request.
+
+        The write-behind queue retries a failed batch with the same items.
+        Each item keeps the ID of its stored header, so a retry after a
+        failed predictions insert writes only the predictions instead of a
+        second set of headers. Accuracy tracking and the data version bump
+        happen here too, keeping their shared-cache writes off the event loop.
+
+        Args:
+            items: Queued ``{"forecast": ForecastResponse, "forecast_id": None}``
+                entries taken from the write-behind queue
+
+        Returns:
+            Database IDs of the stored forecasts
+        """
+        unsaved = [item for item in items if item["forecast_id"] is None]
+        for item in unsaved:
+            # Idempotent: a newer registration replaces the same pending days
+            accuracy_service.register_forecast(item["forecast"])
+        if unsaved:
+            forecast_ids = supabase_client.insert_forecasts(
+                [self._forecast_header(item["forecast"]) for item in unsaved]
+            )
+            for item, forecast_id in zip(unsaved, forecast_ids):
+                item["forecast_id"] = forecast_id
+
+        rows = []
+        for item in items:
+            forecast_response = item["forecast"]
+            rows.extend(supabase_client.format_prediction_rows(
+                item["forecast_id"],
+                forecast_response.sku_id,
+                [pred.dict() for pred in forecast_response.predictions],
+                forecast_model=forecast_response.forecast_model
+            ))
+        supabase_client.insert_prediction_rows(rows)
+        data_versions.bump(FORECASTS, [item["forecast"].sku_id for item in items])
+
+        app_logger.info(f"Saved batch of {len(items)} forecasts")
+        return [item["forecast_id"] for item in items]
+
+    def _save_forecast(self, forecast_response: ForecastResponse) -> Optional[ForecastId]:
+        """Persist a generated forecast.
+
+        When the write-behind queue is running the forecast is queued and
+        written, and registered for accuracy tracking, in the background;
+        otherwise both happen immediately.
+
+        Args:
+            forecast_response: Forecast to store
+
+        Returns:
+            Database ID of the stored forecast, or None if it was queued
+        """
+        if self.writer.running:
+            self.writer.submit({"forecast": forecast_response, "forecast_id": None})
+            return None
+
+        return self._persist_forecast(forecast_response)
+
     async def generate_forecast(self, request: ForecastRequest) -> ForecastResponse:
         """Generate sales forecast for a specific SKU.
 
@@ -90,79 +321,26 @@ class ForecastService:
             if not historical_data:
                 app_logger.warning(f"No historical data found for SKU: {request.sku_id}")
 
-            # Generate forecast using GigaChat
+            # Generate forecast using GigaChat, bounded by the latency budget
             forecast_period = int(request.period.value)
-            gigachat_response = await gigachat_service.generate_forecast(
+            gigachat_response = await self._hedged_forecast(
                 sku_id=request.sku_id,
                 historical_data=historical_data,
                 forecast_period=forecast_period,
-                context=request.context
+                context=request.context,
+                latency_budget=request.latency_budget or self.latency_budget
             )
 
-            # Convert predictions to ForecastResult objects
-            predictions = self._convert_gigachat_predictions_to_results(
-                gigachat_response.predictions
-            )
-
-            # Fallback temperature generation if GigaChat did not provide it
-            if any(pred.predicted_temp is None for pred in predictions):
-                # Base temperature: use last historical avg_temp or default -15°C
-                base_temp = -15.0
-                for row in historical_data:
-                    if row.get("avg_temp") is not None:
-                        base_temp = float(row["avg_temp"])
-                        break
-
-                for idx, pred in enumerate(predictions):
-                    if pred.predicted_temp is None:
-                        # Simple seasonal assumption: gradual warming
-                        pred.predicted_temp = round(base_temp + idx * 0.5, 1)
-
-            if not predictions:
-                app_logger.error("No valid predictions generated")
-                raise ValueError("Failed to generate valid predictions")
-
-            # Calculate totals and averages
-            total_predicted_sales = sum(pred.predicted_sales for pred in predictions)
-            average_confidence = sum(pred.confidence for pred in predictions) / len(predictions)
-
-            # Create forecast response
-            forecast_response = ForecastResponse(
-                sku_id=request.sku_id,
-                forecast_period=forecast_period,
-                predictions=predictions,
-                total_predicted_sales=total_predicted_sales,
-                average_confidence=average_confidence,
-                model_explanation=gigachat_response.explanation,
-                generated_by_gigachat=not gigachat_service.mock_mode
+            forecast_response = self._build_forecast_response(
+                request.sku_id, forecast_period, gigachat_response, historical_data
             )
 
             # Save forecast to database
-            # Convert predictions to JSON-serializable format
-            predictions_json = []
-            for pred in predictions:
-                pred_dict = pred.dict()
-                if 'date' in pred_dict:
-                    pred_dict['date'] = pred_dict['date'].isoformat() if hasattr(pred_dict['date'], 'isoformat') else str(pred_dict['date'])
-                # Ensure predicted_temp serialized even if None is now filled
-                predictions_json.append(pred_dict)
-
-            forecast_data = {
-                'sku_id': request.sku_id,
-                'forecast_period': forecast_period,
-                'predictions': json.dumps(predictions_json),
-                'total_predicted_sales': total_predicted_sales,
-                'average_confidence': average_confidence,
-                'model_explanation': gigachat_response.explanation
-            }
-
-            forecast_id = supabase_client.insert_forecast(forecast_data)
-            app_logger.info(f"Forecast saved with ID: {forecast_id}")
+            self._save_forecast(forecast_response)
 
             # Log first 3 predictions after all processing (including temp fallback)
-            if predictions:
-                sample_preds = predictions[:3]
-                app_logger.debug(f"Sample predictions: {[p.dict() for p in sample_preds]}")
+            sample_preds = forecast_response.predictions[:3]
+            app_logger.debug(f"Sample predictions: {[p.dict() for p in sample_preds]}")
 
             return forecast_response
 
@@ -172,6 +350,166 @@ class ForecastService:
             # Return fallback forecast
             return self._generate_fallback_forecast(request)
 
+    def stream_forecast(self, request: ForecastRequest) -> Iterator[Tuple[str, Any]]:
+        """Generate a forecast and emit predictions as they arrive.
+
+        Blocking generator; meant to be iterated from a worker thread
+        (e.g. by a Starlette StreamingResponse).
+
+        Args:
+            request: Forecast request parameters
+
+        Yields:
+            ``("prediction", ForecastResult)`` for each day, then
+            ``("complete", ForecastResponse)`` once the forecast is saved
+        """
+        app_logger.info(f"Streaming forecast for SKU: {request.sku_id}, period: {request.period}")
+
+        forecast_period = int(request.period.value)
+        try:
+            historical_data = supabase_client.get_sales_data(sku_id=request.sku_id, limit=52)
+        except Exception as e:
+            app_logger.error(f"Error loading history for SKU {request.sku_id}: {e}")
+            historical_data = []
+
+        predictions: List[ForecastResult] = []
+        gigachat_response = None
+
+        for kind, payload in gigachat_service.stream_forecast(
+            sku_id=request.sku_id,
+            historical_data=historical_data,
+            forecast_period=forecast_period,
+            context=request.context
+        ):
+            if kind == "complete":
+                gigachat_response = payload
+                continue
+
+            results = self._convert_gigachat_predictions_to_results([payload])
+            if not results:
+                continue
+
+            prediction = results[0]
+            if prediction.predicted_temp is None:
+                prediction.predicted_temp = climatology.temperature_for(prediction.date)
+            predictions.append(prediction)
+            yield "prediction", prediction
+
+        if not predictions:
+            forecast_response = self._generate_fallback_forecast(request)
+            for prediction in forecast_response.predictions:
+                yield "prediction", prediction
+            yield "complete", forecast_response
+            return
+
+        forecast_response = ForecastResponse(
+            sku_id=request.sku_id,
+            forecast_period=forecast_period,
+            predictions=predictions,
+            total_predicted_sales=sum(pred.predicted_sales for pred in predictions),
+            average_confidence=sum(pred.confidence for pred in predictions) / len(predictions),
+            model_explanation=gigachat_response.explanation if gigachat_response else None,
+            generated_by_gigachat=gigachat_response.generated_by_gigachat if gigachat_response else False,
+            forecast_model=gigachat_response.forecast_model if gigachat_response else "mock"
+        )
+
+        try:
+            self._save_forecast(forecast_response)
+        except Exception as e:
+            app_logger.error(f"Error saving streamed forecast: {e}")
+
+        yield "complete", forecast_response
+
+    async def generate_forecasts_batch(self, request: BatchForecastRequest) -> List[ForecastResponse]:
+        """Generate forecasts for several SKUs using batched GigaChat prompts.
+
+        Args:
+            request: Batch forecast request parameters
+
+        Returns:
+            Forecast responses in the order of ``request.sku_ids``
+        """
+        # Preserve order but drop duplicate SKU IDs
+        sku_ids = list(dict.fromkeys(request.sku_ids))
+        forecast_period = int(request.period.value)
+
+        app_logger.info(f"Generating batch forecast for {len(sku_ids)} SKUs, period: {request.period}")
+
+        if request.model == "matrix":
+            # Paged reads, the NumPy fit and the saves block; keep them off the event loop
+            forecasts = await asyncio.to_thread(self.generate_catalog_forecasts, forecast_period, sku_ids)
+            return list(forecasts.values())
+
+        histories: Dict[str, List[Dict[str, Any]]] = {}
+        for sku_id in sku_ids:
+            try:
+                histories[sku_id] = supabase_client.get_sales_data(sku_id=sku_id, limit=52)
+            except Exception as e:
+                app_logger.error(f"Error loading history for SKU {sku_id}: {e}")
+                histories[sku_id] = []
+
+        gigachat_responses = await gigachat_service.generate_forecasts_batch(
+            histories=histories,
+            forecast_period=forecast_period,
+            context=request.context
+        )
+
+        forecasts = []
+        for sku_id in sku_ids:
+            try:
+                forecast_response = self._build_forecast_response(
+                    sku_id, forecast_period, gigachat_responses[sku_id], histories[sku_id]
+                )
+                self._save_forecast(forecast_response)
+            except Exception as e:
+                app_logger.error(f"Error building forecast for SKU {sku_id}: {e}")
+                forecast_response = self._generate_fallback_forecast(
+                    ForecastRequest(sku_id=sku_id, period=request.period, context=request.context)
+                )
+            forecasts.append(forecast_response)
+
+        return forecasts
+
+    def generate_catalog_forecasts(
+        self,
+        forecast_period: int,
+        sku_ids: Optional[List[str]] = None,
+        save: bool = True
+    ) -> Dict[str, ForecastResponse]:
+        """Forecast many SKUs at once with the matrix engine.
+
+        History is loaded with one paged query and all SKUs are fitted and
+        forecast in a single vectorized call, so this is suitable both for
+        the batch endpoint and for precomputing the whole catalog.
+
+        Args:
+            forecast_period: Number of days to forecast
+            sku_ids: SKUs to forecast, or None for every SKU with history
+            save: Whether to persist each forecast
+
+        Returns:
+            Forecast responses keyed by SKU, in the order of ``sku_ids``
+        """
+        history = supabase_client.get_sales_history(sku_ids=sku_ids)
+        catalog = forecast_catalog(history, forecast_period)
+
+        forecasts: Dict[str, ForecastResponse] = {}
+        for sku_id in (sku_ids if sku_ids is not None else list(catalog.sku_ids)):
+            # SKUs without history get the local model's default daily rate
+            answer = (
+                catalog.to_gigachat_response(sku_id) if sku_id in catalog
+                else local_model.forecast(sku_id, [], forecast_period)
+            )
+            forecast_response = self._build_forecast_response(sku_id, forecast_period, answer, [])
+            if save:
+                try:
+                    self._save_forecast(forecast_response)
+                except Exception as e:
+                    app_logger.error(f"Error saving catalog forecast for SKU {sku_id}: {e}")
+            forecasts[sku_id] = forecast_response
+
+        return forecasts
+
     def _generate_fallback_forecast(self, request: ForecastRequest) -> ForecastResponse:
         """Generate a simple fallback forecast when main generation fails.
 
@@ -202,7 +540,8 @@ class ForecastService:
             prediction = ForecastResult(
                 date=prediction_date.date(),
                 predicted_sales=max(1, int(base_units * variation)),
-                confidence=0.6  # Lower confidence for fallback
+                confidence=0.6,  # Lower confidence for fallback
+                predicted_temp=climatology.temperature_for(prediction_date)
             )
             predictions.append(prediction)
 
@@ -217,88 +556,10 @@ class ForecastService:
             total_predicted_sales=total_predicted_sales,
             average_confidence=average_confidence,
             model_explanation="Базовый прогноз сгенерирован системой (основная модель недоступна)",
-            generated_by_gigachat=False
+            generated_by_gigachat=False,
+            forecast_model="fallback"
         )
 
-    def get_forecast_history(self, sku_id: str, limit: int = 10) -> ForecastHistoryResponse:
-        """Get forecast history for a specific SKU.
-
-        Args:
-            sku_id: SKU identifier
-            limit: Maximum number of forecasts to return
-
-        Returns:
-            Forecast history response
-        """
-        app_logger.info(f"Retrieving forecast history for SKU: {sku_id}")
-
-        try:
-            # Get forecast history from database
-            history_data = supabase_client.get_forecast_history(sku_id, limit)
-
-            # Convert to ForecastHistoryItem objects
-            forecasts = []
-            for item in history_data:
-                forecast_item = ForecastHistoryItem(
-                    id=item['id'],
-                    sku_id=item['sku_id'],
-                    forecast_period=item['forecast_period'],
-                    generated_at=item['generated_at'],
-                    total_predicted_units=item['total_predicted_units'],
-                    total_predicted_revenue=item['total_predicted_revenue'],
-                    average_confidence=item['average_confidence'],
-                    model_explanation=item.get('model_explanation')
-                )
-                forecasts.append(forecast_item)
-
-            return ForecastHistoryResponse(
-                sku_id=sku_id,
-                forecasts=forecasts,
-                total_count=len(forecasts)
-            )
-
-        except Exception as e:
-            app_logger.error(f"Error retrieving forecast history: {e}")
-
-            # Return empty history
-            return ForecastHistoryResponse(
-                sku_id=sku_id,
-                forecasts=[],
-                total_count=0
-            )
-
-    def get_sales_data(self, sku_id: str, limit: int = 52) -> Dict[str, Any]:
-        """Get sales data for a specific SKU.
-
-        Args:
-            sku_id: SKU identifier
-            limit: Maximum number of records to return
-
-        Returns:
-            Sales data response
-        """
-        app_logger.info(f"Retrieving sales data for SKU: {sku_id}")
-
-        try:
-            # Get sales data from database
-            sales_data = supabase_client.get_sales_data(sku_id, limit)
-
-            return {
-                'sku_id': sku_id,
-                'data': sales_data,
-                'total_records': len(sales_data)
-            }
-
-        except Exception as e:
-            app_logger.error(f"Error retrieving sales data: {e}")
-
-            # Return empty data
-            return {
-                'sku_id': sku_id,
-                'data': [],
-                'total_records': 0
-            }
-
 
 # Global instance
 forecast_service = ForecastService()
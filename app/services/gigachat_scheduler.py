@@ -0,0 +1,255 @@
+"""Request scheduler for GigaChat API calls.
+
+This module throttles outgoing GigaChat requests with a token bucket,
+caps the number of concurrent calls, serves interactive requests ahead of
+batch jobs and backs off adaptively when GigaChat answers with 429.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from app.utils.logger import app_logger
+
+
+# Priority lanes: lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+LANE_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BATCH: "batch"
+}
+
+
+class SchedulerTimeoutError(TimeoutError):
+    """Raised when a request waits in the queue longer than allowed."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens accumulated since the last update."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket if available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds until they will be available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate, keeping the tokens accumulated so far."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class GigaChatScheduler:
+    """Central scheduler in front of GigaChat completion calls."""
+
+    def __init__(self):
+        """Initialize scheduler from environment configuration."""
+        self.max_rate = float(os.getenv("GIGACHAT_RATE_LIMIT_RPS", 1.0))
+        self.min_rate = float(os.getenv("GIGACHAT_MIN_RATE_RPS", 0.1))
+        self.max_concurrency = int(os.getenv("GIGACHAT_MAX_CONCURRENCY", 2))
+        self.queue_timeout = float(os.getenv("GIGACHAT_QUEUE_TIMEOUT", 30))
+        self.max_backoff = float(os.getenv("GIGACHAT_MAX_BACKOFF", 60))
+
+        self.bucket = TokenBucket(self.max_rate, float(os.getenv("GIGACHAT_RATE_LIMIT_BURST", 3)))
+
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._blocked_until = 0.0
+        self._consecutive_429 = 0
+
+        # Metrics
+        self._served: Dict[int, int] = {lane: 0 for lane in LANE_NAMES}
+        self._wait_total: Dict[int, float] = {lane: 0.0 for lane in LANE_NAMES}
+        self._wait_max: Dict[int, float] = {lane: 0.0 for lane in LANE_NAMES}
+        self._timeouts = 0
+        self._rate_limited = 0
+
+        app_logger.info(
+            f"GigaChatScheduler initialized (rate: {self.max_rate}/s, "
+            f"concurrency: {self.max_concurrency})"
+        )
+
+    def _acquire(self, priority: int, timeout: float) -> float:
+        """Block until the caller may send a request.
+
+        Returns:
+            Seconds spent waiting in the queue
+
+        Raises:
+            SchedulerTimeoutError: If no slot became available within ``timeout``
+        """
+        ticket = (priority, next(self._sequence))
+        started_at = time.monotonic()
+        deadline = started_at + timeout
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait_for = None
+
+                    if self._waiting[0] == ticket and self._active < self.max_concurrency:
+                        if now < self._blocked_until:
+                            wait_for = self._blocked_until - now
+                        else:
+                            wait_for = self.bucket.try_acquire()
+                            if wait_for == 0.0:
+                                heapq.heappop(self._waiting)
+                                self._active += 1
+                                break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._waiting.remove(ticket)
+                        heapq.heapify(self._waiting)
+                        self._timeouts += 1
+                        raise SchedulerTimeoutError(
+                            f"GigaChat request waited more than {timeout:.1f}s in the queue"
+                        )
+
+                    self._cond.wait(timeout=min(wait_for or remaining, remaining))
+            finally:
+                # Let the next waiter re-evaluate its position
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started_at
+        lane = priority if priority in LANE_NAMES else PRIORITY_BATCH
+        with self._cond:
+            self._served[lane] += 1
+            self._wait_total[lane] += waited
+            self._wait_max[lane] = max(self._wait_max[lane], waited)
+        return waited
+
+    def _release(self) -> None:
+        """Free a concurrency slot."""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> Iterator[float]:
+        """Hold a scheduler slot for the duration of one GigaChat request.
+
+        Args:
+            priority: Priority lane, PRIORITY_INTERACTIVE or PRIORITY_BATCH
+            timeout: Maximum queue wait in seconds, defaults to GIGACHAT_QUEUE_TIMEOUT
+
+        Yields:
+            Seconds spent waiting in the queue
+        """
+        waited = self._acquire(priority, self.queue_timeout if timeout is None else timeout)
+        try:
+            yield waited
+        finally:
+            self._release()
+
+    def report_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """Back off after a 429 response.
+
+        Pauses all lanes for ``Retry-After`` seconds (or an exponential delay
+        if the header is missing) and halves the request rate.
+
+        Args:
+            retry_after: Value of the Retry-After header in seconds, if any
+
+        Returns:
+            Seconds until requests are allowed again
+        """
+        with self._cond:
+            self._rate_limited += 1
+            self._consecutive_429 += 1
+
+            if retry_after is None:
+                retry_after = min(self.max_backoff, 2 ** self._consecutive_429)
+            delay = min(self.max_backoff, max(0.0, retry_after))
+
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+
+        app_logger.warning(
+            f"GigaChat rate limited, pausing for {delay:.1f}s "
+            f"(rate now {self.bucket.rate:.2f}/s)"
+        )
+        return delay
+
+    def report_success(self) -> None:
+        """Recover the request rate gradually after successful calls."""
+        with self._cond:
+            self._consecutive_429 = 0
+            if self.bucket.rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.max_rate * 0.1))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, wait time and throttling metrics.
+
+        Returns:
+            Dictionary with per-lane and global scheduler metrics
+        """
+        with self._cond:
+            depth = {name: 0 for name in LANE_NAMES.values()}
+            for priority, _ in self._waiting:
+                depth[LANE_NAMES.get(priority, "batch")] += 1
+
+            lanes = {}
+            for lane, name in LANE_NAMES.items():
+                served = self._served[lane]
+                lanes[name] = {
+                    "queue_depth": depth[name],
+                    "served": served,
+                    "avg_wait_seconds": round(self._wait_total[lane] / served, 4) if served else 0.0,
+                    "max_wait_seconds": round(self._wait_max[lane], 4)
+                }
+
+            return {
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "queue_depth": len(self._waiting),
+                "current_rate": round(self.bucket.rate, 4),
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+                "rate_limited": self._rate_limited,
+                "timeouts": self._timeouts,
+                "lanes": lanes
+            }
+
+
+# Global instance
+gigachat_scheduler = GigaChatScheduler()
@@ -7,16 +7,26 @@ sales forecasts based on historical data and context.
 import json
 import os
 import base64
+import hashlib
 import requests
 import urllib3
 import uuid
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import asyncio
 from dotenv import load_dotenv
 
 from app.utils.logger import app_logger
 from app.models.schemas import GigaChatResponse, ForecastResult
+from app.services.usage_service import usage_service
+from app.services.stream_parser import IncrementalPredictionParser
+from app.services.climatology import climatology
+from app.services.feature_store import feature_store
+from app.services.shared_cache import shared_cache
+from app.services.gigachat_scheduler import (
+    gigachat_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
 
 # Load environment variables
 load_dotenv()
@@ -41,6 +51,14 @@ class GigaChatService:
         self.auth_url = os.getenv("GIGACHAT_AUTH_URL", "https://ngw.devices.sberbank.ru:9443/api/v2/oauth")
         self.base_url = os.getenv("GIGACHAT_BASE_URL", "https://gigachat.devices.sberbank.ru/api/v1")
 
+        # Completion limits and multi-SKU batching
+        self.max_tokens = int(os.getenv("GIGACHAT_MAX_TOKENS", 2000))
+        self.prompt_history_rows = int(os.getenv("GIGACHAT_PROMPT_HISTORY_ROWS", 20))
+        self.max_retries = int(os.getenv("GIGACHAT_MAX_RETRIES", 3))
+        self.batch_size = int(os.getenv("GIGACHAT_BATCH_SIZE", 5))
+        # Rough completion cost of one predicted day in the keyed JSON answer
+        self.tokens_per_prediction = int(os.getenv("GIGACHAT_TOKENS_PER_PREDICTION", 40))
+
         # Determine if we're in mock mode
         self.mock_mode = not (self.legacy_credentials or (self.client_id and self.client_secret) or self.client_auth_key)
 
@@ -54,9 +72,13 @@ class GigaChatService:
 
         app_logger.info(f"GigaChatService initialized (mock_mode: {self.mock_mode})")
 
-        # Cache for access token
+        # Cache for access token; also kept in the shared cache so worker
+        # processes reuse one token, keyed by account so they never mix
         self._access_token = None
         self._token_expires_at = None
+        self._token_cache_key = hashlib.sha256(
+            f"{self.auth_url}|{self.scope}|{self.client_id}|{self.client_auth_key}".encode()
+        ).hexdigest()
 
         # Create session with SSL verification disabled
         self.session = requests.Session()
@@ -72,6 +94,14 @@ class GigaChatService:
             datetime.now() < self._token_expires_at):
             return self._access_token
 
+        # Another worker may already have obtained a token
+        shared = shared_cache.get("gigachat_token", self._token_cache_key)
+        if shared is not None:
+            token = json.loads(shared)
+            self._access_token = token["access_token"]
+            self._token_expires_at = datetime.fromtimestamp(token["expires_at"])
+            return self._access_token
+
         try:
             # Prepare OAuth request according to official Sber documentation
             if self.client_auth_key:
@@ -116,9 +146,9 @@ class GigaChatService:
                     app_logger.debug(f"Token response headers: {dict(response.headers)}")
 
                     if response.status_code == 429:
+                        gigachat_scheduler.report_rate_limited(self._retry_after_seconds(response))
                         if attempt < max_retries - 1:
                             app_logger.warning(f"Rate limited, retrying in {retry_delay} seconds... (attempt {attempt + 1}/{max_retries})")
-                            import time
                             time.sleep(retry_delay)
                             retry_delay *= 2  # Exponential backoff
                             continue
@@ -134,7 +164,6 @@ class GigaChatService:
                 except requests.exceptions.RequestException as e:
                     if attempt < max_retries - 1:
                         app_logger.warning(f"Request failed, retrying... (attempt {attempt + 1}/{max_retries}): {e}")
-                        import time
                         time.sleep(retry_delay)
                         retry_delay *= 2
                         continue
@@ -147,6 +176,14 @@ class GigaChatService:
             # Calculate expiration time (subtract 60 seconds for safety)
             expires_in = token_data.get("expires_in", 3600)
             self._token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+            shared_cache.set(
+                "gigachat_token", self._token_cache_key,
+                json.dumps({
+                    "access_token": self._access_token,
+                    "expires_at": self._token_expires_at.timestamp()
+                }).encode(),
+                ttl=expires_in - 60
+            )
 
             app_logger.info("Successfully obtained GigaChat access token")
             return self._access_token
@@ -156,6 +193,69 @@ class GigaChatService:
             app_logger.debug(f"Exception details: {type(e).__name__}: {str(e)}")
             raise
 
+    def health_check(self, timeout: float = 10) -> bool:
+        """Check that GigaChat accepts our credentials.
+
+        Gets an access token (usually cached) and lists the models, which
+        spends no completion tokens. Always True in mock mode.
+
+        Args:
+            timeout: Seconds to wait for the models list
+
+        Returns:
+            True if GigaChat answered without an error
+        """
+        if self.mock_mode:
+            return True
+
+        try:
+            response = self.session.get(
+                f"{self.base_url}/models",
+                headers={"Authorization": f"Bearer {self._get_access_token()}"},
+                timeout=timeout
+            )
+            return response.status_code < 400
+        except Exception as e:
+            app_logger.error(f"GigaChat health check failed: {e}")
+            return False
+
+    def _sku_features(self, sku_id: str, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Read SKU aggregates from the feature store.
+
+        Args:
+            sku_id: SKU identifier
+            historical_data: Fetched history, used to seed an unknown or stale SKU
+
+        Returns:
+            Feature dictionary with counts, averages, trend and temperatures
+        """
+        return feature_store.features_for(sku_id, historical_data)
+
+    def _format_summary(self, summary: Dict[str, Any]) -> str:
+        """Render history aggregates as a compact ``key=value`` line."""
+        def fmt(value: Optional[float], pattern: str = "{:.1f}") -> str:
+            return "NA" if value is None else pattern.format(value)
+
+        return (
+            f"n={summary['count']};sum={summary['total_units']};mean={fmt(summary['avg_units'])};"
+            f"min={summary['min_units']};max={summary['max_units']};"
+            f"trend={fmt(summary['trend_pct'], '{:+.0f}%')};"
+            f"t_mean={fmt(summary['avg_temp'])};t_last={fmt(summary['last_temp'])};"
+            f"dq_dt={fmt(summary.get('temp_elasticity'), '{:+.2f}')}"
+        )
+
+    def _format_history_table(self, historical_data: List[Dict[str, Any]]) -> str:
+        """Render the most recent records as a ``date,qty,temp`` table."""
+        lines = ["date,qty,temp"]
+        for row in historical_data[:self.prompt_history_rows]:
+            temp = row.get("avg_temp")
+            lines.append(
+                f"{row.get('date', '')},"
+                f"{row.get('sales_quantity', row.get('units_sold', 0)) or 0},"
+                f"{'' if temp is None else temp}"
+            )
+        return "\n".join(lines)
+
     def _build_forecast_prompt(
         self,
         sku_id: str,
@@ -163,123 +263,171 @@ class GigaChatService:
         forecast_period: int,
         context: Optional[str] = None
     ) -> str:
-        """Build prompt for forecast generation."""
-        # Prepare historical data summary
-        if historical_data:
-            total_units = sum(row.get('units_sold', 0) for row in historical_data)
-            total_revenue = sum(row.get('revenue', 0.0) for row in historical_data)
-            avg_units = total_units / len(historical_data) if historical_data else 0
-            avg_revenue = total_revenue / len(historical_data) if historical_data else 0
-
-            # Get recent trends (last 7 days vs previous 7 days)
-            recent_data = historical_data[:7] if len(historical_data) >= 7 else historical_data
-            older_data = historical_data[7:14] if len(historical_data) >= 14 else []
-
-            recent_avg = sum(row.get('units_sold', 0) for row in recent_data) / len(recent_data) if recent_data else 0
-            older_avg = sum(row.get('units_sold', 0) for row in older_data) / len(older_data) if older_data else recent_avg
-
-            trend = "растущий" if recent_avg > older_avg else "падающий" if recent_avg < older_avg else "стабильный"
-        else:
-            total_units = 0
-            total_revenue = 0.0
-            avg_units = 0
-            avg_revenue = 0.0
-            trend = "неизвестный"
-
-        prompt = f"""
-Ты эксперт по прогнозированию продаж пуховиков в Хабаровске.
-Проанализируй исторические данные и создай прогноз продаж на {forecast_period} дней.
-
-ДАННЫЕ ДЛЯ АНАЛИЗА:
-SKU: {sku_id}
-Период прогноза: {forecast_period} дней
-Исторические данные: {len(historical_data)} записей
-Общее количество проданных единиц: {total_units}
-Общая выручка: {total_revenue:.2f} руб.
-Средние продажи в день: {avg_units:.1f} единиц
-Средняя выручка в день: {avg_revenue:.2f} руб.
-Тренд: {trend}
-
-ДЕТАЛЬНЫЕ ДАННЫЕ (последние записи):
-"""
-
-        # Add recent data details
-        for i, row in enumerate(historical_data[:10]):  # Show last 10 records
-            date = row.get('date', 'N/A')
-            units = row.get('units_sold', 0)
-            revenue = row.get('revenue', 0.0)
-            temp = row.get('weather_temp', 'N/A')
-            season = row.get('season', 'N/A')
-
-            prompt += f"Дата: {date}, Продано: {units} шт, Выручка: {revenue:.2f} руб, Температура: {temp}°C, Сезон: {season}\n"
+        """Build compact prompt for forecast generation."""
+        start_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        prompt = (
+            f"Прогноз продаж пуховиков, Хабаровск. SKU {sku_id}. "
+            f"Горизонт {forecast_period} дн. с {start_date}.\n"
+            f"Итоги: {self._format_summary(self._sku_features(sku_id, historical_data))}\n"
+            f"История (новые сверху):\n{self._format_history_table(historical_data)}\n"
+        )
 
         if context:
-            prompt += f"\nДОПОЛНИТЕЛЬНЫЙ КОНТЕКСТ: {context}\n"
-
-        prompt += f"""
-ЗАДАЧА:
-Создай прогноз продаж на следующие {forecast_period} дней, учитывая:
-1. Сезонность продаж пуховиков (зима - высокий спрос, лето - низкий)
-2. Влияние температуры (холоднее = больше продаж)
-3. Тренды из исторических данных
-4. Особенности Хабаровского климата
-
-ФОРМАТ ОТВЕТА (строго JSON):
-{{
-    "predictions": [
-        {{
-            "date": "2024-01-01",
-            "predicted_units": 5,
-            "predicted_revenue": 15000.0,
-            "confidence": 0.85
-        }}
-    ],
-    "explanation": "Объяснение логики прогноза",
-    "confidence_scores": [0.85, 0.82, ...]
-}}
-
-Начинай прогноз с завтрашнего дня. Уровень доверия (confidence) от 0 до 1.
-Ответь только JSON, без дополнительного текста.
-"""
+            prompt += f"Контекст: {context}\n"
+
+        prompt += (
+            "Учитывай сезонность, температуру (холоднее - больше продаж), тренд и климат Хабаровска.\n"
+            'Ответ строго JSON без текста: {"predictions":[{"date":"YYYY-MM-DD","predicted_units":0,'
+            '"confidence":0.0}],"explanation":"..."}\n'
+        )
         return prompt
 
-    def _call_gigachat_api(self, prompt: str) -> str:
-        """Make actual API call to GigaChat."""
+    def _retry_after_seconds(self, response: requests.Response) -> Optional[float]:
+        """Read the Retry-After header of a 429 response in seconds."""
+        value = response.headers.get("Retry-After")
         try:
-            access_token = self._get_access_token()
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
 
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
+    def _build_completion_request(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stream: bool = False
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Build headers and payload for a chat completion request."""
+        access_token = self._get_access_token()
+
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": "GigaChat",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": 0.1
+        }
+
+        if stream:
+            headers["Accept"] = "text/event-stream"
+            payload["stream"] = True
+
+        return headers, payload
+
+    def _call_gigachat_api(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> str:
+        """Make actual API call to GigaChat.
 
-            payload = {
-                "model": "GigaChat",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 2000,
-                "temperature": 0.1
-            }
+        The call goes through the global scheduler, which applies the rate
+        limit, the concurrency cap and the priority lanes. A 429 answer pauses
+        the scheduler for ``Retry-After`` seconds and the request is retried.
+        """
+        try:
+            headers, payload = self._build_completion_request(prompt, max_tokens)
+
+            for attempt in range(self.max_retries):
+                with gigachat_scheduler.slot(priority):
+                    started_at = time.monotonic()
+                    response = self.session.post(
+                        f"{self.base_url}/chat/completions",
+                        headers=headers,
+                        json=payload,
+                        timeout=60
+                    )
+                    response_time_ms = int((time.monotonic() - started_at) * 1000)
+
+                if response.status_code == 429 and attempt < self.max_retries - 1:
+                    gigachat_scheduler.report_rate_limited(self._retry_after_seconds(response))
+                    app_logger.warning(f"GigaChat completion rate limited (attempt {attempt + 1}/{self.max_retries})")
+                    continue
+                break
 
-            response = self.session.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
             response.raise_for_status()
+            gigachat_scheduler.report_success()
 
             data = response.json()
+
+            usage = data.get("usage") or {}
+            usage_service.record_gigachat_call(
+                prompt_tokens=int(usage.get("prompt_tokens", 0)),
+                completion_tokens=int(usage.get("completion_tokens", 0)),
+                response_time_ms=response_time_ms,
+                status_code=response.status_code
+            )
+
             return data["choices"][0]["message"]["content"]
 
         except Exception as e:
             app_logger.error(f"GigaChat API call failed: {e}")
             raise
 
+    def _stream_gigachat_api(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Iterator[str]:
+        """Stream a chat completion from GigaChat.
+
+        The scheduler slot is held until the stream is fully consumed.
+
+        Yields:
+            Completion text deltas as they arrive
+        """
+        headers, payload = self._build_completion_request(prompt, max_tokens, stream=True)
+        usage: Dict[str, Any] = {}
+
+        with gigachat_scheduler.slot(priority):
+            started_at = time.monotonic()
+            with self.session.post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code == 429:
+                    gigachat_scheduler.report_rate_limited(self._retry_after_seconds(response))
+                response.raise_for_status()
+
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or usage
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            yield content
+
+            response_time_ms = int((time.monotonic() - started_at) * 1000)
+
+        gigachat_scheduler.report_success()
+        usage_service.record_gigachat_call(
+            prompt_tokens=int(usage.get("prompt_tokens", 0)),
+            completion_tokens=int(usage.get("completion_tokens", 0)),
+            response_time_ms=response_time_ms
+        )
+
     def _parse_gigachat_response(self, response_text: str) -> GigaChatResponse:
         """Parse GigaChat response and extract forecast data."""
         try:
@@ -293,10 +441,15 @@ SKU: {sku_id}
             json_text = response_text[start_idx:end_idx]
             data = json.loads(json_text)
 
+            predictions = data.get("predictions", [])
+            confidence_scores = data.get("confidence_scores") or [
+                float(pred.get("confidence", 0.8)) for pred in predictions if isinstance(pred, dict)
+            ]
+
             return GigaChatResponse(
-                predictions=data.get("predictions", []),
+                predictions=predictions,
                 explanation=data.get("explanation", ""),
-                confidence_scores=data.get("confidence_scores", [])
+                confidence_scores=confidence_scores
             )
 
         except (json.JSONDecodeError, ValueError) as e:
@@ -319,13 +472,12 @@ SKU: {sku_id}
         """Generate mock forecast for development/testing."""
         app_logger.info("Generating mock forecast")
 
-        # Calculate base values from historical data
-        if historical_data:
-            avg_units = sum(row.get('units_sold', 0) for row in historical_data) / len(historical_data)
-            avg_revenue = sum(row.get('revenue', 0.0) for row in historical_data) / len(historical_data)
+        # Base level from stored aggregates, preferring the recent rolling mean
+        features = self._sku_features(sku_id, historical_data)
+        if features["count"]:
+            avg_units = features["rolling_7"] if features["rolling_7"] is not None else features["avg_units"]
         else:
             avg_units = 3
-            avg_revenue = 9000.0
 
         predictions = []
         confidence_scores = []
@@ -334,17 +486,15 @@ SKU: {sku_id}
             # Add some variability
             variation = 0.8 + (i % 3) * 0.15  # Vary between 0.8 and 1.1
             predicted_units = max(1, int(avg_units * variation))
-            predicted_revenue = avg_revenue * variation
-            # Simple sinusoidal mock temperature: colder at start, warmer later
-            predicted_temp = round(-20 + 15 * (i / max(forecast_period - 1, 1)), 1)
             confidence = 0.75 + (i % 2) * 0.1  # Vary between 0.75 and 0.85
 
             forecast_date = datetime.now() + timedelta(days=i + 1)
+            # Expected temperature for the day from Khabarovsk normals
+            predicted_temp = climatology.temperature_for(forecast_date)
 
             predictions.append({
                 "date": forecast_date.strftime("%Y-%m-%d"),
                 "predicted_units": predicted_units,
-                "predicted_revenue": round(predicted_revenue, 2),
                 "predicted_temp": predicted_temp,
                 "confidence": round(confidence, 2)
             })
@@ -353,15 +503,137 @@ SKU: {sku_id}
         return GigaChatResponse(
             predictions=predictions,
             explanation=f"Мок-прогноз для SKU {sku_id} на {forecast_period} дней на основе исторических данных",
-            confidence_scores=confidence_scores
+            confidence_scores=confidence_scores,
+            generated_by_gigachat=False,
+            forecast_model="mock"
+        )
+
+    def _effective_batch_size(self, forecast_period: int) -> int:
+        """Number of SKUs that fit into one completion under max_tokens.
+
+        Args:
+            forecast_period: Number of days forecast per SKU
+
+        Returns:
+            Batch size capped by both GIGACHAT_BATCH_SIZE and the token budget
+        """
+        # Reserve a quarter of the budget for explanations and JSON framing
+        per_sku_tokens = max(1, self.tokens_per_prediction * forecast_period)
+        fits = int(self.max_tokens * 0.75) // per_sku_tokens
+        return max(1, min(self.batch_size, fits))
+
+    def _build_batch_forecast_prompt(
+        self,
+        histories: Dict[str, List[Dict[str, Any]]],
+        forecast_period: int,
+        context: Optional[str] = None
+    ) -> str:
+        """Build a compact prompt that asks for forecasts of several SKUs.
+
+        Each SKU gets its summary line and recent history table, as in the
+        single-SKU prompt, under one shared instruction block.
+        """
+        start_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        prompt = (
+            f"Прогноз продаж пуховиков, Хабаровск, по каждому SKU. "
+            f"Горизонт {forecast_period} дн. с {start_date}.\n"
+        )
+        for sku_id, historical_data in histories.items():
+            prompt += (
+                f"SKU {sku_id}. Итоги: {self._format_summary(self._sku_features(sku_id, historical_data))}\n"
+                f"{self._format_history_table(historical_data)}\n"
+            )
+
+        if context:
+            prompt += f"Контекст: {context}\n"
+
+        prompt += (
+            "Учитывай сезонность, температуру (холоднее - больше продаж), тренд и климат Хабаровска.\n"
+            f"Ответ строго JSON без текста, ключи - SKU, по {forecast_period} прогнозов: "
+            '{"<SKU>":{"predictions":[{"date":"YYYY-MM-DD","predicted_units":0,"confidence":0.0}],'
+            '"explanation":"..."}}\n'
         )
+        return prompt
+
+    def _validate_sku_forecast(self, data: Any, forecast_period: int) -> bool:
+        """Check that a single SKU entry of a batched answer is usable.
+
+        Args:
+            data: Parsed JSON value for one SKU
+            forecast_period: Expected number of predictions
+
+        Returns:
+            True if the entry contains a full list of well-formed predictions
+        """
+        if not isinstance(data, dict):
+            return False
+
+        predictions = data.get("predictions")
+        if not isinstance(predictions, list) or len(predictions) < forecast_period:
+            return False
+
+        for pred in predictions:
+            if not isinstance(pred, dict) or not pred.get("date"):
+                return False
+            try:
+                float(pred.get("predicted_units"))
+            except (TypeError, ValueError):
+                return False
+
+        return True
+
+    def _parse_batch_response(
+        self,
+        response_text: str,
+        sku_ids: List[str],
+        forecast_period: int
+    ) -> Dict[str, Optional[GigaChatResponse]]:
+        """Split a keyed batch answer into one GigaChatResponse per SKU.
+
+        SKUs that are missing from the answer or fail validation map to None
+        so the caller can fall back for them individually.
+        """
+        results: Dict[str, Optional[GigaChatResponse]] = {sku_id: None for sku_id in sku_ids}
+
+        try:
+            start_idx = response_text.find('{')
+            end_idx = response_text.rfind('}') + 1
+
+            if start_idx == -1 or end_idx == 0:
+                raise ValueError("No JSON found in response")
+
+            data = json.loads(response_text[start_idx:end_idx])
+            if not isinstance(data, dict):
+                raise ValueError("Batch response is not a JSON object")
+
+        except (json.JSONDecodeError, ValueError) as e:
+            app_logger.error(f"Failed to parse GigaChat batch response: {e}")
+            app_logger.debug(f"Raw response: {response_text}")
+            return results
+
+        for sku_id in sku_ids:
+            sku_data = data.get(sku_id)
+            if not self._validate_sku_forecast(sku_data, forecast_period):
+                app_logger.warning(f"Invalid or missing batch forecast for SKU {sku_id}")
+                continue
+
+            predictions = sku_data["predictions"][:forecast_period]
+            results[sku_id] = GigaChatResponse(
+                predictions=predictions,
+                explanation=str(sku_data.get("explanation", "")),
+                confidence_scores=[float(p.get("confidence", 0.8)) for p in predictions]
+            )
+
+        return results
 
     async def generate_forecast(
         self,
         sku_id: str,
         historical_data: List[Dict[str, Any]],
         forecast_period: int,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE
     ) -> GigaChatResponse:
         """Generate forecast using GigaChat API."""
         if self.mock_mode:
@@ -372,8 +644,8 @@ SKU: {sku_id}
 
             app_logger.info(f"Generating forecast for SKU {sku_id}, period: {forecast_period} days")
 
-            # Call GigaChat API
-            response_text = self._call_gigachat_api(prompt)
+            # Call GigaChat API off the event loop; the scheduler may queue the call
+            response_text = await asyncio.to_thread(self._call_gigachat_api, prompt, priority=priority)
 
             app_logger.info("Successfully received GigaChat response")
             app_logger.debug(f"Response length: {len(response_text)} characters")
@@ -386,6 +658,121 @@ SKU: {sku_id}
             # Return fallback forecast
             return self._generate_mock_forecast(sku_id, forecast_period, historical_data)
 
+    def stream_forecast(
+        self,
+        sku_id: str,
+        historical_data: List[Dict[str, Any]],
+        forecast_period: int,
+        context: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Iterator[Tuple[str, Any]]:
+        """Generate forecast with a streamed completion.
+
+        Predictions are emitted as soon as each element of the JSON array
+        closes. If the stream fails, the remaining days are filled from the
+        mock generator.
+
+        Yields:
+            ``("prediction", dict)`` for every prediction, then a single
+            ``("complete", GigaChatResponse)`` with the full answer
+        """
+        if self.mock_mode:
+            response = self._generate_mock_forecast(sku_id, forecast_period, historical_data)
+            for prediction in response.predictions:
+                yield "prediction", prediction
+            yield "complete", response
+            return
+
+        parser = IncrementalPredictionParser()
+        emitted = 0
+
+        try:
+            prompt = self._build_forecast_prompt(sku_id, historical_data, forecast_period, context)
+
+            app_logger.info(f"Streaming forecast for SKU {sku_id}, period: {forecast_period} days")
+
+            for chunk in self._stream_gigachat_api(prompt, priority=priority):
+                for prediction in parser.feed(chunk):
+                    if emitted < forecast_period:
+                        emitted += 1
+                        yield "prediction", prediction
+
+            response = self._parse_gigachat_response(parser.text)
+            if not emitted and not response.predictions:
+                raise ValueError("Streamed response contained no predictions")
+
+            # Emit anything the incremental parser could not pick up
+            for prediction in response.predictions[emitted:forecast_period]:
+                yield "prediction", prediction
+
+            yield "complete", response
+
+        except Exception as e:
+            app_logger.error(f"Error streaming forecast with GigaChat: {e}")
+
+            fallback = self._generate_mock_forecast(sku_id, forecast_period, historical_data)
+            for prediction in fallback.predictions[emitted:]:
+                yield "prediction", prediction
+            yield "complete", fallback
+
+    async def generate_forecasts_batch(
+        self,
+        histories: Dict[str, List[Dict[str, Any]]],
+        forecast_period: int,
+        context: Optional[str] = None
+    ) -> Dict[str, GigaChatResponse]:
+        """Generate forecasts for several SKUs with as few completions as possible.
+
+        SKUs are packed into prompts of at most ``_effective_batch_size`` entries.
+        Each SKU in the answer is validated on its own; SKUs that are missing or
+        malformed fall back to the mock generator without affecting the rest.
+
+        Args:
+            histories: Mapping of SKU ID to its historical records
+            forecast_period: Number of days to forecast
+            context: Optional free-text context shared by all SKUs
+
+        Returns:
+            Mapping of SKU ID to its forecast response
+        """
+        if self.mock_mode:
+            return {
+                sku_id: self._generate_mock_forecast(sku_id, forecast_period, historical_data)
+                for sku_id, historical_data in histories.items()
+            }
+
+        sku_ids = list(histories.keys())
+        batch_size = self._effective_batch_size(forecast_period)
+        results: Dict[str, GigaChatResponse] = {}
+
+        app_logger.info(f"Generating batched forecast for {len(sku_ids)} SKUs, batch size: {batch_size}")
+
+        for offset in range(0, len(sku_ids), batch_size):
+            chunk = sku_ids[offset:offset + batch_size]
+            parsed: Dict[str, Optional[GigaChatResponse]] = {sku_id: None for sku_id in chunk}
+
+            try:
+                prompt = self._build_batch_forecast_prompt(
+                    {sku_id: histories[sku_id] for sku_id in chunk},
+                    forecast_period,
+                    context
+                )
+                response_text = await asyncio.to_thread(
+                    self._call_gigachat_api, prompt, priority=PRIORITY_BATCH
+                )
+                parsed = self._parse_batch_response(response_text, chunk, forecast_period)
+
+            except Exception as e:
+                app_logger.error(f"Error generating batched forecast with GigaChat: {e}")
+
+            for sku_id in chunk:
+                if parsed.get(sku_id) is not None:
+                    results[sku_id] = parsed[sku_id]
+                else:
+                    results[sku_id] = self._generate_mock_forecast(sku_id, forecast_period, histories[sku_id])
+
+        return results
+
 
 # Global instance
 gigachat_service = GigaChatService()
@@ -0,0 +1,144 @@
+"""Background health probes of Supabase and GigaChat.
+
+Load balancers poll ``/health`` every few seconds; answering each poll
+with a database query would put steady load on Supabase and hold a
+worker thread for up to the request timeout. Instead the prober checks
+every dependency on an interval and the endpoints return the last result.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import supabase_client
+from app.services.gigachat_service import gigachat_service
+
+
+# Dependencies the service cannot work without; others only degrade it
+REQUIRED = ("supabase",)
+
+
+class HealthProber:
+    """Periodically probes dependencies and keeps the last results."""
+
+    def __init__(self):
+        """Initialize health prober from environment configuration."""
+        self.interval = float(os.getenv("HEALTH_PROBE_INTERVAL", 15))
+        self.timeout = float(os.getenv("HEALTH_PROBE_TIMEOUT", 5))
+
+        # Each check takes a timeout in seconds and returns True when healthy
+        self.checks: Dict[str, Callable[[float], bool]] = {
+            "supabase": lambda timeout: supabase_client.health_check(timeout),
+            "gigachat": lambda timeout: gigachat_service.health_check(timeout),
+        }
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._probed_at = 0.0  # time.monotonic() of the last finished probe
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        app_logger.info(f"HealthProber initialized (interval: {self.interval}s, timeout: {self.timeout}s)")
+
+    @property
+    def running(self) -> bool:
+        """Whether the periodic probe is scheduled."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def status(self) -> str:
+        """``healthy``, ``degraded`` (an optional dependency is down) or ``unhealthy``."""
+        if any(not self.results.get(name, {}).get("ok", False) for name in REQUIRED):
+            return "unhealthy"
+        if any(not result["ok"] for result in self.results.values()):
+            return "degraded"
+        return "healthy"
+
+    def is_up(self, name: str) -> bool:
+        """Whether the last probe of a dependency succeeded."""
+        return self.results.get(name, {}).get("ok", False)
+
+    def probe_once(self) -> Dict[str, Dict[str, Any]]:
+        """Probe every dependency now; blocking, meant for a thread.
+
+        Concurrent callers share one probe: a caller that waited for
+        another's probe to finish returns its results.
+
+        Returns:
+            Result per dependency: ok, latency_ms, checked_at,
+            consecutive_failures and error
+        """
+        requested = time.monotonic()
+        with self._lock:
+            if self._probed_at > requested:
+                return self.results
+
+            results = {}
+            for name, check in self.checks.items():
+                previous = self.results.get(name)
+                started = time.perf_counter()
+                error = None
+                try:
+                    ok = bool(check(self.timeout))
+                except Exception as e:
+                    ok, error = False, str(e)
+                latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+                failures = 0 if ok else (previous["consecutive_failures"] if previous else 0) + 1
+                results[name] = {
+                    "ok": ok,
+                    "latency_ms": latency_ms,
+                    "checked_at": datetime.utcnow(),
+                    "consecutive_failures": failures,
+                    "error": error,
+                }
+
+                # Log changes of state, not every probe
+                if previous is None or previous["ok"] != ok:
+                    if ok:
+                        app_logger.info(f"Health probe: {name} is up ({latency_ms}ms)")
+                    else:
+                        app_logger.warning(f"Health probe: {name} is down ({error or 'check failed'})")
+
+            self.results = results
+            self._probed_at = time.monotonic()
+        return results
+
+    async def ensure_fresh(self) -> None:
+        """Probe inline only if there are no results, or they are stale and
+        the periodic probe is not running (e.g. the lifespan did not run)."""
+        if self.results and (self.running or time.monotonic() - self._probed_at < self.interval):
+            return
+        await asyncio.to_thread(self.probe_once)
+
+    async def _run_periodically(self) -> None:
+        """Probe every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.probe_once)
+            except Exception as e:
+                app_logger.error(f"Health probe failed: {e}")
+
+    def start(self) -> None:
+        """Schedule the periodic probe on the running event loop."""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Cancel the periodic probe."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Global instance
+health_prober = HealthProber()
@@ -0,0 +1,220 @@
+"""Local statistical forecast model.
+
+This module provides a fast temperature-aware regression model that runs
+in-process. It is used when GigaChat cannot answer within the latency
+budget and as a baseline for other forecasting paths.
+"""
+
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.logger import app_logger
+from app.models.schemas import GigaChatResponse
+from app.services.climatology import climatology
+
+
+class LocalForecastModel:
+    """Per-SKU linear model of daily sales against temperature."""
+
+    def __init__(self):
+        """Initialize local model."""
+        self.default_daily_units = 3.0
+        self.default_temp = -15.0
+        # Simulated paths per SKU for P10/P50/P90 intervals
+        self.bootstrap_paths = int(os.getenv("LOCAL_MODEL_BOOTSTRAP_PATHS", 2000))
+        app_logger.info("LocalForecastModel initialized")
+
+    def history_arrays(self, historical_data: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convert history records into date, quantity and temperature arrays.
+
+        Returns:
+            Tuple of (dates, quantities, temperatures) sorted by date;
+            missing temperatures are filled from climatology
+        """
+        rows = [row for row in historical_data if row.get("date")]
+        if not rows:
+            empty = np.array([], dtype=float)
+            return np.array([], dtype="datetime64[D]"), empty, empty
+
+        dates = np.array([str(row["date"])[:10] for row in rows], dtype="datetime64[D]")
+        quantities = np.array(
+            [float(row.get("sales_quantity", row.get("units_sold", 0)) or 0) for row in rows]
+        )
+        temps = np.array(
+            [np.nan if row.get("avg_temp") is None else float(row["avg_temp"]) for row in rows]
+        )
+
+        # Records without a measured temperature get the day-of-year normal
+        missing = np.isnan(temps)
+        if missing.any():
+            temps[missing] = climatology.temperatures_for(dates[missing].astype(object))
+
+        order = np.argsort(dates)
+        return dates[order], quantities[order], temps[order]
+
+    def fit(self, historical_data: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Fit daily sales as a linear function of temperature.
+
+        History may be daily or weekly; quantities are converted to a daily
+        rate using the median spacing between records.
+
+        Args:
+            historical_data: Sales records for one SKU
+
+        Returns:
+            Model parameters: intercept, slope, residual_std, spacing_days,
+            observations, last_temp and residuals (daily-rate residuals as an array)
+        """
+        return self.fit_arrays(*self.history_arrays(historical_data))
+
+    def fit_arrays(self, dates: np.ndarray, quantities: np.ndarray, temps: np.ndarray) -> Dict[str, float]:
+        """Fit the model on date-sorted arrays.
+
+        Args:
+            dates: Record dates as ``datetime64[D]``
+            quantities: Quantity sold per record
+            temps: Temperature per record (NaN where unknown)
+
+        Returns:
+            Model parameters, see ``fit``
+        """
+        if quantities.size == 0:
+            return {
+                "intercept": self.default_daily_units,
+                "slope": 0.0,
+                "residual_std": self.default_daily_units * 0.5,
+                "spacing_days": 1.0,
+                "observations": 0,
+                "last_temp": self.default_temp,
+                "residuals": np.array([], dtype=float)
+            }
+
+        spacing = 1.0
+        if dates.size > 1:
+            gaps = np.diff(dates).astype(float)
+            gaps = gaps[gaps > 0]
+            if gaps.size:
+                spacing = float(np.median(gaps))
+
+        rates = quantities / spacing
+        has_temp = ~np.isnan(temps)
+
+        intercept, slope = float(rates.mean()), 0.0
+        if has_temp.sum() >= 3 and np.ptp(temps[has_temp]) > 0:
+            slope, intercept = (float(v) for v in np.polyfit(temps[has_temp], rates[has_temp], 1))
+            fitted = intercept + slope * temps[has_temp]
+            residuals = rates[has_temp] - fitted
+        else:
+            residuals = rates - intercept
+
+        return {
+            "intercept": intercept,
+            "slope": slope,
+            "residual_std": float(residuals.std()) if residuals.size > 1 else float(intercept) * 0.5,
+            "spacing_days": spacing,
+            "observations": int(quantities.size),
+            "last_temp": float(temps[has_temp][-1]) if has_temp.any() else self.default_temp,
+            "residuals": residuals
+        }
+
+    def simulate_quantiles(
+        self,
+        point: np.ndarray,
+        residuals: np.ndarray,
+        residual_std: float,
+        quantiles: Sequence[float] = (10, 50, 90),
+        seed: Optional[int] = None
+    ) -> np.ndarray:
+        """Simulate forecast paths and return per-day quantiles.
+
+        All paths are drawn at once as a (paths x horizon) matrix: residuals
+        are resampled with replacement when there are enough of them,
+        otherwise drawn from a normal with ``residual_std``. Sales cannot be
+        negative, so paths are clipped at zero before taking quantiles.
+
+        Args:
+            point: Point forecast per day
+            residuals: In-sample residuals of the fitted model
+            residual_std: Residual standard deviation used as a fallback
+            quantiles: Percentiles to return
+            seed: Random seed, for reproducible intervals
+
+        Returns:
+            Array of shape (len(quantiles), horizon)
+        """
+        rng = np.random.default_rng(seed)
+        shape = (self.bootstrap_paths, point.size)
+
+        if residuals.size >= 5:
+            noise = residuals[rng.integers(0, residuals.size, size=shape)]
+        else:
+            noise = rng.normal(0.0, max(residual_std, 0.0), size=shape)
+
+        paths = np.clip(point[None, :] + noise, 0, None)
+        return np.percentile(paths, quantiles, axis=0)
+
+    def horizon_temperatures(self, start: datetime, forecast_period: int) -> np.ndarray:
+        """Temperatures assumed for each forecast day, from climatology normals."""
+        return climatology.horizon(start, forecast_period)
+
+    def forecast(
+        self,
+        sku_id: str,
+        historical_data: List[Dict[str, Any]],
+        forecast_period: int
+    ) -> GigaChatResponse:
+        """Generate a forecast in the same shape as a GigaChat answer.
+
+        Args:
+            sku_id: SKU identifier
+            historical_data: Sales records for the SKU
+            forecast_period: Number of days to forecast
+
+        Returns:
+            Forecast response marked as not generated by GigaChat
+        """
+        params = self.fit(historical_data)
+        start = datetime.now() + timedelta(days=1)
+        temps = self.horizon_temperatures(start, forecast_period)
+        expected = params["intercept"] + params["slope"] * temps
+        units = np.clip(expected, 0, None)
+        # Seed per SKU so repeated requests return the same interval
+        p10, p50, p90 = self.simulate_quantiles(
+            expected, params["residuals"], params["residual_std"], seed=zlib.crc32(sku_id.encode())
+        )
+
+        # More history gives more confidence, capped below LLM-level scores
+        confidence = round(0.5 + 0.3 * min(1.0, params["observations"] / 26), 2)
+
+        predictions = [
+            {
+                "date": (start + timedelta(days=i)).strftime("%Y-%m-%d"),
+                "predicted_units": int(round(units[i])),
+                "predicted_temp": float(temps[i]),
+                "confidence": confidence,
+                "p10": int(round(p10[i])),
+                "p50": int(round(p50[i])),
+                "p90": int(round(p90[i]))
+            }
+            for i in range(forecast_period)
+        ]
+
+        return GigaChatResponse(
+            predictions=predictions,
+            explanation=(
+                f"Локальная модель для SKU {sku_id}: продажи в день = "
+                f"{params['intercept']:.2f} {params['slope']:+.2f} × температура "
+                f"({params['observations']} наблюдений)"
+            ),
+            confidence_scores=[confidence] * forecast_period,
+            generated_by_gigachat=False,
+            forecast_model="local"
+        )
+
+
+# Global instance
+local_model = LocalForecastModel()
@@ -0,0 +1,315 @@
+"""Whole-catalog matrix forecasting engine.
+
+This module lays out the weekly history of every SKU as one SKU x week
+NumPy matrix with a mask for missing weeks, fits a ridge regression on
+temperature, trend and annual harmonics for all SKUs in a few batched
+linear-algebra calls, and produces daily forecasts for the whole catalog
+in a single call.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.utils.logger import app_logger
+from app.models.schemas import GigaChatResponse
+from app.services.climatology import climatology
+
+
+# Monday-aligned week number: 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY_OFFSET = 3
+_WEEKS_PER_YEAR = 365.25 / 7
+FEATURE_NAMES = ("intercept", "temp", "trend", "annual_sin", "annual_cos")
+
+
+def _week_numbers(dates: np.ndarray) -> np.ndarray:
+    """Monday-aligned week numbers of ``datetime64[D]`` dates."""
+    return (dates.astype("datetime64[D]").astype(np.int64) + _EPOCH_WEEKDAY_OFFSET) // 7
+
+
+class CatalogMatrix:
+    """Aligned weekly history of many SKUs.
+
+    Attributes:
+        sku_ids: SKU identifiers, one per matrix row
+        first_week: Week number of the first matrix column
+        qty: Weekly quantity sold (SKU x week), 0 where missing
+        temps: Weekly mean temperature (SKU x week), climatology where unknown
+        mask: True where the SKU has data for the week
+    """
+
+    def __init__(self, sku_ids: np.ndarray, first_week: int, qty: np.ndarray, temps: np.ndarray, mask: np.ndarray):
+        """Initialize matrix from prepared arrays."""
+        self.sku_ids = sku_ids
+        self.first_week = first_week
+        self.qty = qty
+        self.temps = temps
+        self.mask = mask
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "CatalogMatrix":
+        """Build the matrix from sales records of any number of SKUs.
+
+        Records falling into the same SKU and week are summed; their
+        temperatures are averaged.
+
+        Args:
+            rows: Sales records with sku_id, date, sales_quantity and avg_temp
+
+        Returns:
+            Catalog matrix (empty if there are no usable rows)
+        """
+        rows = [row for row in rows if row.get("sku_id") and row.get("date")]
+        if not rows:
+            empty = np.zeros((0, 0))
+            return cls(np.array([], dtype=object), 0, empty, empty, empty.astype(bool))
+
+        sku_ids, sku_index = np.unique([row["sku_id"] for row in rows], return_inverse=True)
+        weeks = _week_numbers(np.array([str(row["date"])[:10] for row in rows], dtype="datetime64[D]"))
+        qty = np.array([float(row.get("sales_quantity", row.get("units_sold", 0)) or 0) for row in rows])
+        temps = np.array([np.nan if row.get("avg_temp") is None else float(row["avg_temp"]) for row in rows])
+
+        first_week = int(weeks.min())
+        week_index = weeks - first_week
+        shape = (sku_ids.size, int(week_index.max()) + 1)
+
+        qty_matrix = np.zeros(shape)
+        count_matrix = np.zeros(shape)
+        temp_sum = np.zeros(shape)
+        temp_count = np.zeros(shape)
+
+        np.add.at(qty_matrix, (sku_index, week_index), qty)
+        np.add.at(count_matrix, (sku_index, week_index), 1)
+        has_temp = ~np.isnan(temps)
+        np.add.at(temp_sum, (sku_index[has_temp], week_index[has_temp]), temps[has_temp])
+        np.add.at(temp_count, (sku_index[has_temp], week_index[has_temp]), 1)
+
+        # Weeks without a measured temperature use the climatology normal of the week
+        week_normals = cls.week_normals(first_week, shape[1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            temp_matrix = np.where(temp_count > 0, temp_sum / temp_count, week_normals[None, :])
+
+        return cls(sku_ids, first_week, qty_matrix, temp_matrix, count_matrix > 0)
+
+    @staticmethod
+    def week_normals(first_week: int, weeks: int) -> np.ndarray:
+        """Climatology mean temperature of each Monday-aligned week."""
+        normals = climatology.normals()
+        monday = np.datetime64("1970-01-01") + (np.arange(weeks) + first_week) * 7 - _EPOCH_WEEKDAY_OFFSET
+        days = monday[:, None] + np.arange(7)[None, :]
+        day_index = (days - days.astype("datetime64[Y]")).astype(np.int64)
+        return normals[day_index].mean(axis=1)
+
+
+class CatalogForecast:
+    """Daily forecasts for a set of SKUs over a common horizon."""
+
+    def __init__(
+        self,
+        sku_ids: np.ndarray,
+        dates: List[date],
+        daily: np.ndarray,
+        temps: np.ndarray,
+        residual_std: np.ndarray,
+        observations: np.ndarray
+    ):
+        """Initialize catalog forecast.
+
+        Args:
+            sku_ids: SKU identifiers, one per row of ``daily``
+            dates: Forecast dates
+            daily: Forecast units per SKU and day (SKU x day)
+            temps: Assumed temperature per day
+            residual_std: Daily-scale residual standard deviation per SKU
+            observations: Number of observed history weeks per SKU
+        """
+        self.sku_ids = sku_ids
+        self.dates = dates
+        self.daily = daily
+        self.temps = temps
+        self.residual_std = residual_std
+        self.observations = observations
+        self._row = {sku_id: index for index, sku_id in enumerate(sku_ids)}
+
+    def __contains__(self, sku_id: str) -> bool:
+        return sku_id in self._row
+
+    def for_sku(self, sku_id: str) -> np.ndarray:
+        """Daily forecast of one SKU."""
+        return self.daily[self._row[sku_id]]
+
+    def to_gigachat_response(self, sku_id: str) -> GigaChatResponse:
+        """Forecast of one SKU in the same shape as a GigaChat answer."""
+        row = self._row[sku_id]
+        # Same confidence scale as the per-SKU local model
+        confidence = round(0.5 + 0.3 * min(1.0, float(self.observations[row]) / 26), 2)
+
+        predictions = [
+            {
+                "date": day.strftime("%Y-%m-%d"),
+                "predicted_units": int(round(units)),
+                "predicted_temp": float(temp),
+                "confidence": confidence
+            }
+            for day, units, temp in zip(self.dates, self.daily[row], self.temps)
+        ]
+
+        return GigaChatResponse(
+            predictions=predictions,
+            explanation=(
+                f"Матричная модель каталога для SKU {sku_id}: регрессия по температуре, "
+                f"тренду и сезонности ({int(self.observations[row])} недель истории)"
+            ),
+            confidence_scores=[confidence] * len(predictions),
+            generated_by_gigachat=False,
+            forecast_model="matrix"
+        )
+
+
+class MatrixForecastEngine:
+    """Vectorized per-SKU ridge regression over the catalog matrix."""
+
+    def __init__(self):
+        """Initialize engine configuration."""
+        self.ridge = float(os.getenv("MATRIX_FORECAST_RIDGE", 1.0))
+        # Annual harmonics need roughly a year of history to be identifiable
+        self.min_weeks_for_harmonics = int(os.getenv("MATRIX_FORECAST_MIN_WEEKS_SEASONAL", 40))
+        app_logger.info(f"MatrixForecastEngine initialized (ridge: {self.ridge})")
+
+    def _design(self, week_numbers: np.ndarray, temps: np.ndarray, use_harmonics: np.ndarray) -> np.ndarray:
+        """Feature tensor (SKU x week x feature) for the given weeks.
+
+        Args:
+            week_numbers: Absolute week numbers (week)
+            temps: Temperatures (SKU x week)
+            use_harmonics: Per-SKU flag enabling annual harmonics
+        """
+        phase = 2 * np.pi * week_numbers / _WEEKS_PER_YEAR
+        harmonic = use_harmonics[:, None].astype(float)
+        shape = temps.shape
+
+        return np.stack([
+            np.ones(shape),
+            temps / 10.0,
+            np.broadcast_to(week_numbers / _WEEKS_PER_YEAR, shape),
+            harmonic * np.sin(phase)[None, :],
+            harmonic * np.cos(phase)[None, :]
+        ], axis=-1)
+
+    def fit(self, matrix: CatalogMatrix) -> Dict[str, np.ndarray]:
+        """Fit coefficients for every SKU at once.
+
+        Solves the ridge normal equations ``(X'WX + λP) β = X'Wy`` for all
+        SKUs with one batched ``np.linalg.solve``; W is the missing-week mask
+        and the intercept is not penalized.
+
+        Args:
+            matrix: Catalog matrix
+
+        Returns:
+            Dictionary with ``coef`` (SKU x feature), ``residual_std`` (SKU),
+            ``use_harmonics`` (SKU) and ``week_center``
+        """
+        weeks = matrix.qty.shape[1]
+        week_numbers = np.arange(weeks, dtype=float) + matrix.first_week
+        observed = matrix.mask.sum(axis=1)
+        use_harmonics = observed >= self.min_weeks_for_harmonics
+
+        # Center the trend on the history to keep the intercept well-conditioned
+        week_center = float(week_numbers.mean())
+        X = self._design(week_numbers - week_center, matrix.temps, use_harmonics)
+        weight = matrix.mask.astype(float)
+
+        xtx = np.einsum("sw,swi,swj->sij", weight, X, X)
+        xty = np.einsum("sw,swi,sw->si", weight, X, matrix.qty)
+
+        penalty = np.eye(len(FEATURE_NAMES)) * self.ridge
+        penalty[0, 0] = 1e-9
+        coef = np.linalg.solve(xtx + penalty[None, :, :], xty[..., None])[..., 0]
+
+        fitted = np.einsum("swi,si->sw", X, coef)
+        residuals = (matrix.qty - fitted) * weight
+        dof = np.maximum(observed - 1, 1)
+        residual_std = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+
+        return {
+            "coef": coef,
+            "residual_std": residual_std,
+            "use_harmonics": use_harmonics,
+            "week_center": week_center
+        }
+
+    def forecast(
+        self,
+        matrix: CatalogMatrix,
+        horizon_days: int,
+        start: Optional[date] = None
+    ) -> CatalogForecast:
+        """Forecast daily sales of every SKU in the matrix.
+
+        The horizon is split into 7-day blocks starting at ``start``; each
+        block is predicted as one week with climatology temperatures and its
+        total spread evenly over its days.
+
+        Args:
+            matrix: Catalog matrix
+            horizon_days: Number of days to forecast
+            start: First forecast day, defaults to tomorrow
+
+        Returns:
+            Daily forecasts for all SKUs
+        """
+        start = start or (datetime.now() + timedelta(days=1)).date()
+        dates = [start + timedelta(days=i) for i in range(horizon_days)]
+        sku_count = matrix.sku_ids.size
+        day_temps = climatology.temperatures_for(dates)
+
+        if sku_count == 0:
+            empty = np.zeros(0)
+            return CatalogForecast(matrix.sku_ids, dates, np.zeros((0, horizon_days)), day_temps, empty, empty)
+
+        params = self.fit(matrix)
+
+        blocks = int(np.ceil(horizon_days / 7))
+        padded_temps = np.concatenate([day_temps, climatology.temperatures_for(
+            start + timedelta(days=i) for i in range(horizon_days, blocks * 7)
+        )]) if blocks * 7 > horizon_days else day_temps
+        block_temps = padded_temps.reshape(blocks, 7).mean(axis=1)
+
+        start_week = _week_numbers(np.array([start], dtype="datetime64[D]"))[0]
+        block_weeks = start_week + np.arange(blocks, dtype=float) - params["week_center"]
+
+        X = self._design(block_weeks, np.broadcast_to(block_temps, (sku_count, blocks)), params["use_harmonics"])
+        weekly = np.clip(np.einsum("sbi,si->sb", X, params["coef"]), 0, None)
+
+        daily = np.repeat(weekly / 7.0, 7, axis=1)[:, :horizon_days]
+        return CatalogForecast(
+            matrix.sku_ids, dates, daily, day_temps,
+            params["residual_std"] / np.sqrt(7), matrix.mask.sum(axis=1)
+        )
+
+
+def forecast_catalog(
+    rows: List[Dict[str, Any]],
+    horizon_days: int,
+    start: Optional[date] = None
+) -> CatalogForecast:
+    """Build the catalog matrix from history rows and forecast every SKU.
+
+    Args:
+        rows: Sales history of any number of SKUs
+        horizon_days: Number of days to forecast
+        start: First forecast day, defaults to tomorrow
+
+    Returns:
+        Daily forecasts for every SKU present in ``rows``
+    """
+    matrix = CatalogMatrix.from_rows(rows)
+    app_logger.info(f"Matrix forecast for {matrix.sku_ids.size} SKUs x {matrix.qty.shape[1] if matrix.qty.size else 0} weeks")
+    return matrix_engine.forecast(matrix, horizon_days, start)
+
+
+# Global instance
+matrix_engine = MatrixForecastEngine()
@@ -0,0 +1,235 @@
+"""Retention and compaction of stored forecasts.
+
+This module trims the forecasts table so history reads stay small as
+usage grows: the latest forecasts per SKU and period and everything from
+the recent window are kept, older forecasts are compacted to one daily
+snapshot, and deletions run in bounded batches in the background.
+
+Headers are scanned page by page and one SKU at a time. Each scheduled
+run is claimed through the shared cache, so with several worker
+processes only one of them applies the policy per interval.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import ForecastId, supabase_client
+from app.services.accuracy_service import accuracy_service
+from app.services.data_versions import data_versions, FORECASTS
+from app.services.shared_cache import shared_cache
+
+
+NAMESPACE = "retention"
+
+
+def _forecast_period(row: Dict[str, Any]) -> Optional[int]:
+    """Forecast period stored as ``period_<days>`` in key_factors."""
+    for factor in row.get("key_factors") or []:
+        if isinstance(factor, str) and factor.startswith("period_"):
+            try:
+                return int(factor[len("period_"):])
+            except ValueError:
+                return None
+    return None
+
+
+def _created_at(row: Dict[str, Any]) -> datetime:
+    """Creation time of a forecast row as an aware datetime."""
+    value = row.get("created_at")
+    if isinstance(value, datetime):
+        created = value
+    else:
+        created = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return created if created.tzinfo else created.replace(tzinfo=timezone.utc)
+
+
+class RetentionService:
+    """Background job applying the forecast retention policy."""
+
+    def __init__(self):
+        """Initialize retention settings."""
+        # Newest forecasts always kept per SKU and period
+        self.keep_latest = int(os.getenv("FORECAST_RETENTION_KEEP_LATEST", 10))
+        # Forecasts younger than this are all kept
+        self.full_days = int(os.getenv("FORECAST_RETENTION_FULL_DAYS", 7))
+        # Daily snapshots older than this are dropped too (0 keeps them forever)
+        self.snapshot_days = int(os.getenv("FORECAST_RETENTION_SNAPSHOT_DAYS", 365))
+        self.delete_batch_size = int(os.getenv("FORECAST_RETENTION_DELETE_BATCH", 200))
+        self.batch_pause = float(os.getenv("FORECAST_RETENTION_BATCH_PAUSE", 0.5))
+        self.interval_hours = float(os.getenv("FORECAST_RETENTION_INTERVAL_HOURS", 6))
+        # Pending accuracy predictions older than this can no longer be matched
+        self.pending_max_age_days = int(os.getenv("ACCURACY_PENDING_MAX_AGE_DAYS", 90))
+
+        self._task: Optional[asyncio.Task] = None
+
+        app_logger.info(
+            f"RetentionService initialized (keep_latest: {self.keep_latest}, "
+            f"full_days: {self.full_days}, snapshot_days: {self.snapshot_days})"
+        )
+
+    def select_for_deletion(
+        self,
+        headers: List[Dict[str, Any]],
+        now: Optional[datetime] = None
+    ) -> List[Tuple[ForecastId, Optional[int]]]:
+        """Apply the retention policy to forecast headers.
+
+        A forecast is kept if it is among the ``keep_latest`` newest for its
+        SKU and period, younger than ``full_days``, or the newest of its SKU,
+        period and calendar day (a daily snapshot) within ``snapshot_days``.
+
+        Args:
+            headers: Rows with id, sku_id, created_at and key_factors
+            now: Reference time, defaults to the current UTC time
+
+        Returns:
+            (forecast ID, period) of every forecast to delete
+        """
+        now = now or datetime.now(timezone.utc)
+        full_cutoff = now - timedelta(days=self.full_days)
+        snapshot_cutoff = now - timedelta(days=self.snapshot_days) if self.snapshot_days else None
+
+        groups: Dict[Tuple[str, Optional[int]], List[Tuple[datetime, Dict[str, Any]]]] = {}
+        for row in headers:
+            groups.setdefault((row["sku_id"], _forecast_period(row)), []).append((_created_at(row), row))
+
+        to_delete = []
+        for (_, period), rows in groups.items():
+            rows.sort(key=lambda item: item[0], reverse=True)
+            snapshot_days = set()
+            for rank, (created, row) in enumerate(rows):
+                day = created.date()
+                is_snapshot = day not in snapshot_days
+                snapshot_days.add(day)
+
+                if rank < self.keep_latest or created >= full_cutoff:
+                    continue
+                if is_snapshot and (snapshot_cutoff is None or created >= snapshot_cutoff):
+                    continue
+                to_delete.append((row["id"], period))
+
+        return to_delete
+
+    @property
+    def last_report(self) -> Optional[Dict[str, Any]]:
+        """Report of the last run by any worker, or None."""
+        value = shared_cache.get(NAMESPACE, "last_report")
+        return orjson.loads(value) if value is not None else None
+
+    def _scan(self, now: datetime) -> Tuple[int, List[Tuple[ForecastId, str]]]:
+        """Scan headers page by page and apply the policy one SKU at a time.
+
+        Only the headers of the current SKU and the IDs selected so far are
+        held in memory. Deletes run after the scan so offsets stay valid.
+
+        Returns:
+            Number of headers scanned and (forecast ID, SKU) to delete
+        """
+        scanned = 0
+        selected: List[Tuple[ForecastId, str]] = []
+        sku_rows: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            sku_id = sku_rows[0]["sku_id"]
+            selected.extend((forecast_id, sku_id) for forecast_id, _ in self.select_for_deletion(sku_rows, now))
+            sku_rows.clear()
+
+        for page in supabase_client.iter_forecast_headers():
+            for row in page:
+                scanned += 1
+                if sku_rows and row["sku_id"] != sku_rows[0]["sku_id"]:
+                    flush()
+                sku_rows.append(row)
+        if sku_rows:
+            flush()
+        return scanned, selected
+
+    def run_once(self) -> Dict[str, Any]:
+        """Apply the retention policy once.
+
+        Returns:
+            Report with scanned and deleted forecasts, deleted prediction
+            rows (as counted by the database) and elapsed time
+        """
+        started = time.perf_counter()
+        scanned, selected = self._scan(datetime.now(timezone.utc))
+
+        deleted = 0
+        deleted_predictions = 0
+        for start in range(0, len(selected), self.delete_batch_size):
+            batch = selected[start:start + self.delete_batch_size]
+            forecast_ids = [forecast_id for forecast_id, _ in batch]
+            # Explicitly, rather than by cascade, so the rows are counted
+            deleted_predictions += supabase_client.delete_forecast_predictions(forecast_ids)
+            deleted += supabase_client.delete_forecasts(forecast_ids)
+            data_versions.bump(FORECASTS, [sku_id for _, sku_id in batch])
+            # Leave room for request traffic between batches
+            if start + self.delete_batch_size < len(selected) and self.batch_pause:
+                time.sleep(self.batch_pause)
+
+        pruned_pending = accuracy_service.prune_pending(self.pending_max_age_days)
+
+        report = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "scanned": scanned,
+            "forecasts_deleted": deleted,
+            "prediction_rows_deleted": deleted_predictions,
+            "pending_predictions_pruned": pruned_pending,
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
+        shared_cache.set(NAMESPACE, "last_report", orjson.dumps(report))
+        app_logger.info(f"Forecast retention finished: {report}")
+        return report
+
+    def claim_run(self) -> bool:
+        """Claim this interval's run for this worker.
+
+        The claim expires shortly before the next interval, so a worker
+        that dies mid-run does not block the next one.
+
+        Returns:
+            True if no worker ran the job within the interval
+        """
+        token = uuid.uuid4().hex.encode()
+        ttl = max(self.interval_hours * 3600 * 0.9, 60)
+        return shared_cache.add(NAMESPACE, "run", token, ttl=ttl) == token
+
+    async def _run_periodically(self) -> None:
+        """Run the job every ``interval_hours`` until cancelled."""
+        while True:
+            try:
+                if self.claim_run():
+                    await asyncio.to_thread(self.run_once)
+                else:
+                    app_logger.debug("Forecast retention already ran in another worker")
+            except Exception as e:
+                app_logger.error(f"Forecast retention failed: {e}")
+            await asyncio.sleep(self.interval_hours * 3600)
+
+    def start(self) -> None:
+        """Schedule the periodic job on the running event loop."""
+        if self.interval_hours <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Cancel the periodic job."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Global instance
+retention_service = RetentionService()
@@ -0,0 +1,115 @@
+"""What-if temperature scenario service.
+
+This module evaluates the local temperature-aware model over a grid of
+temperature scenarios for one or more SKUs. All SKUs, scenarios and days
+are computed in one broadcast NumPy expression.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.utils.logger import app_logger
+from app.models.schemas import ScenarioRequest, ScenarioResponse, ScenarioSkuResult
+from app.services.supabase_client import supabase_client
+from app.services.local_model import local_model
+
+
+class ScenarioService:
+    """Service for temperature scenario sweeps."""
+
+    def __init__(self):
+        """Initialize scenario service."""
+        app_logger.info("ScenarioService initialized")
+
+    def build_temperature_grid(
+        self,
+        base: np.ndarray,
+        request: ScenarioRequest
+    ) -> Tuple[List[str], np.ndarray]:
+        """Stack offset and custom-curve scenarios into one matrix.
+
+        Args:
+            base: Climatology temperature per forecast day
+            request: Scenario request
+
+        Returns:
+            Tuple of (scenario labels, scenario x day temperature matrix)
+
+        Raises:
+            ValueError: If no scenario is given or a curve has the wrong length
+        """
+        offsets = np.asarray(request.temperature_offsets, dtype=float)
+        labels = [f"offset{offset:+.1f}" for offset in offsets]
+        grids = [base[None, :] + offsets[:, None]]
+
+        for name, curve in (request.temperature_curves or {}).items():
+            if len(curve) != base.size:
+                raise ValueError(
+                    f"Temperature curve '{name}' has {len(curve)} values, expected {base.size}"
+                )
+            labels.append(f"curve:{name}")
+            grids.append(np.asarray(curve, dtype=float)[None, :])
+
+        if not labels:
+            raise ValueError("At least one temperature offset or curve is required")
+
+        return labels, np.concatenate(grids, axis=0)
+
+    def run(self, request: ScenarioRequest) -> ScenarioResponse:
+        """Evaluate every scenario for every requested SKU.
+
+        Args:
+            request: SKUs, horizon and temperature scenarios
+
+        Returns:
+            Demand surface (scenario x day) per SKU
+
+        Raises:
+            ValueError: If the scenario definition is invalid
+        """
+        sku_ids = list(dict.fromkeys(request.sku_ids))
+        forecast_period = int(request.period.value)
+        start = datetime.now() + timedelta(days=1)
+
+        labels, temps = self.build_temperature_grid(
+            local_model.horizon_temperatures(start, forecast_period), request
+        )
+
+        histories: Dict[str, List[Dict[str, Any]]] = {sku_id: [] for sku_id in sku_ids}
+        for row in supabase_client.get_sales_history(sku_ids=sku_ids):
+            histories.setdefault(row["sku_id"], []).append(row)
+
+        params = [local_model.fit(histories[sku_id]) for sku_id in sku_ids]
+        intercepts = np.array([p["intercept"] for p in params])
+        slopes = np.array([p["slope"] for p in params])
+
+        # SKU x scenario x day in one pass
+        demand = np.clip(intercepts[:, None, None] + slopes[:, None, None] * temps[None, :, :], 0, None)
+        demand = np.round(demand, 1)
+        totals = np.round(demand.sum(axis=2), 1)
+
+        app_logger.info(
+            f"Evaluated {len(labels)} scenarios x {forecast_period} days for {len(sku_ids)} SKUs"
+        )
+
+        return ScenarioResponse(
+            dates=[(start + timedelta(days=i)).date() for i in range(forecast_period)],
+            scenarios=labels,
+            temperatures=np.round(temps, 1).tolist(),
+            results=[
+                ScenarioSkuResult(
+                    sku_id=sku_id,
+                    demand=demand[index].tolist(),
+                    totals=totals[index].tolist(),
+                    temp_elasticity=round(float(slopes[index]), 4),
+                    observations=params[index]["observations"]
+                )
+                for index, sku_id in enumerate(sku_ids)
+            ]
+        )
+
+
+# Global instance
+scenario_service = ScenarioService()
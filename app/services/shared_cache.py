@@ -0,0 +1,362 @@
+"""Cache shared by all worker processes on a host.
+
+With ``uvicorn --workers N`` every process has its own memory, so tokens,
+cached forecasts and data versions kept in Python objects diverge between
+workers. This module keeps them in a SQLite database in WAL mode, which
+any number of local processes can read concurrently while one writes, so
+a value set or invalidated by one worker is seen by all of them. No
+external service is needed.
+
+The ``memory`` backend keeps the same interface in a dict; it is the
+default under ``ENVIRONMENT=test`` and suits single-process runs.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+def default_path() -> str:
+    """Cache file in the service user's own cache directory.
+
+    Not in the shared temp directory, where another user could create the
+    file first or read it.
+    """
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "forecast_buddy", "shared_cache.sqlite3")
+
+
+class MemoryBackend:
+    """Process-local backend with the same semantics as ``SQLiteBackend``."""
+
+    def __init__(self):
+        """Initialize memory backend."""
+        self._values: Dict[Tuple[str, str], Tuple[bytes, Optional[float]]] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get((namespace, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._values[(namespace, key)]
+                return None
+            return value
+
+    def set(self, namespace: str, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._values[(namespace, key)] = (value, expires_at)
+
+    def add(self, namespace: str, key: str, value: bytes, now: float, expires_at: Optional[float]) -> bytes:
+        with self._lock:
+            entry = self._values.get((namespace, key))
+            if entry is None or (entry[1] is not None and entry[1] <= now):
+                self._values[(namespace, key)] = (value, expires_at)
+                return value
+            return entry[0]
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]],
+               now: float) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get((namespace, key))
+            current = entry[0] if entry is not None and (entry[1] is None or entry[1] > now) else None
+            value = fn(current)
+            if value is None:
+                return current
+            self._values[(namespace, key)] = (value, None)
+            return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._values.pop((namespace, key), None)
+
+    def delete_prefix(self, namespace: str, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._values if k[0] == namespace and k[1].startswith(prefix)]
+            for k in keys:
+                del self._values[k]
+            return len(keys)
+
+    def incr(self, namespace: str, key: str) -> int:
+        with self._lock:
+            value = self._counters.get((namespace, key), 0) + 1
+            self._counters[(namespace, key)] = value
+            return value
+
+    def counter(self, namespace: str, key: str) -> int:
+        with self._lock:
+            return self._counters.get((namespace, key), 0)
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [k for k, (_, expires_at) in self._values.items() if expires_at is not None and expires_at <= now]
+            for k in expired:
+                del self._values[k]
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._counters.clear()
+
+
+class SQLiteBackend:
+    """Backend in a SQLite file in WAL mode, shared by local processes."""
+
+    def __init__(self, path: str, busy_timeout: float):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path: Database file; all workers must use the same path
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        # Tokens live here. SQLite creates the -wal and -shm files when the
+        # database is first opened in WAL mode, with the database file's
+        # mode, so create all of them private to the service user
+        previous_umask = os.umask(0o077)
+        try:
+            # One connection per process, serialized by a lock; WAL lets other
+            # processes read while this one writes
+            self._conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+            self._lock = threading.Lock()
+            with self._lock:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL,"
+                    " PRIMARY KEY (namespace, key))"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS counters ("
+                    " namespace TEXT NOT NULL, key TEXT NOT NULL, value INTEGER NOT NULL,"
+                    " PRIMARY KEY (namespace, key))"
+                )
+        finally:
+            os.umask(previous_umask)
+
+        # Files left by an earlier run may have been created readable
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.chmod(path + suffix, 0o600)
+            except OSError:
+                pass
+
+    def get(self, namespace: str, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, now)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, expires_at)
+            )
+
+    def add(self, namespace: str, key: str, value: bytes, now: float, expires_at: Optional[float]) -> bytes:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ? AND expires_at <= ?", (namespace, key, now)
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, value, expires_at)
+                )
+                row = self._conn.execute(
+                    "SELECT value FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0]
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]],
+               now: float) -> Optional[bytes]:
+        with self._lock:
+            # The write lock is held from the read to the write, so concurrent
+            # updates from other processes are applied one after the other
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM cache WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, key, now)
+                ).fetchone()
+                current = row[0] if row else None
+                value = fn(current)
+                if value is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, NULL)",
+                        (namespace, key, value)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value if value is not None else current
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def delete_prefix(self, namespace: str, prefix: str) -> int:
+        # Range scan on the primary key instead of LIKE, which would need escaping
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key >= ? AND key < ?",
+                (namespace, prefix, prefix + "\U0010ffff")
+            )
+        return cursor.rowcount
+
+    def incr(self, namespace: str, key: str) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO counters (namespace, key, value) VALUES (?, ?, 1)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET value = value + 1",
+                    (namespace, key)
+                )
+                row = self._conn.execute(
+                    "SELECT value FROM counters WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0]
+
+    def counter(self, namespace: str, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM counters WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.execute("DELETE FROM counters")
+
+
+class SharedCache:
+    """Namespaced byte values with TTLs, and counters, shared across workers."""
+
+    def __init__(self, backend: Optional[str] = None, path: Optional[str] = None):
+        """Initialize shared cache from environment configuration.
+
+        Args:
+            backend: ``sqlite`` or ``memory``; defaults to SHARED_CACHE_BACKEND
+            path: SQLite file; defaults to SHARED_CACHE_PATH
+        """
+        default_backend = "memory" if os.getenv("ENVIRONMENT") == "test" else "sqlite"
+        self.backend_name = (backend or os.getenv("SHARED_CACHE_BACKEND", default_backend)).lower()
+        self.purge_every = int(os.getenv("SHARED_CACHE_PURGE_EVERY", 500))
+        self._writes = 0
+
+        if self.backend_name == "sqlite":
+            self.path = path or os.getenv("SHARED_CACHE_PATH") or default_path()
+            self._backend = SQLiteBackend(self.path, float(os.getenv("SHARED_CACHE_BUSY_TIMEOUT", 5)))
+        elif self.backend_name == "memory":
+            self.path = None
+            self._backend = MemoryBackend()
+        else:
+            raise ValueError(f"Unknown SHARED_CACHE_BACKEND: {self.backend_name}")
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """Value of a key, or None if it is missing or expired."""
+        return self._backend.get(namespace, key, time.time())
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value, for ``ttl`` seconds or until deleted.
+
+        Args:
+            namespace: Kind of value, e.g. "forecasts"
+            key: Key within the namespace
+            value: Serialized value
+            ttl: Lifetime in seconds; None keeps the value until deleted
+        """
+        now = time.time()
+        self._backend.set(namespace, key, value, now + ttl if ttl is not None else None)
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self._backend.purge_expired(now)
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None) -> bytes:
+        """Store a value unless one exists; return the value that is stored.
+
+        All workers calling ``add`` with different values agree on the one
+        stored by the first, which makes ``add`` with a TTL a lock held
+        until it expires.
+
+        Args:
+            namespace: Kind of value
+            key: Key within the namespace
+            value: Serialized value
+            ttl: Lifetime in seconds of a newly stored value; None keeps it
+                until deleted
+        """
+        now = time.time()
+        return self._backend.add(namespace, key, value, now, now + ttl if ttl is not None else None)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]]) -> Optional[bytes]:
+        """Atomically replace a value with ``fn(current value)``.
+
+        ``fn`` runs while other writers, in any process, wait; it should
+        only compute. The new value has no TTL.
+
+        Args:
+            namespace: Kind of value
+            key: Key within the namespace
+            fn: Receives the current value (None if missing) and returns the
+                new one, or None to leave the value unchanged
+
+        Returns:
+            The value stored after the update
+        """
+        return self._backend.update(namespace, key, fn, time.time())
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a key."""
+        self._backend.delete(namespace, key)
+
+    def delete_prefix(self, namespace: str, prefix: str) -> int:
+        """Remove all keys starting with ``prefix``; returns how many."""
+        return self._backend.delete_prefix(namespace, prefix)
+
+    def incr(self, namespace: str, key: str) -> int:
+        """Atomically increment a counter and return its new value."""
+        return self._backend.incr(namespace, key)
+
+    def counter(self, namespace: str, key: str) -> int:
+        """Current value of a counter, 0 if it was never incremented."""
+        return self._backend.counter(namespace, key)
+
+    def clear(self) -> None:
+        """Remove all values and counters."""
+        self._backend.clear()
+
+
+# Global instance
+shared_cache = SharedCache()
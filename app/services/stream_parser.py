@@ -0,0 +1,117 @@
+"""Incremental parser for streamed GigaChat forecast answers.
+
+This module extracts prediction objects from a partially received JSON
+answer as soon as each element of the ``predictions`` array is closed,
+without waiting for the rest of the completion.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from app.utils.logger import app_logger
+
+
+class IncrementalPredictionParser:
+    """Streaming extractor for elements of the ``predictions`` JSON array."""
+
+    def __init__(self, array_key: str = "predictions"):
+        """Initialize parser.
+
+        Args:
+            array_key: Name of the JSON array whose elements are emitted
+        """
+        self.array_key = array_key
+
+        self._buffer: List[str] = []
+        self._text = ""
+        self._pos = 0
+
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+
+        self._array_depth: Optional[int] = None
+        self._element_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Full text received so far."""
+        if self._buffer:
+            self._text += "".join(self._buffer)
+            self._buffer = []
+        return self._text
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume the next chunk of the completion.
+
+        Args:
+            chunk: Newly received completion text
+
+        Returns:
+            Prediction objects completed by this chunk, in order
+        """
+        self._buffer.append(chunk)
+        text = self.text
+        completed: List[Dict[str, Any]] = []
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+                continue
+
+            # Skip any prose before the JSON object starts
+            if not self._stack:
+                if char == "{":
+                    self._stack.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":":
+                self._pending_key = self._last_string
+            elif char == ",":
+                self._pending_key = None
+            elif char in "{[":
+                if char == "[" and self._array_depth is None and self._pending_key == self.array_key:
+                    self._array_depth = len(self._stack) + 1
+                elif char == "{" and self._array_depth is not None and len(self._stack) == self._array_depth:
+                    self._element_start = i
+                self._stack.append(char)
+                self._pending_key = None
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+
+                if (char == "}" and self._element_start is not None
+                        and len(self._stack) == self._array_depth):
+                    element = self._decode_element(text[self._element_start:i + 1])
+                    if element is not None:
+                        completed.append(element)
+                    self._element_start = None
+                elif char == "]" and self._array_depth is not None and len(self._stack) < self._array_depth:
+                    # Array closed; ignore any later arrays with the same key
+                    self._array_depth = -1
+
+        self._pos = len(text)
+        return completed
+
+    def _decode_element(self, element_text: str) -> Optional[Dict[str, Any]]:
+        """Decode one closed array element, skipping malformed ones."""
+        try:
+            element = json.loads(element_text)
+        except json.JSONDecodeError as e:
+            app_logger.warning(f"Skipping malformed streamed prediction: {e}")
+            return None
+        return element if isinstance(element, dict) else None
@@ -6,18 +6,69 @@ instead of direct PostgreSQL connection due to pooler issues.
 
 import os
 import requests
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple, Union
+from datetime import datetime, date, timedelta
 import json
 
+import orjson
+
 from app.utils.logger import app_logger
 
 
+# forecasts.id: SERIAL in setup_database.sql, a UUID string in supabase_schema.sql
+ForecastId = Union[int, str]
+
+def parse_json_body(content: bytes) -> List[Dict[str, Any]]:
+    """Parse a PostgREST response body once into a list of rows.
+
+    Args:
+        content: Raw response body
+
+    Returns:
+        Rows; a single JSON object is wrapped in a list, an empty body is []
+    """
+    if not content.strip():
+        return []
+    try:
+        data = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # orjson is strict about e.g. NaN; fall back to the stdlib parser
+        data = json.loads(content)
+    return data if isinstance(data, list) else [data]
+
+
 class SupabaseClient:
     """Client for Supabase database operations via REST API."""
 
+    # Connection settings, read from the environment on first use
+    _SETTINGS = ("test_mode", "base_url", "anon_key", "service_key", "rest_url")
+
     def __init__(self):
-        """Initialize Supabase REST API client."""
+        """Initialize Supabase REST API client.
+
+        Settings are read on first use rather than here, so importing a
+        service module, which builds its instances and registers ingest
+        listeners, does not require SUPABASE_URL.
+        """
+        # Callbacks notified with the rows of every successful sales insert
+        self._ingest_listeners: List[Callable[[List[Dict[str, Any]]], Any]] = []
+        # Stored prediction rows in test mode
+        self._mock_predictions: List[Dict[str, Any]] = []
+        self._configured = False
+
+    def __getattr__(self, name: str) -> Any:
+        """Read the settings when one of them is first accessed."""
+        if name in SupabaseClient._SETTINGS and not self.__dict__.get("_configured", True):
+            self._configure()
+            return getattr(self, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _configure(self) -> None:
+        """Read connection settings from the environment.
+
+        Raises:
+            ValueError: If SUPABASE_URL or SUPABASE_ANON_KEY is missing
+        """
         self.test_mode = os.getenv("ENVIRONMENT") == "test" or os.getenv("SUPABASE_URL") == "dummy_url"
 
         if self.test_mode:
@@ -26,17 +77,37 @@ class SupabaseClient:
             self.anon_key = "dummy_key"
             self.service_key = "dummy_service_key"
         else:
-            self.base_url = os.getenv("SUPABASE_URL", "").rstrip('/')
-            self.anon_key = os.getenv("SUPABASE_ANON_KEY", "")
-            self.service_key = os.getenv("SUPABASE_SERVICE_KEY", "")
+            base_url = os.getenv("SUPABASE_URL", "").rstrip('/')
+            anon_key = os.getenv("SUPABASE_ANON_KEY", "")
 
-            if not self.base_url:
+            if not base_url:
                 raise ValueError("SUPABASE_URL environment variable is required")
-            if not self.anon_key:
+            if not anon_key:
                 raise ValueError("SUPABASE_ANON_KEY environment variable is required")
 
+            self.base_url = base_url
+            self.anon_key = anon_key
+            self.service_key = os.getenv("SUPABASE_SERVICE_KEY", "")
             self.rest_url = f"{self.base_url}/rest/v1"
             app_logger.info("SupabaseClient initialized for REST API")
+        self._configured = True
+
+    def add_ingest_listener(self, listener: Callable[[List[Dict[str, Any]]], Any]) -> None:
+        """Register a callback for newly inserted sales rows.
+
+        Args:
+            listener: Function called with the formatted rows after each
+                successful ``insert_sales_data``
+        """
+        self._ingest_listeners.append(listener)
+
+    def _notify_ingest(self, rows: List[Dict[str, Any]]) -> None:
+        """Pass inserted rows to all ingest listeners."""
+        for listener in self._ingest_listeners:
+            try:
+                listener(rows)
+            except Exception as e:
+                app_logger.error(f"Ingest listener {getattr(listener, '__qualname__', listener)} failed: {e}")
 
     def _get_headers(self, use_service_key: bool = False) -> Dict[str, str]:
         """Get headers for REST API requests."""
@@ -54,12 +125,18 @@ class SupabaseClient:
             app_logger.error(error_msg)
             raise Exception(error_msg)
 
-        if response.text.strip():
-            return response.json() if isinstance(response.json(), list) else [response.json()]
-        return []
+        # Parse the body once
+        return parse_json_body(response.content)
+
+    def health_check(self, timeout: float = 10) -> bool:
+        """Check if Supabase REST API is accessible.
+
+        Args:
+            timeout: Seconds to wait for the answer
 
-    def health_check(self) -> bool:
-        """Check if Supabase REST API is accessible."""
+        Returns:
+            True if the REST API answered without an error
+        """
         if self.test_mode:
             return True
 
@@ -67,7 +144,7 @@ class SupabaseClient:
             response = requests.get(
                 f"{self.rest_url}/sales_data?limit=1",
                 headers=self._get_headers(),
-                timeout=10
+                timeout=timeout
             )
             return response.status_code < 400
         except Exception as e:
@@ -86,22 +163,23 @@ class SupabaseClient:
         if not sales_data:
             return 0
 
+        # Convert data to match database schema
+        formatted_data = []
+        for row in sales_data:
+            formatted_row = {
+                "sku_id": row.get("sku_id"),
+                "date": row.get("date").isoformat() if isinstance(row.get("date"), date) else row.get("date"),
+                "sales_quantity": row.get("sales_quantity", row.get("units_sold", 0)),
+                "avg_temp": row.get("avg_temp", row.get("weather_temp"))
+            }
+            formatted_data.append(formatted_row)
+
         if self.test_mode:
             app_logger.info(f"Mock: Inserted {len(sales_data)} rows into sales_data")
+            self._notify_ingest(formatted_data)
             return len(sales_data)
 
         try:
-            # Convert data to match database schema
-            formatted_data = []
-            for row in sales_data:
-                formatted_row = {
-                    "sku_id": row.get("sku_id"),
-                    "date": row.get("date").isoformat() if isinstance(row.get("date"), date) else row.get("date"),
-                    "sales_quantity": row.get("sales_quantity", row.get("units_sold", 0)),
-                    "avg_temp": row.get("avg_temp", row.get("weather_temp"))
-                }
-                formatted_data.append(formatted_row)
-
             response = requests.post(
                 f"{self.rest_url}/sales_data",
                 headers=self._get_headers(use_service_key=True),
@@ -113,6 +191,7 @@ class SupabaseClient:
             rows_affected = len(result) if result else len(formatted_data)
 
             app_logger.info(f"Inserted {rows_affected} rows into sales_data via REST API")
+            self._notify_ingest(formatted_data)
             return rows_affected
 
         except Exception as e:
@@ -160,7 +239,144 @@ class SupabaseClient:
             app_logger.error(f"Error getting sales data: {e}")
             raise
 
-    def insert_forecast(self, forecast_data: Dict[str, Any]) -> int:
+    def get_sales_history(
+        self,
+        sku_ids: Optional[List[str]] = None,
+        page_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Get the full sales history, optionally for selected SKUs, via REST API.
+
+        Rows are fetched page by page and ordered by SKU and date.
+
+        Args:
+            sku_ids: SKU identifiers to include, or None for all SKUs
+            page_size: Number of rows fetched per request
+
+        Returns:
+            List of sales records with sku_id, date, sales_quantity and avg_temp
+        """
+        if self.test_mode:
+            # Return a short weekly series per SKU for tests
+            rows = []
+            for index, sku_id in enumerate(sku_ids or ["SKU_001", "SKU_002"]):
+                for week in range(16):
+                    temp = -20.0 + week * 1.5
+                    rows.append({
+                        "sku_id": sku_id,
+                        "date": (date(2024, 1, 1) + timedelta(weeks=week)).isoformat(),
+                        "sales_quantity": int(60 - 2 * temp) + index * 10,
+                        "avg_temp": temp
+                    })
+            return rows
+
+        try:
+            params = {
+                "select": "sku_id,date,sales_quantity,avg_temp",
+                "order": "sku_id.asc,date.asc",
+                "limit": page_size
+            }
+            if sku_ids:
+                params["sku_id"] = f"in.({','.join(sku_ids)})"
+
+            results: List[Dict[str, Any]] = []
+            offset = 0
+            while True:
+                params["offset"] = offset
+                response = requests.get(
+                    f"{self.rest_url}/sales_data",
+                    headers=self._get_headers(),
+                    params=params,
+                    timeout=30
+                )
+                page = self._handle_response(response)
+                results.extend(page)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+
+            app_logger.info(f"Retrieved {len(results)} sales history records")
+            return results
+
+        except Exception as e:
+            app_logger.error(f"Error getting sales history: {e}")
+            raise
+
+    def get_temperature_history(self, sku_id: Optional[str] = None, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Get stored temperatures, one row per date, from one SKU's sales rows.
+
+        Temperatures are the city's weather, the same for every SKU on a
+        date, so reading one SKU's rows avoids transferring each date once
+        per SKU.
+
+        Args:
+            sku_id: Reference SKU; defaults to the SKU with the oldest
+                stored temperature, which likely has the longest history
+            page_size: Number of rows fetched per request
+
+        Returns:
+            List of records with date and avg_temp, ordered by date
+        """
+        if self.test_mode:
+            return [
+                {"date": row["date"], "avg_temp": row["avg_temp"]}
+                for row in self.get_sales_history(sku_ids=[sku_id or "SKU_001"])
+            ]
+
+        try:
+            if sku_id is None:
+                response = requests.get(
+                    f"{self.rest_url}/sales_data",
+                    headers=self._get_headers(),
+                    params={"select": "sku_id", "avg_temp": "not.is.null", "order": "date.asc", "limit": 1},
+                    timeout=10
+                )
+                oldest = self._handle_response(response)
+                if not oldest:
+                    return []
+                sku_id = oldest[0]["sku_id"]
+
+            params = {
+                "select": "date,avg_temp",
+                "sku_id": f"eq.{sku_id}",
+                "avg_temp": "not.is.null",
+                "order": "date.asc",
+                "limit": page_size
+            }
+
+            results: List[Dict[str, Any]] = []
+            offset = 0
+            while True:
+                params["offset"] = offset
+                response = requests.get(
+                    f"{self.rest_url}/sales_data",
+                    headers=self._get_headers(),
+                    params=params,
+                    timeout=30
+                )
+                page = self._handle_response(response)
+                results.extend(page)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+
+            app_logger.info(f"Retrieved {len(results)} temperature records of SKU {sku_id}")
+            return results
+
+        except Exception as e:
+            app_logger.error(f"Error getting temperature history: {e}")
+            raise
+
+    def _format_forecast_row(self, forecast_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a forecast header for the forecasts table."""
+        return {
+            "sku_id": forecast_data["sku_id"],
+            "forecast_date": forecast_data["forecast_date"].isoformat() if isinstance(forecast_data["forecast_date"], date) else forecast_data["forecast_date"],
+            "predicted_sales": forecast_data["predicted_sales"],
+            "confidence_score": forecast_data.get("confidence_score"),
+            "key_factors": forecast_data.get("key_factors", [])
+        }
+
+    def insert_forecast(self, forecast_data: Dict[str, Any]) -> ForecastId:
         """Insert forecast data into the forecasts table via REST API.
 
         Args:
@@ -174,18 +390,13 @@ class SupabaseClient:
             return 1
 
         try:
-            # Format data for database
-            formatted_data = {
-                "sku_id": forecast_data["sku_id"],
-                "forecast_date": forecast_data["forecast_date"].isoformat() if isinstance(forecast_data["forecast_date"], date) else forecast_data["forecast_date"],
-                "predicted_sales": forecast_data["predicted_sales"],
-                "confidence_score": forecast_data.get("confidence_score"),
-                "key_factors": forecast_data.get("key_factors", [])
-            }
+            formatted_data = self._format_forecast_row(forecast_data)
 
+            # Ask PostgREST to return the new id; predictions rows reference it
             response = requests.post(
                 f"{self.rest_url}/forecasts",
-                headers=self._get_headers(use_service_key=True),
+                headers={**self._get_headers(use_service_key=True), "Prefer": "return=representation"},
+                params={"select": "id"},
                 json=formatted_data,
                 timeout=30
             )
@@ -241,6 +452,337 @@ class SupabaseClient:
             app_logger.error(f"Error getting forecast history: {e}")
             raise
 
+    def insert_forecasts(self, forecasts: List[Dict[str, Any]]) -> List[ForecastId]:
+        """Insert several forecast headers in one request.
+
+        Args:
+            forecasts: Forecast data dictionaries
+
+        Returns:
+            Forecast IDs in the order of ``forecasts``
+        """
+        if not forecasts:
+            return []
+
+        if self.test_mode:
+            app_logger.info(f"Mock: Inserted {len(forecasts)} forecasts")
+            return [1] * len(forecasts)
+
+        try:
+            response = requests.post(
+                f"{self.rest_url}/forecasts",
+                headers={**self._get_headers(use_service_key=True), "Prefer": "return=representation"},
+                params={"select": "id"},
+                json=[self._format_forecast_row(forecast_data) for forecast_data in forecasts],
+                timeout=30
+            )
+
+            result = self._handle_response(response)
+            if len(result) != len(forecasts):
+                raise Exception(f"Expected {len(forecasts)} forecast IDs, got {len(result)}")
+
+            app_logger.info(f"Inserted {len(result)} forecasts via REST API")
+            return [row["id"] for row in result]
+
+        except Exception as e:
+            app_logger.error(f"Error inserting forecasts: {e}")
+            raise
+
+    def format_prediction_rows(
+        self,
+        forecast_id: ForecastId,
+        sku_id: str,
+        predictions: List[Dict[str, Any]],
+        forecast_model: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Format daily predictions as forecast_predictions rows."""
+        return [
+            {
+                "forecast_id": forecast_id,
+                "sku_id": sku_id,
+                "date": pred["date"].isoformat() if isinstance(pred["date"], date) else pred["date"],
+                "predicted_sales": pred["predicted_sales"],
+                "predicted_temp": pred.get("predicted_temp"),
+                "confidence": pred.get("confidence"),
+                "p10": pred.get("p10"),
+                "p50": pred.get("p50"),
+                "p90": pred.get("p90"),
+                "forecast_model": forecast_model
+            }
+            for pred in predictions
+        ]
+
+    def insert_forecast_predictions(
+        self,
+        forecast_id: ForecastId,
+        sku_id: str,
+        predictions: List[Dict[str, Any]],
+        forecast_model: Optional[str] = None
+    ) -> int:
+        """Insert the daily predictions of a forecast in one bulk request.
+
+        Args:
+            forecast_id: ID of the parent row in the forecasts table
+            sku_id: SKU identifier
+            predictions: Prediction dictionaries with date, predicted_sales,
+                confidence and optional predicted_temp, p10, p50 and p90
+            forecast_model: Model that produced the forecast
+
+        Returns:
+            Number of rows inserted
+        """
+        return self.insert_prediction_rows(
+            self.format_prediction_rows(forecast_id, sku_id, predictions, forecast_model)
+        )
+
+    def insert_prediction_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert formatted prediction rows of any number of forecasts in one request.
+
+        Args:
+            rows: Rows built by ``format_prediction_rows``
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+
+        if self.test_mode:
+            app_logger.info(f"Mock: Inserted {len(rows)} rows into forecast_predictions")
+            self._mock_predictions.extend(rows)
+            return len(rows)
+
+        try:
+            response = requests.post(
+                f"{self.rest_url}/forecast_predictions",
+                headers=self._get_headers(use_service_key=True),
+                json=rows,
+                timeout=30
+            )
+
+            self._handle_response(response)
+            app_logger.info(f"Inserted {len(rows)} forecast predictions")
+            return len(rows)
+
+        except Exception as e:
+            app_logger.error(f"Error inserting forecast predictions: {e}")
+            raise
+
+    def get_forecast_predictions(
+        self,
+        sku_id: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        forecast_id: Optional[ForecastId] = None,
+        limit: int = 1000,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Get stored daily predictions filtered by SKU, date range and forecast.
+
+        Only rows in the requested date range are transferred; filtering
+        happens in the database using the (sku_id, date) index.
+
+        Args:
+            sku_id: SKU identifier, or None for all SKUs
+            start_date: First prediction date to include
+            end_date: Last prediction date to include
+            forecast_id: Restrict to the predictions of one forecast
+            limit: Maximum number of rows to return
+            offset: Number of matching rows to skip, for paging
+
+        Returns:
+            Prediction rows ordered by date, newest forecast first within a day
+        """
+        if self.test_mode:
+            rows = [
+                row for row in self._mock_predictions
+                if (sku_id is None or row["sku_id"] == sku_id)
+                and (start_date is None or row["date"] >= start_date.isoformat())
+                and (end_date is None or row["date"] <= end_date.isoformat())
+                and (forecast_id is None or str(row["forecast_id"]) == str(forecast_id))
+            ]
+            # Insertion order stands in for the row ID
+            ordered = sorted(enumerate(rows), key=lambda item: (item[1]["date"], -item[0]))
+            return [row for _, row in ordered][offset:offset + limit]
+
+        # Repeated keys express an AND of both range bounds in PostgREST
+        params: List[Tuple[str, Any]] = [
+            ("select", "forecast_id,sku_id,date,predicted_sales,predicted_temp,confidence,p10,p50,p90,forecast_model"),
+            # Row IDs grow with inserts; forecast IDs may be UUIDs
+            ("order", "date.asc,id.desc"),
+            ("limit", limit),
+            ("offset", offset)
+        ]
+        if sku_id is not None:
+            params.append(("sku_id", f"eq.{sku_id}"))
+        if start_date is not None:
+            params.append(("date", f"gte.{start_date.isoformat()}"))
+        if end_date is not None:
+            params.append(("date", f"lte.{end_date.isoformat()}"))
+        if forecast_id is not None:
+            params.append(("forecast_id", f"eq.{forecast_id}"))
+
+        try:
+            response = requests.get(
+                f"{self.rest_url}/forecast_predictions",
+                headers=self._get_headers(),
+                params=params,
+                timeout=10
+            )
+
+            results = self._handle_response(response)
+            app_logger.info(f"Retrieved {len(results)} forecast predictions")
+            return results
+
+        except Exception as e:
+            app_logger.error(f"Error getting forecast predictions: {e}")
+            raise
+
+    def iter_forecast_headers(self, page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of id, SKU, creation time and key factors of stored forecasts.
+
+        Pages are ordered by SKU and newest first, so the forecasts of a SKU
+        are contiguous and callers can process one SKU at a time.
+
+        Args:
+            page_size: Number of rows fetched per request
+
+        Yields:
+            Lists of forecast header records
+        """
+        if self.test_mode:
+            return
+
+        params = {
+            "select": "id,sku_id,created_at,key_factors",
+            "order": "sku_id.asc,created_at.desc,id.desc",
+            "limit": page_size
+        }
+
+        offset = 0
+        while True:
+            params["offset"] = offset
+            try:
+                response = requests.get(
+                    f"{self.rest_url}/forecasts",
+                    headers=self._get_headers(),
+                    params=params,
+                    timeout=30
+                )
+                page = self._handle_response(response)
+            except Exception as e:
+                app_logger.error(f"Error getting forecast headers: {e}")
+                raise
+            if page:
+                yield page
+            if len(page) < page_size:
+                break
+            offset += page_size
+
+    def delete_forecast_predictions(self, forecast_ids: List[ForecastId]) -> int:
+        """Delete the daily prediction rows of forecasts.
+
+        Args:
+            forecast_ids: Forecasts whose predictions are deleted in one request
+
+        Returns:
+            Number of prediction rows deleted
+        """
+        if not forecast_ids:
+            return 0
+
+        if self.test_mode:
+            ids = set(forecast_ids)
+            kept = [row for row in self._mock_predictions if row["forecast_id"] not in ids]
+            deleted = len(self._mock_predictions) - len(kept)
+            self._mock_predictions = kept
+            return deleted
+
+        try:
+            response = requests.delete(
+                f"{self.rest_url}/forecast_predictions",
+                headers={**self._get_headers(use_service_key=True), "Prefer": "return=representation"},
+                params={
+                    "forecast_id": f"in.({','.join(str(forecast_id) for forecast_id in forecast_ids)})",
+                    "select": "forecast_id"
+                },
+                timeout=30
+            )
+
+            result = self._handle_response(response)
+            app_logger.info(f"Deleted {len(result)} forecast predictions via REST API")
+            return len(result)
+
+        except Exception as e:
+            app_logger.error(f"Error deleting forecast predictions: {e}")
+            raise
+
+    def delete_forecasts(self, forecast_ids: List[ForecastId]) -> int:
+        """Delete forecasts by ID; their predictions are removed by cascade.
+
+        Args:
+            forecast_ids: IDs to delete in one request
+
+        Returns:
+            Number of forecasts deleted
+        """
+        if not forecast_ids:
+            return 0
+
+        if self.test_mode:
+            app_logger.info(f"Mock: Deleted {len(forecast_ids)} forecasts")
+            return len(forecast_ids)
+
+        try:
+            response = requests.delete(
+                f"{self.rest_url}/forecasts",
+                headers={**self._get_headers(use_service_key=True), "Prefer": "return=representation"},
+                params={"id": f"in.({','.join(str(forecast_id) for forecast_id in forecast_ids)})", "select": "id"},
+                timeout=30
+            )
+
+            result = self._handle_response(response)
+            app_logger.info(f"Deleted {len(result)} forecasts via REST API")
+            return len(result)
+
+        except Exception as e:
+            app_logger.error(f"Error deleting forecasts: {e}")
+            raise
+
+    def insert_api_usage_stats(self, usage_rows: List[Dict[str, Any]]) -> int:
+        """Insert API usage records into the api_usage_stats table via REST API.
+
+        Args:
+            usage_rows: List of usage dictionaries matching the table columns
+
+        Returns:
+            Number of rows inserted
+        """
+        if not usage_rows:
+            return 0
+
+        if self.test_mode:
+            app_logger.info(f"Mock: Inserted {len(usage_rows)} rows into api_usage_stats")
+            return len(usage_rows)
+
+        try:
+            response = requests.post(
+                f"{self.rest_url}/api_usage_stats",
+                headers=self._get_headers(use_service_key=True),
+                json=usage_rows,
+                timeout=30
+            )
+
+            result = self._handle_response(response)
+            rows_affected = len(result) if result else len(usage_rows)
+
+            app_logger.info(f"Inserted {rows_affected} rows into api_usage_stats via REST API")
+            return rows_affected
+
+        except Exception as e:
+            app_logger.error(f"Error inserting usage stats: {e}")
+            raise
+
     def get_all_sku_ids(self) -> List[str]:
         """Get all unique SKU IDs from sales data."""
         if self.test_mode:
@@ -266,6 +808,41 @@ class SupabaseClient:
             app_logger.error(f"Error getting SKU IDs: {e}")
             return []
 
+    def get_recent_sku_ids(self, limit: int = 20, scan_rows: int = 1000) -> List[str]:
+        """Get the SKUs with the most recently written sales rows.
+
+        Args:
+            limit: Maximum number of SKU IDs to return
+            scan_rows: Number of newest rows scanned for distinct SKUs
+
+        Returns:
+            SKU IDs, most recently active first
+        """
+        if self.test_mode:
+            return ["SKU_001", "SKU_002"][:limit]
+
+        try:
+            response = requests.get(
+                f"{self.rest_url}/sales_data",
+                headers=self._get_headers(),
+                params={
+                    "select": "sku_id",
+                    "order": "created_at.desc",
+                    "limit": scan_rows
+                },
+                timeout=10
+            )
+
+            results = self._handle_response(response)
+            # dict keeps first-seen order, i.e. most recent first
+            sku_ids = list(dict.fromkeys(row["sku_id"] for row in results if row.get("sku_id")))[:limit]
+            app_logger.info(f"Retrieved {len(sku_ids)} recently active SKU IDs")
+            return sku_ids
+
+        except Exception as e:
+            app_logger.error(f"Error getting recent SKU IDs: {e}")
+            return []
+
 
 # Global instance
 supabase_client = SupabaseClient()
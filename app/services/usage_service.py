@@ -0,0 +1,140 @@
+"""Usage accounting service for GigaChat requests.
+
+This module records prompt and completion token counts for every GigaChat
+call and writes them in batches to the ``api_usage_stats`` table. Writes
+run in a background thread, so a GigaChat call never waits on Supabase.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import supabase_client
+
+
+class UsageService:
+    """Service for buffering and persisting GigaChat token usage."""
+
+    def __init__(self):
+        """Initialize usage service."""
+        self.flush_size = int(os.getenv("USAGE_FLUSH_SIZE", 20))
+        # Records kept while writes fail; the oldest are dropped beyond this
+        self.max_buffer = int(os.getenv("USAGE_MAX_BUFFER", 1000))
+
+        self._lock = threading.Lock()
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=self.max_buffer)
+        self._dropped = 0
+        self._flush_thread: Optional[threading.Thread] = None
+
+        # Running totals since process start
+        self._calls = 0
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+
+        app_logger.info(f"UsageService initialized (flush_size: {self.flush_size})")
+
+    def record_gigachat_call(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        response_time_ms: int,
+        status_code: int = 200,
+        endpoint: str = "gigachat/chat/completions"
+    ) -> None:
+        """Record token usage of a single GigaChat completion.
+
+        The record is buffered; once ``flush_size`` records have
+        accumulated they are flushed in a background thread.
+
+        Args:
+            prompt_tokens: Tokens consumed by the prompt
+            completion_tokens: Tokens produced by the completion
+            response_time_ms: Upstream response time in milliseconds
+            status_code: HTTP status returned by GigaChat
+            endpoint: Logical endpoint name stored with the record
+        """
+        app_logger.debug(
+            f"GigaChat usage: prompt={prompt_tokens}, completion={completion_tokens}, "
+            f"time={response_time_ms}ms"
+        )
+
+        with self._lock:
+            self._calls += 1
+            self._prompt_tokens += prompt_tokens
+            self._completion_tokens += completion_tokens
+            if len(self._buffer) == self.max_buffer:
+                self._dropped += 1
+            self._buffer.append({
+                "endpoint": endpoint,
+                "method": "POST",
+                "status_code": status_code,
+                "response_time_ms": response_time_ms,
+                "gigachat_tokens_used": prompt_tokens + completion_tokens
+            })
+            should_flush = len(self._buffer) >= self.flush_size
+
+        if should_flush:
+            self._flush_in_background()
+
+    def _flush_in_background(self) -> None:
+        """Start a flush thread unless one is already running."""
+        with self._lock:
+            if self._flush_thread is not None and self._flush_thread.is_alive():
+                return
+            self._flush_thread = threading.Thread(target=self._flush_full_batches, name="usage-flush", daemon=True)
+            self._flush_thread.start()
+
+    def _flush_full_batches(self) -> None:
+        """Flush until fewer than ``flush_size`` records wait or a write fails."""
+        while self.flush() and len(self._buffer) >= self.flush_size:
+            pass
+
+    def flush(self) -> int:
+        """Write buffered usage records to the database.
+
+        Returns:
+            Number of records written
+        """
+        with self._lock:
+            batch = list(self._buffer)
+            self._buffer.clear()
+
+        if not batch:
+            return 0
+
+        try:
+            return supabase_client.insert_api_usage_stats(batch)
+        except Exception as e:
+            app_logger.error(f"Error flushing usage stats: {e}")
+            # Put the batch back so the next flush retries it, keeping the
+            # newest records if the buffer overflows while writes fail
+            with self._lock:
+                records = batch + list(self._buffer)
+                overflow = max(0, len(records) - self.max_buffer)
+                self._dropped += overflow
+                self._buffer = deque(records[overflow:], maxlen=self.max_buffer)
+            if overflow:
+                app_logger.warning(f"Usage buffer full, dropped {overflow} oldest records")
+            return 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get token usage totals since process start.
+
+        Returns:
+            Dictionary with call count, token totals, pending and dropped records
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "prompt_tokens": self._prompt_tokens,
+                "completion_tokens": self._completion_tokens,
+                "total_tokens": self._prompt_tokens + self._completion_tokens,
+                "pending_records": len(self._buffer),
+                "dropped_records": self._dropped
+            }
+
+
+# Global instance
+usage_service = UsageService()
@@ -0,0 +1,120 @@
+"""Cache warm-up after start-up.
+
+After a deploy the first users would pay for an uncached SKU list and
+cold per-SKU features. This module preloads the SKU list, and the feature
+store of the most recently active SKUs, in the background within a time
+budget once the application is already serving requests.
+
+Nothing else is preloaded. Stored forecasts, sales rows and forecast
+history are not cached by the API, so /data, /forecast-history and the
+history read of /forecast still query Supabase. GigaChat answers are not
+rebuilt from stored forecasts, which lack the explanation and request
+context of the answer; the shared cache keeps live answers across
+restarts instead.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from app.utils.logger import app_logger
+from app.services.supabase_client import supabase_client
+from app.services.data_versions import data_versions
+from app.services.feature_store import feature_store
+
+
+class WarmupService:
+    """Preloads the SKU list and hot SKUs' features within a time budget."""
+
+    def __init__(self):
+        """Initialize warm-up service from environment configuration."""
+        self.enabled = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+        self.budget = float(os.getenv("WARMUP_BUDGET_SECONDS", 30))
+        self.max_skus = int(os.getenv("WARMUP_MAX_SKUS", 20))
+        self.history_chunk = int(os.getenv("WARMUP_HISTORY_CHUNK", 10))
+
+        # pending -> running -> done | partial | failed; or disabled
+        self.status = "disabled" if not self.enabled else "pending"
+        self.report: Dict[str, Any] = {}
+        self._cancelled = threading.Event()
+
+        app_logger.info(
+            f"WarmupService initialized (enabled: {self.enabled}, budget: {self.budget}s, "
+            f"max_skus: {self.max_skus})"
+        )
+
+    @property
+    def warm(self) -> bool:
+        """Whether the last warm-up completed within its budget."""
+        return self.status == "done"
+
+    def cancel(self) -> None:
+        """Stop a running warm-up at the next step, e.g. on shutdown."""
+        self._cancelled.set()
+
+    def _warm_history(self, sku_ids: List[str], deadline: float) -> Dict[str, int]:
+        """Fetch history in chunks and seed the feature store."""
+        seeded = covered = 0
+        for start in range(0, len(sku_ids), self.history_chunk):
+            if time.perf_counter() >= deadline or self._cancelled.is_set():
+                break
+            chunk = sku_ids[start:start + self.history_chunk]
+            by_sku: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for row in supabase_client.get_sales_history(sku_ids=chunk):
+                by_sku[row["sku_id"]].append(row)
+            for sku_id, rows in by_sku.items():
+                feature_store.features_for(sku_id, rows)
+                seeded += 1
+            covered += len(chunk)
+        return {"history_skus": seeded, "covered_skus": covered}
+
+    def run(self) -> Dict[str, Any]:
+        """Warm caches once; meant to run in a background thread.
+
+        Steps, each skipped once the budget is spent: the SKU catalog and
+        the feature store of the most recently active SKUs, seeded from
+        their history. Predictions awaiting actuals are loaded by the
+        accuracy service itself at start-up.
+
+        Returns:
+            Report with status, counts per step and elapsed time
+        """
+        if not self.enabled:
+            return self.report
+
+        started = time.perf_counter()
+        deadline = started + self.budget
+        self.status = "running"
+        self._cancelled.clear()
+        report: Dict[str, Any] = {"started_at": datetime.now(timezone.utc).isoformat()}
+
+        try:
+            catalog, _ = data_versions.sku_list(supabase_client.get_all_sku_ids)
+            report["catalog_skus"] = len(catalog)
+
+            hot = supabase_client.get_recent_sku_ids(self.max_skus) or catalog[:self.max_skus]
+            report["hot_skus"] = len(hot)
+
+            report.update(self._warm_history(hot, deadline))
+
+            # The history step runs last, so it covering every hot SKU means
+            # no step was cut short by the budget
+            finished = report["covered_skus"] == len(hot) and not self._cancelled.is_set()
+            self.status = "done" if finished else "partial"
+        except Exception as e:
+            app_logger.error(f"Cache warm-up failed: {e}")
+            report["error"] = str(e)
+            self.status = "failed"
+
+        report["status"] = self.status
+        report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        self.report = report
+        app_logger.info(f"Cache warm-up finished: {report}")
+        return report
+
+
+# Global instance
+warmup_service = WarmupService()
@@ -0,0 +1,162 @@
+"""Write-behind queue for database persistence.
+
+This module provides a bounded in-process queue drained by a background
+thread that writes items in batches and retries failed batches with
+exponential backoff, so request handlers never wait on the database.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.utils.logger import app_logger
+
+
+class WriteBehindQueue:
+    """Bounded queue whose items are persisted in batches by a worker thread."""
+
+    def __init__(self, name: str, writer: Callable[[List[Any]], Any]):
+        """Initialize the queue.
+
+        Args:
+            name: Queue name used in logs and metrics
+            writer: Function persisting a batch of items; raises on failure
+        """
+        self.name = name
+        self.writer = writer
+        self.max_size = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", 1000))
+        self.batch_size = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 20))
+        self.max_retries = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", 5))
+        self.retry_backoff = float(os.getenv("WRITE_BEHIND_RETRY_BACKOFF", 0.5))
+        self.max_backoff = float(os.getenv("WRITE_BEHIND_MAX_BACKOFF", 30))
+
+        self._queue: Deque[Any] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._in_flight = 0
+
+        self._enqueued = 0
+        self._written = 0
+        self._dropped_full = 0
+        self._dropped_failed = 0
+        self._retries = 0
+        self._batches = 0
+
+        app_logger.info(
+            f"WriteBehindQueue '{name}' initialized (max_size: {self.max_size}, batch_size: {self.batch_size})"
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is accepting items."""
+        return self._thread is not None and self._thread.is_alive() and not self._stopping
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+        self._thread.start()
+        app_logger.info(f"WriteBehindQueue '{self.name}' started")
+
+    def stop(self, timeout: float = 10.0) -> int:
+        """Stop accepting items and drain the backlog.
+
+        Args:
+            timeout: Seconds to wait for the backlog to be written
+
+        Returns:
+            Number of items still unwritten when the wait ended
+        """
+        if self._thread is None:
+            return len(self._queue)
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+        self._thread.join(timeout)
+        remaining = len(self._queue) + self._in_flight
+        if remaining:
+            app_logger.warning(f"WriteBehindQueue '{self.name}' stopped with {remaining} unwritten items")
+        else:
+            app_logger.info(f"WriteBehindQueue '{self.name}' drained")
+        self._thread = None
+        return remaining
+
+    def submit(self, item: Any) -> bool:
+        """Queue an item for persistence.
+
+        Args:
+            item: Item passed to the writer as part of a batch
+
+        Returns:
+            False if the queue was full and the item was dropped
+        """
+        with self._condition:
+            if len(self._queue) >= self.max_size:
+                self._dropped_full += 1
+                app_logger.warning(f"WriteBehindQueue '{self.name}' full, dropping item")
+                return False
+            self._queue.append(item)
+            self._enqueued += 1
+            self._condition.notify()
+        return True
+
+    def _run(self) -> None:
+        """Worker loop: take up to ``batch_size`` items and write them."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if not self._queue and self._stopping:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+
+            self._write_with_retry(batch)
+
+            with self._condition:
+                self._in_flight = 0
+
+    def _write_with_retry(self, batch: List[Any]) -> None:
+        """Write a batch, retrying with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.writer(batch)
+                self._written += len(batch)
+                self._batches += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._dropped_failed += len(batch)
+                    app_logger.error(
+                        f"WriteBehindQueue '{self.name}' dropped {len(batch)} items after "
+                        f"{attempt + 1} attempts: {e}"
+                    )
+                    return
+                self._retries += 1
+                delay = min(self.retry_backoff * (2 ** attempt), self.max_backoff)
+                app_logger.warning(
+                    f"WriteBehindQueue '{self.name}' write failed ({e}), retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Backlog, throughput and drop counters."""
+        with self._condition:
+            backlog = len(self._queue) + self._in_flight
+        return {
+            "running": self.running,
+            "backlog": backlog,
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "batches": self._batches,
+            "retries": self._retries,
+            "dropped_queue_full": self._dropped_full,
+            "dropped_write_failed": self._dropped_failed
+        }
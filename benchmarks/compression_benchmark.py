@@ -0,0 +1,57 @@
+"""Benchmark bytes on the wire with response compression.
+
+Renders typical response bodies the way the endpoints do and reports
+their size uncompressed, with gzip at the configured level and, when the
+optional ``brotli`` package is installed, with brotli, plus the time
+``CompressionMiddleware`` spends compressing each one.
+
+Usage:
+    ENVIRONMENT=test python -m benchmarks.compression_benchmark
+"""
+
+import os
+import timeit
+
+os.environ.setdefault("ENVIRONMENT", "test")
+
+from fastapi.responses import ORJSONResponse
+
+from app.api.endpoints import SALES_ROW_FIELDS, _forecast_v2_response, _project_row, _serialize_forecast
+from app.middleware.compression import CompressionMiddleware, brotli
+from benchmarks.serialization_benchmark import _forecast, _history_rows, _sales_rows
+
+
+def _bodies():
+    sales = [_project_row(row, SALES_ROW_FIELDS) for row in _sales_rows(200)]
+    forecast = _forecast(30)
+    return {
+        "GET /data (200 rows)": ORJSONResponse({"sku_id": "SKU_001", "data": sales, "total_records": 200}).body,
+        "GET /forecast-history (10 rows)": ORJSONResponse({"forecasts": _history_rows(10)}).body,
+        "POST /forecast legacy (30 days)": ORJSONResponse(_serialize_forecast(forecast)).body,
+        "POST /forecast v2 (30 days)": _forecast_v2_response([forecast]).body,
+    }
+
+
+def main():
+    middleware = CompressionMiddleware(app=None)
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    header = f"{'response':<36}{'identity':>10}"
+    for encoding in encodings:
+        header += f"{encoding + ' (B)':>12}{'saved':>8}{'us':>8}"
+    print(header)
+
+    for name, body in _bodies().items():
+        line = f"{name:<36}{len(body):>10}"
+        for encoding in encodings:
+            size = len(middleware.compress(body, encoding))
+            seconds = min(timeit.repeat(lambda: middleware.compress(body, encoding), number=200, repeat=3)) / 200
+            line += f"{size:>12}{1 - size / len(body):>8.0%}{seconds * 1e6:>8.0f}"
+        print(line)
+
+    if brotli is None:
+        print("brotli not installed; only gzip measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark response serialization paths.
+
+Compares the previous path (build Pydantic models from DB rows, then
+``jsonable_encoder`` and stdlib ``json``) with the current one (project
+trusted rows and render with orjson) for a 200-row sales response, a
+10-item forecast history and a 30-day forecast in the legacy and v2 shapes.
+
+Usage:
+    ENVIRONMENT=test python -m benchmarks.serialization_benchmark
+"""
+
+import json
+import os
+import timeit
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("ENVIRONMENT", "test")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.api.endpoints import (
+    FORECAST_HISTORY_FIELDS, SALES_ROW_FIELDS, _forecast_v2_response, _project_row, _serialize_forecast
+)
+from app.models.schemas import (
+    ForecastHistoryItem, ForecastHistoryResponse, ForecastResponse, ForecastResult,
+    SalesDataResponse, SalesDataRow
+)
+
+
+def _sales_rows(count=200):
+    start = date(2023, 1, 2)
+    return [
+        {
+            "id": i,
+            "sku_id": "SKU_001",
+            "date": (start + timedelta(weeks=i)).isoformat(),
+            "sales_quantity": 40 + i % 17,
+            "avg_temp": -20.0 + i % 30,
+            "created_at": "2024-01-01T00:00:00+00:00"
+        }
+        for i in range(count)
+    ]
+
+
+def _history_rows(count=10):
+    return [
+        {
+            "id": i,
+            "sku_id": "SKU_001",
+            "forecast_date": "2024-01-01",
+            "predicted_sales": 150 + i,
+            "confidence_score": 0.85,
+            "key_factors": ["gigachat", "period_30"],
+            "created_at": "2024-01-01T00:00:00+00:00"
+        }
+        for i in range(count)
+    ]
+
+
+def _forecast(days=30):
+    start = date(2024, 12, 1)
+    predictions = [
+        ForecastResult(
+            date=start + timedelta(days=i), predicted_sales=5 + i % 4, confidence=0.8,
+            predicted_temp=-18.5, p10=3, p50=5, p90=8
+        )
+        for i in range(days)
+    ]
+    return ForecastResponse(
+        sku_id="SKU_001", forecast_period=days, predictions=predictions,
+        total_predicted_sales=sum(p.predicted_sales for p in predictions),
+        average_confidence=0.8, model_explanation="benchmark"
+    )
+
+
+def old_sales(rows):
+    data = [
+        SalesDataRow(
+            id=row.get("id"), sku_id=row["sku_id"],
+            date=datetime.fromisoformat(row["date"]).date(),
+            sales_quantity=row["sales_quantity"], avg_temp=row.get("avg_temp"),
+            created_at=datetime.fromisoformat(row["created_at"])
+        )
+        for row in rows
+    ]
+    response = SalesDataResponse(sku_id="SKU_001", data=data, total_records=len(data))
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def new_sales(rows):
+    data = [_project_row(row, SALES_ROW_FIELDS) for row in rows]
+    return ORJSONResponse({"sku_id": "SKU_001", "data": data, "total_records": len(data)}).body
+
+
+def old_history(rows):
+    items = [
+        ForecastHistoryItem(
+            id=row["id"], sku_id=row["sku_id"],
+            forecast_date=datetime.fromisoformat(row["forecast_date"]).date(),
+            predicted_sales=row["predicted_sales"], confidence_score=row.get("confidence_score"),
+            key_factors=row.get("key_factors", []),
+            created_at=datetime.fromisoformat(row["created_at"])
+        )
+        for row in rows
+    ]
+    response = ForecastHistoryResponse(sku_id="SKU_001", forecasts=items, total_count=len(items))
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def new_history(rows):
+    items = [_project_row(row, FORECAST_HISTORY_FIELDS) for row in rows]
+    return ORJSONResponse({"sku_id": "SKU_001", "forecasts": items, "total_count": len(items)}).body
+
+
+def _report(name, old, new, number):
+    old_us = min(timeit.repeat(old, number=number, repeat=5)) / number * 1e6
+    new_us = min(timeit.repeat(new, number=number, repeat=5)) / number * 1e6
+    print(f"{name:<34}{old_us:>12.1f}{new_us:>12.1f}{old_us / new_us:>9.1f}x")
+
+
+def main():
+    sales = _sales_rows()
+    history = _history_rows()
+    forecast = _forecast()
+
+    print(f"{'endpoint':<34}{'old (us)':>12}{'new (us)':>12}{'speedup':>10}")
+    _report("GET /data (200 rows)", lambda: old_sales(sales), lambda: new_sales(sales), 200)
+    _report("GET /forecast-history (10 rows)", lambda: old_history(history), lambda: new_history(history), 2000)
+    _report(
+        "POST /forecast legacy (30 days)",
+        lambda: json.dumps(jsonable_encoder(_serialize_forecast(forecast))).encode(),
+        lambda: ORJSONResponse(_serialize_forecast(forecast)).body,
+        2000
+    )
+    _report(
+        "POST /forecast v2 (30 days)",
+        lambda: json.dumps(jsonable_encoder(_serialize_forecast(forecast))).encode(),
+        lambda: _forecast_v2_response([forecast]).body,
+        2000
+    )
+
+
+if __name__ == "__main__":
+    main()
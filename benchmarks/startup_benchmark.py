@@ -0,0 +1,58 @@
+"""Benchmark cold start of the application.
+
+Starts fresh interpreters and measures, per run: importing ``app.main``
+(FastAPI itself is imported beforehand, so only the app's own cost counts),
+running the lifespan start-up until the app accepts requests, the first
+request to ``/`` and the first request to a data endpoint, which loads
+its services on demand. The median of the runs is reported.
+
+Usage:
+    ENVIRONMENT=test python -m benchmarks.startup_benchmark [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import json, time
+from fastapi.testclient import TestClient
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.get("/")
+    first = time.perf_counter()
+    client.get("/api/v1/sku-list")
+    data = time.perf_counter()
+print(json.dumps({
+    "import app.main": imported - started,
+    "lifespan start-up": ready - imported,
+    "first request (/)": first - ready,
+    "first data request": data - first,
+    "ready to serve (total)": ready - started,
+}))
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    env = {**os.environ, "ENVIRONMENT": os.environ.get("ENVIRONMENT", "test"), "LOG_LEVEL": "WARNING"}
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"median of {runs} cold starts")
+    for name in samples[0]:
+        print(f"{name:<26}{statistics.median(sample[name] for sample in samples) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,23 @@ CREATE TABLE IF NOT EXISTS forecasts (
     generated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Create forecast_predictions table: one row per forecast day, so
+-- predictions can be filtered by date without reading whole forecasts
+CREATE TABLE IF NOT EXISTS forecast_predictions (
+    id BIGSERIAL PRIMARY KEY,
+    forecast_id INTEGER NOT NULL REFERENCES forecasts(id) ON DELETE CASCADE,
+    sku_id VARCHAR(100) NOT NULL,
+    date DATE NOT NULL,
+    predicted_sales INTEGER NOT NULL DEFAULT 0,
+    predicted_temp DECIMAL(5,2),
+    confidence DECIMAL(3,2),
+    p10 INTEGER,
+    p50 INTEGER,
+    p90 INTEGER,
+    forecast_model VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Create user_inputs table (optional, for future use)
 CREATE TABLE IF NOT EXISTS user_inputs (
     id SERIAL PRIMARY KEY,
@@ -39,6 +56,8 @@ CREATE TABLE IF NOT EXISTS user_inputs (
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_sales_data_sku_date ON sales_data(sku_id, date DESC);
 CREATE INDEX IF NOT EXISTS idx_forecasts_sku_generated ON forecasts(sku_id, generated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_forecast_predictions_sku_date ON forecast_predictions(sku_id, date);
+CREATE INDEX IF NOT EXISTS idx_forecast_predictions_forecast ON forecast_predictions(forecast_id);
 
 -- Insert some sample data for testing
 INSERT INTO sales_data (sku_id, date, units_sold, revenue, weather_temp, season) VALUES
@@ -52,6 +71,7 @@ ON CONFLICT (sku_id, date) DO NOTHING;
 -- Grant necessary permissions (if using RLS)
 -- ALTER TABLE sales_data ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE forecasts ENABLE ROW LEVEL SECURITY;
+-- ALTER TABLE forecast_predictions ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE user_inputs ENABLE ROW LEVEL SECURITY;
 
 -- Create policies (uncomment if you want to enable RLS)
@@ -43,6 +43,30 @@ CREATE INDEX IF NOT EXISTS idx_forecasts_sku_id ON forecasts(sku_id);
 CREATE INDEX IF NOT EXISTS idx_forecasts_created_at ON forecasts(created_at);
 CREATE INDEX IF NOT EXISTS idx_forecasts_type ON forecasts(forecast_type);
 
+-- ==========================================
+-- 2a. FORECAST PREDICTIONS TABLE
+-- ==========================================
+-- One row per forecast day, so predictions can be filtered by date
+-- without reading whole forecasts; deleted together with their forecast
+CREATE TABLE IF NOT EXISTS forecast_predictions (
+    id BIGSERIAL PRIMARY KEY,
+    forecast_id UUID NOT NULL REFERENCES forecasts(id) ON DELETE CASCADE,
+    sku_id VARCHAR(100) NOT NULL,
+    date DATE NOT NULL,
+    predicted_sales INTEGER NOT NULL DEFAULT 0,
+    predicted_temp DECIMAL(5,2),
+    confidence DECIMAL(3,2),
+    p10 INTEGER,
+    p50 INTEGER,
+    p90 INTEGER,
+    forecast_model VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Indexes for date-range reads and deletes by forecast
+CREATE INDEX IF NOT EXISTS idx_forecast_predictions_sku_date ON forecast_predictions(sku_id, date);
+CREATE INDEX IF NOT EXISTS idx_forecast_predictions_forecast ON forecast_predictions(forecast_id);
+
 -- ==========================================
 -- 3. CSV UPLOAD LOGS TABLE
 -- ==========================================
@@ -89,6 +113,7 @@ CREATE INDEX IF NOT EXISTS idx_api_usage_endpoint ON api_usage_stats(endpoint);
 -- Enable RLS for security
 ALTER TABLE sales_data ENABLE ROW LEVEL SECURITY;
 ALTER TABLE forecasts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE forecast_predictions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE csv_upload_logs ENABLE ROW LEVEL SECURITY;
 ALTER TABLE api_usage_stats ENABLE ROW LEVEL SECURITY;
 
@@ -99,6 +124,9 @@ CREATE POLICY "Allow service role full access on sales_data" ON sales_data
 CREATE POLICY "Allow service role full access on forecasts" ON forecasts
     FOR ALL USING (auth.role() = 'service_role');
 
+CREATE POLICY "Allow service role full access on forecast_predictions" ON forecast_predictions
+    FOR ALL USING (auth.role() = 'service_role');
+
 CREATE POLICY "Allow service role full access on csv_upload_logs" ON csv_upload_logs
     FOR ALL USING (auth.role() = 'service_role');
 
@@ -112,6 +140,9 @@ CREATE POLICY "Allow anon read access to sales_data" ON sales_data
 CREATE POLICY "Allow anon read access to forecasts" ON forecasts
     FOR SELECT USING (true);
 
+CREATE POLICY "Allow anon read access to forecast_predictions" ON forecast_predictions
+    FOR SELECT USING (true);
+
 -- ==========================================
 -- 6. FUNCTIONS FOR DATA MANAGEMENT
 -- ==========================================
@@ -215,5 +246,5 @@ SELECT
     tableowner
 FROM pg_tables
 WHERE schemaname = 'public'
-    AND tablename IN ('sales_data', 'forecasts', 'csv_upload_logs', 'api_usage_stats')
+    AND tablename IN ('sales_data', 'forecasts', 'forecast_predictions', 'csv_upload_logs', 'api_usage_stats')
 ORDER BY tablename;
@@ -13,6 +13,10 @@ from fastapi.testclient import TestClient
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Service modules read the environment when test modules import them during
+# collection, before any fixture runs
+os.environ.setdefault("ENVIRONMENT", "test")
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
@@ -74,17 +78,6 @@ def mock_forecast_service():
         mock_response.model_explanation = "Test forecast"
 
         mock.generate_forecast.return_value = mock_response
-        mock.get_sales_data.return_value = {
-            'sku_id': 'TEST_SKU',
-            'data': [],
-            'total_records': 0
-        }
-
-        mock_history = MagicMock()
-        mock_history.sku_id = "TEST_SKU"
-        mock_history.forecasts = []
-        mock_history.total_count = 0
-        mock.get_forecast_history.return_value = mock_history
 
         yield mock
 
@@ -106,3 +99,11 @@ def sample_forecast_request():
         "period": "7",
         "context": "Cold weather expected next week"
     }
+
+
+@pytest.fixture(autouse=True)
+def reset_admission_buckets():
+    """Give every test fresh per-client rate limits."""
+    from app.middleware.admission import admission_controller
+    admission_controller._buckets.clear()
+    yield
@@ -0,0 +1,176 @@
+"""Tests for incremental forecast accuracy tracking."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from app.models.schemas import ForecastResponse, ForecastResult
+from app.services.accuracy_service import AccuracyService
+from app.services.shared_cache import SharedCache
+
+
+def _forecast(sku_id, units, model="gigachat", start_day=1):
+    """Forecast with one prediction per value, starting 2024-03-<start_day>."""
+    predictions = [
+        ForecastResult(date=date(2024, 3, start_day + i), predicted_sales=value, confidence=0.8)
+        for i, value in enumerate(units)
+    ]
+    return ForecastResponse(
+        sku_id=sku_id,
+        forecast_period=len(units),
+        predictions=predictions,
+        total_predicted_sales=sum(units),
+        average_confidence=0.8,
+        forecast_model=model
+    )
+
+
+def _service(period_days=1, cache=None):
+    """AccuracyService over a fresh memory cache, or over ``cache``."""
+    return AccuracyService(period_days=period_days, cache=cache or SharedCache(backend="memory"))
+
+
+def _actual(sku_id, day, qty):
+    return {"sku_id": sku_id, "date": f"2024-03-{day:02d}", "sales_quantity": qty, "avg_temp": -5.0}
+
+
+def test_actuals_score_pending_predictions():
+    """Each prediction is scored once when its actual arrives."""
+    service = _service()
+    service.register_forecast(_forecast("A", [12, 8]))
+
+    assert service.update_from_actuals([_actual("A", 1, 10)]) == 1
+    # Re-uploading the same day does not score it again
+    assert service.update_from_actuals([_actual("A", 1, 10)]) == 0
+
+    accuracy = service.get_sku_accuracy("A")
+    assert accuracy.pending_predictions == 1
+    metrics = accuracy.models["gigachat"]
+    assert metrics.points == 1
+    assert metrics.mape == pytest.approx(20.0)
+    assert metrics.bias == pytest.approx(20.0)
+    assert metrics.mae == pytest.approx(2.0)
+
+
+def test_models_are_tracked_separately():
+    """Forecasts from different models for the same day are all scored."""
+    service = _service()
+    service.register_forecast(_forecast("A", [10], model="gigachat"))
+    service.register_forecast(_forecast("A", [5], model="local"))
+
+    service.update_from_actuals([_actual("A", 1, 10)])
+
+    summary = service.get_summary()
+    assert summary.models["gigachat"].wape == 0
+    assert summary.models["local"].wape == pytest.approx(50.0)
+    assert set(summary.per_sku["A"]) == {"gigachat", "local"}
+    assert summary.pending_predictions == 0
+
+
+def test_newer_forecast_replaces_pending_prediction():
+    """The latest forecast of a model for a day is the one scored."""
+    service = _service()
+    service.register_forecast(_forecast("A", [20]))
+    service.register_forecast(_forecast("A", [10]))
+
+    service.update_from_actuals([_actual("A", 1, 10)])
+
+    assert service.get_sku_accuracy("A").models["gigachat"].mae == 0
+
+
+def test_prune_drops_stale_pending_predictions():
+    """Old predictions without actuals are forgotten."""
+    service = _service()
+    service.register_forecast(_forecast("A", [1, 2, 3]))
+
+    assert service.prune_pending(older_than_days=1) == 3
+    assert service.get_sku_accuracy("A") is None
+
+
+def test_load_pending_keeps_newest_forecast_per_day():
+    """Stored rows seed pending predictions, newest forecast first."""
+    service = _service()
+    rows = [
+        {"forecast_id": 2, "sku_id": "A", "date": "2024-03-01", "predicted_sales": 10, "forecast_model": "local"},
+        {"forecast_id": 1, "sku_id": "A", "date": "2024-03-01", "predicted_sales": 99, "forecast_model": "local"},
+    ]
+
+    assert service.load_pending(rows) == 1
+    service.update_from_actuals([_actual("A", 1, 10)])
+
+    assert service.get_sku_accuracy("A").models["local"].mae == 0
+
+
+def test_weekly_actual_scores_sum_of_daily_predictions():
+    """A Monday-dated weekly actual is compared with the week's predicted total."""
+    service = _service(period_days=7)
+    # 2024-03-04 is a Monday; two full weeks of 10 units a day
+    service.register_forecast(_forecast("A", [10] * 14, start_day=4))
+
+    assert service.update_from_actuals([_actual("A", 4, 50)]) == 1
+
+    accuracy = service.get_sku_accuracy("A")
+    assert accuracy.models["gigachat"].mae == pytest.approx(20.0)
+    assert accuracy.models["gigachat"].bias == pytest.approx(40.0)
+    assert accuracy.pending_predictions == 7
+
+
+def test_weekly_partly_predicted_period_is_not_scored():
+    """Weeks a forecast covers only in part are dropped, not scored."""
+    service = _service(period_days=7)
+    # Wednesday 2024-03-06 to Tuesday 2024-03-12
+    service.register_forecast(_forecast("A", [10] * 7, start_day=6))
+
+    assert service.update_from_actuals([_actual("A", 4, 70)]) == 0
+    assert service.get_sku_accuracy("A").pending_predictions == 2
+
+
+def test_weekly_actuals_must_be_dated_on_monday():
+    """Actuals not dated on a period start are ignored."""
+    service = _service(period_days=7)
+    service.register_forecast(_forecast("A", [10] * 7, start_day=4))
+
+    assert service.update_from_actuals([_actual("A", 5, 70)]) == 0
+    assert service.get_sku_accuracy("A").pending_predictions == 7
+
+
+def test_invalid_period():
+    """Only daily and weekly actuals are supported."""
+    with pytest.raises(ValueError):
+        AccuracyService(period_days=30)
+
+
+def test_workers_sharing_a_cache_agree(tmp_path):
+    """A forecast registered by one worker is scored by another."""
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = _service(cache=SharedCache("sqlite", path))
+    worker_b = _service(cache=SharedCache("sqlite", path))
+
+    worker_a.register_forecast(_forecast("A", [12, 8]))
+    assert worker_b.update_from_actuals([_actual("A", 1, 10)]) == 1
+
+    assert worker_a.get_summary() == worker_b.get_summary()
+    assert worker_a.get_sku_accuracy("A").models["gigachat"].mae == pytest.approx(2.0)
+    assert worker_a.get_summary().pending_predictions == 1
+
+
+def test_restart_rebuilds_pending_from_stored_predictions():
+    """Stored predictions are pending again after a restart; scored periods are not."""
+    cache = SharedCache(backend="memory")
+    service = _service(cache=cache)
+    service.register_forecast(_forecast("A", [12, 8]))
+    service.update_from_actuals([_actual("A", 1, 10)])
+
+    stored = [
+        {"forecast_id": 1, "sku_id": "A", "date": "2024-03-01", "predicted_sales": 12, "forecast_model": "gigachat"},
+        {"forecast_id": 1, "sku_id": "A", "date": "2024-03-02", "predicted_sales": 8, "forecast_model": "gigachat"},
+    ]
+    restarted = _service(cache=cache)
+    with patch("app.services.accuracy_service.supabase_client.get_forecast_predictions", return_value=stored):
+        assert restarted.load_stored_predictions() == 0
+
+    fresh = _service()
+    with patch("app.services.accuracy_service.supabase_client.get_forecast_predictions", return_value=stored):
+        assert fresh.load_stored_predictions() == 2
+    assert fresh.get_sku_accuracy("A").pending_predictions == 2
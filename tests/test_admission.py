@@ -0,0 +1,157 @@
+"""Tests for admission control middleware."""
+
+import asyncio
+from unittest.mock import patch
+
+from app.middleware.admission import AdmissionController, AdmissionMiddleware, ConcurrencyLimit
+
+
+def _scope(path="/api/v1/forecast", method="POST", client="10.0.0.1"):
+    return {"type": "http", "method": method, "path": path, "headers": [], "client": (client, 1234)}
+
+
+class TestConcurrencyLimit:
+    """Tests for ConcurrencyLimit."""
+
+    def test_queue_full_is_rejected(self):
+        """Requests beyond concurrency plus queue are rejected at once."""
+        async def scenario():
+            limit = ConcurrencyLimit("test", max_concurrency=1, max_queue=1, queue_timeout=5)
+            assert await limit.acquire()
+            queued = asyncio.create_task(limit.acquire())
+            await asyncio.sleep(0)
+            rejected = await limit.acquire()
+            limit.release(0.1)
+            return rejected, await queued, limit
+
+        rejected, queued, limit = asyncio.run(scenario())
+
+        assert rejected is False
+        assert queued is True
+        assert limit.active == 1
+        assert limit.rejected_queue_full == 1
+
+    def test_wait_times_out(self):
+        """A queued request that gets no slot in time is rejected."""
+        async def scenario():
+            limit = ConcurrencyLimit("test", max_concurrency=1, max_queue=5, queue_timeout=0.01)
+            await limit.acquire()
+            return await limit.acquire(), limit
+
+        admitted, limit = asyncio.run(scenario())
+
+        assert admitted is False
+        assert limit.rejected_timeout == 1
+        assert limit.waiting == 0
+
+    def test_release_without_waiters_frees_slot(self):
+        """Slots return to the pool when nobody is waiting."""
+        async def scenario():
+            limit = ConcurrencyLimit("test", max_concurrency=2, max_queue=0, queue_timeout=1)
+            await limit.acquire()
+            await limit.acquire()
+            limit.release(0.0)
+            return limit
+
+        assert asyncio.run(scenario()).active == 1
+
+
+class TestAdmissionMiddleware:
+    """Tests for AdmissionMiddleware with a stub application."""
+
+    @staticmethod
+    def _run(controller, scopes, app_delay=0.05):
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await asyncio.sleep(app_delay)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        middleware = AdmissionMiddleware(app, controller)
+
+        async def request(scope):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            await middleware(scope, None, send)
+            return messages[0]
+
+        async def scenario():
+            return await asyncio.gather(*(request(scope) for scope in scopes))
+
+        return asyncio.run(scenario()), calls
+
+    def _controller(self, **env):
+        with patch.dict("os.environ", env):
+            return AdmissionController()
+
+    def test_overload_sheds_with_503_and_retry_after(self):
+        """Requests beyond the forecast limit and queue get 503."""
+        controller = self._controller(
+            ADMISSION_FORECAST_MAX_CONCURRENCY="1", ADMISSION_FORECAST_MAX_QUEUE="1",
+            ADMISSION_FORECAST_CLIENT_RPS="0"
+        )
+
+        starts, calls = self._run(controller, [_scope(client=f"10.0.0.{i}") for i in range(4)])
+
+        statuses = sorted(start["status"] for start in starts)
+        assert statuses == [200, 200, 503, 503]
+        assert len(calls) == 2
+        rejected = next(start for start in starts if start["status"] == 503)
+        assert int(dict(rejected["headers"])[b"retry-after"]) >= 1
+        assert controller.get_metrics()["forecast"]["rejected_queue_full"] == 2
+
+    def test_client_rate_limit_returns_429(self):
+        """A client over its token bucket gets 429; other clients are unaffected."""
+        controller = self._controller(ADMISSION_UPLOAD_CLIENT_RPS="0.5", ADMISSION_UPLOAD_CLIENT_BURST="1")
+        upload = "/api/v1/upload-csv"
+
+        starts, _ = self._run(
+            controller, [_scope(upload, client="a"), _scope(upload, client="a"), _scope(upload, client="b")]
+        )
+
+        assert [start["status"] for start in starts] == [200, 429, 200]
+        assert dict(starts[1]["headers"])[b"retry-after"] == b"2"
+        assert controller.get_metrics()["upload"]["rate_limited"] == 1
+
+    def test_cheap_routes_bypass_limits(self):
+        """GET endpoints are never queued or rate limited."""
+        controller = self._controller(
+            ADMISSION_FORECAST_MAX_CONCURRENCY="1", ADMISSION_FORECAST_MAX_QUEUE="0",
+            ADMISSION_FORECAST_CLIENT_RPS="0"
+        )
+        scopes = [_scope()] + [_scope("/api/v1/health", method="GET") for _ in range(5)]
+
+        starts, calls = self._run(controller, scopes)
+
+        assert all(start["status"] == 200 for start in starts)
+        assert len(calls) == 6
+
+    def test_forwarded_client_only_when_trusted(self):
+        """X-Forwarded-For identifies clients only behind a trusted proxy."""
+        scope = {**_scope(), "headers": [(b"x-forwarded-for", b"203.0.113.5, 10.0.0.1")]}
+
+        assert self._controller().client_id(scope) == "10.0.0.1"
+        assert self._controller(ADMISSION_TRUST_FORWARDED="true").client_id(scope) == "203.0.113.5"
+
+
+class TestAdmissionApi:
+    """Tests for admission control through the app."""
+
+    def test_forecast_rate_limit(self, client):
+        """Bursting past the per-client forecast bucket yields 429."""
+        from app.middleware.admission import admission_controller
+
+        group = next(group for group in admission_controller.groups if group.name == "forecast")
+        with patch.object(group, "client_burst", 2.0), patch.object(group, "client_rps", 0.01):
+            statuses = [
+                client.post("/api/v1/forecast", json={"sku_id": "SKU_001", "period": "7"}).status_code
+                for _ in range(3)
+            ]
+
+        assert statuses == [200, 200, 429]
+        assert "admission" in client.get("/api/v1/metrics").json()
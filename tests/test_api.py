@@ -9,6 +9,7 @@ import io
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 import csv
+import json
 from datetime import datetime
 
 from app.main import app
@@ -206,7 +207,7 @@ class TestDataRetrieval:
 
     def test_get_sales_data_success(self, client):
         """Test successful sales data retrieval."""
-        with patch('app.api.endpoints.supabase_client.get_sales_data') as mock_get_data:
+        with patch('app.services.supabase_client.supabase_client.get_sales_data') as mock_get_data:
             # Mock successful data response
             mock_get_data.return_value = [{
                 'id': 1,
@@ -226,7 +227,7 @@ class TestDataRetrieval:
 
     def test_get_sales_data_with_limit(self, client):
         """Test sales data retrieval with custom limit."""
-        with patch('app.api.endpoints.supabase_client.get_sales_data') as mock_get_data:
+        with patch('app.services.supabase_client.supabase_client.get_sales_data') as mock_get_data:
             mock_get_data.return_value = []
 
             response = client.get("/api/v1/data/DOWN_JACKET_001?limit=10")
@@ -236,7 +237,7 @@ class TestDataRetrieval:
 
     def test_get_forecast_history_success(self, client):
         """Test successful forecast history retrieval."""
-        with patch('app.api.endpoints.supabase_client.get_forecast_history') as mock_get_history:
+        with patch('app.services.supabase_client.supabase_client.get_forecast_history') as mock_get_history:
             # Mock successful history response
             mock_get_history.return_value = []
 
@@ -281,3 +282,307 @@ class TestErrorHandling:
         )
 
         assert response.status_code == 422
+
+
+class TestBatchForecastGeneration:
+    """Tests for multi-SKU forecast generation."""
+
+    def test_generate_forecasts_batch(self, client):
+        """Test batch forecast returns one forecast per unique SKU."""
+        response = client.post(
+            "/api/v1/forecast/batch",
+            json={"sku_ids": ["SKU_001", "SKU_002", "SKU_001"], "period": "7"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["count"] == 2
+        assert [item["sku_id"] for item in data["data"]] == ["SKU_001", "SKU_002"]
+        assert len(data["data"][0]["predictions"]) == 7
+
+    def test_generate_forecasts_batch_matrix_model(self, client):
+        """Test batch forecast with the in-process catalog engine."""
+        response = client.post(
+            "/api/v1/forecast/batch",
+            json={"sku_ids": ["SKU_001", "SKU_404"], "period": "7", "model": "matrix"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["sku_id"] for item in data["data"]] == ["SKU_001", "SKU_404"]
+        assert all(len(item["predictions"]) == 7 for item in data["data"])
+
+    def test_generate_forecasts_batch_requires_skus(self, client):
+        """Test batch forecast rejects an empty SKU list."""
+        response = client.post(
+            "/api/v1/forecast/batch",
+            json={"sku_ids": [], "period": "7"}
+        )
+
+        assert response.status_code == 422
+
+
+class TestStreamingForecast:
+    """Tests for streamed forecast generation."""
+
+    def test_stream_forecast_ndjson(self, client):
+        """Test predictions are streamed as NDJSON before the summary."""
+        response = client.post("/api/v1/forecast/stream", json={"sku_id": "SKU_001", "period": "7"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        events = [json.loads(line) for line in response.text.splitlines() if line]
+        assert [event["event"] for event in events] == ["prediction"] * 7 + ["complete"]
+        assert "predicted_sales" in events[0]["data"]
+        assert events[-1]["data"]["sku_id"] == "SKU_001"
+
+    def test_stream_forecast_sse(self, client):
+        """Test Server-Sent Events are used when requested."""
+        response = client.post(
+            "/api/v1/forecast/stream",
+            json={"sku_id": "SKU_001", "period": "7"},
+            headers={"Accept": "text/event-stream"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.count("event: prediction\n") == 7
+        assert "event: complete\n" in response.text
+
+
+class TestBacktest:
+    """Tests for the backtest endpoint."""
+
+    def test_backtest_endpoint(self, client):
+        """Test backtest returns metrics per requested model."""
+        response = client.post("/api/v1/backtest", json={"models": ["local", "mean"], "horizon": 2})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["models"]) == {"local", "mean"}
+        assert data["cutoff_count"] > 0
+
+    def test_backtest_unknown_model(self, client):
+        """Test unknown models are rejected with 400."""
+        response = client.post("/api/v1/backtest", json={"models": ["unknown"]})
+
+        assert response.status_code == 400
+
+
+class TestScenarios:
+    """Tests for what-if temperature scenarios."""
+
+    def test_scenario_surface_per_sku(self, client):
+        """Test each SKU gets one demand row per scenario and day."""
+        response = client.post(
+            "/api/v1/scenarios",
+            json={
+                "sku_ids": ["SKU_001", "SKU_002"],
+                "period": "7",
+                "temperature_offsets": [-5, 0, 5],
+                "temperature_curves": {"frost": [-35] * 7}
+            }
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scenarios"] == ["offset-5.0", "offset+0.0", "offset+5.0", "curve:frost"]
+        assert len(data["dates"]) == 7
+        result = data["results"][0]
+        assert len(result["demand"]) == 4
+        assert all(len(row) == 7 for row in result["demand"])
+        # Test history sells more when colder
+        assert result["temp_elasticity"] < 0
+        assert result["totals"][0] > result["totals"][2]
+
+    def test_scenario_curve_length_is_validated(self, client):
+        """Test a curve that does not cover the horizon is rejected."""
+        response = client.post(
+            "/api/v1/scenarios",
+            json={"sku_ids": ["SKU_001"], "period": "7", "temperature_curves": {"short": [-10, -12]}}
+        )
+
+        assert response.status_code == 400
+
+
+class TestAccuracy:
+    """Tests for forecast accuracy endpoints."""
+
+    def test_accuracy_summary(self, client):
+        """Test the accuracy summary is available without tracked forecasts."""
+        response = client.get("/api/v1/accuracy")
+
+        assert response.status_code == 200
+        assert "models" in response.json()
+
+    def test_unknown_sku_accuracy_is_404(self, client):
+        """Test a SKU without tracked forecasts returns 404."""
+        response = client.get("/api/v1/accuracy/NO_SUCH_SKU")
+
+        assert response.status_code == 404
+
+
+class TestForecastPredictions:
+    """Tests for per-day stored predictions."""
+
+    def test_forecast_predictions_are_stored_per_day(self, client):
+        """Test a forecast stores one row per day and is queryable by date."""
+        response = client.post("/api/v1/forecast", json={"sku_id": "SKU_PRED", "period": "7"})
+        assert response.status_code == 200
+        dates = [pred["date"] for pred in response.json()["predictions"]]
+
+        response = client.get(
+            "/api/v1/forecast-predictions/SKU_PRED",
+            params={"start_date": dates[2], "end_date": dates[4]}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [row["date"] for row in data["predictions"]][:3] == dates[2:5]
+        assert all(dates[2] <= row["date"] <= dates[4] for row in data["predictions"])
+
+    def test_forecast_predictions_rejects_inverted_range(self, client):
+        """Test start_date after end_date is rejected."""
+        response = client.get(
+            "/api/v1/forecast-predictions/SKU_001",
+            params={"start_date": "2024-02-01", "end_date": "2024-01-01"}
+        )
+
+        assert response.status_code == 400
+
+    def test_forecast_predictions_accept_uuid_forecast_ids(self, client):
+        """Test UUID forecast IDs, as in supabase_schema.sql, filter and validate."""
+        from app.models.schemas import ForecastPredictionRow
+
+        forecast_id = "0b5f3c1e-7d2a-4c8e-9f61-2a4b6c8d0e1f"
+        row = {"forecast_id": forecast_id, "sku_id": "SKU_001", "date": "2024-01-02", "predicted_sales": 5}
+
+        with patch('app.services.supabase_client.supabase_client.get_forecast_predictions',
+                   return_value=[row]) as mock_get:
+            response = client.get("/api/v1/forecast-predictions/SKU_001", params={"forecast_id": forecast_id})
+
+        assert response.status_code == 200
+        assert mock_get.call_args.kwargs["forecast_id"] == forecast_id
+        assert response.json()["predictions"][0]["forecast_id"] == forecast_id
+        assert str(ForecastPredictionRow.model_validate(row).forecast_id) == forecast_id
+
+
+class TestForecastFormatV2:
+    """Tests for the compact v2 forecast format."""
+
+    def test_v2_has_single_predictions_array(self, client):
+        """Test ?format=v2 returns one typed predictions array."""
+        response = client.post("/api/v1/forecast?format=v2", json={"sku_id": "SKU_001", "period": "30"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/vnd.khabarovsk.forecast.v2+json")
+        data = response.json()
+        assert data["format_version"] == 2
+        assert len(data["predictions"]) == 30
+        assert "forecast" not in data and "data" not in data
+        assert {"date", "predicted_sales", "confidence"} <= set(data["predictions"][0])
+
+    def test_v2_selected_by_accept_header(self, client):
+        """Test the vendor media type in Accept selects v2."""
+        response = client.post(
+            "/api/v1/forecast",
+            json={"sku_id": "SKU_001", "period": "7"},
+            headers={"Accept": "application/vnd.khabarovsk.forecast.v2+json"}
+        )
+
+        assert response.json()["format_version"] == 2
+
+    def test_v2_payload_is_a_fraction_of_legacy(self, client):
+        """Test a 30-day v2 payload is under a third of the legacy bytes."""
+        legacy = client.post("/api/v1/forecast", json={"sku_id": "SKU_001", "period": "30"})
+        compact = client.post("/api/v1/forecast?format=v2", json={"sku_id": "SKU_001", "period": "30"})
+
+        legacy_bytes, compact_bytes = len(legacy.content), len(compact.content)
+        assert "forecast" in legacy.json()
+        assert compact_bytes * 3 < legacy_bytes, (compact_bytes, legacy_bytes)
+
+    def test_batch_v2(self, client):
+        """Test batch forecasts in the v2 format."""
+        response = client.post(
+            "/api/v1/forecast/batch?format=v2",
+            json={"sku_ids": ["SKU_001", "SKU_002"], "period": "7"}
+        )
+
+        data = response.json()
+        assert data["format_version"] == 2
+        assert [forecast["sku_id"] for forecast in data["forecasts"]] == ["SKU_001", "SKU_002"]
+
+
+class TestConditionalGet:
+    """Tests for ETag / If-None-Match on polled read endpoints."""
+
+    def test_etag_matching(self):
+        """Lists, weak tags and * match; absent headers and other tags do not."""
+        from app.api.endpoints import etag_matches
+
+        assert etag_matches('"a"', '"a"')
+        assert etag_matches('"x", W/"a"', '"a"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches(None, '"a"')
+        assert not etag_matches('"b"', '"a"')
+
+    def test_sales_data_304_skips_database(self, client):
+        """A current ETag is answered with 304 without a query."""
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=[]) as mock_get_data:
+            first = client.get("/api/v1/data/ETAG_SKU")
+            etag = first.headers["etag"]
+
+            second = client.get("/api/v1/data/ETAG_SKU", headers={"If-None-Match": etag})
+
+            assert second.status_code == 304
+            assert second.content == b""
+            assert second.headers["etag"] == etag
+            assert mock_get_data.call_count == 1
+
+    def test_sales_data_etag_changes_on_ingest(self, client):
+        """Uploading rows for a SKU invalidates its ETag."""
+        from app.services.supabase_client import supabase_client
+
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=[]):
+            etag = client.get("/api/v1/data/ETAG_INGEST").headers["etag"]
+            supabase_client._notify_ingest([{"sku_id": "ETAG_INGEST", "date": "2024-01-01", "sales_quantity": 3}])
+
+            response = client.get("/api/v1/data/ETAG_INGEST", headers={"If-None-Match": etag})
+
+            assert response.status_code == 200
+            assert response.headers["etag"] != etag
+
+    def test_etag_depends_on_limit(self, client):
+        """Responses of different sizes carry different ETags."""
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=[]):
+            etag = client.get("/api/v1/data/ETAG_SKU?limit=10").headers["etag"]
+            response = client.get("/api/v1/data/ETAG_SKU?limit=20", headers={"If-None-Match": etag})
+
+            assert response.status_code == 200
+
+    def test_forecast_history_etag_changes_on_forecast_save(self, client):
+        """Storing a forecast invalidates the SKU's history ETag."""
+        with patch('app.services.supabase_client.supabase_client.get_forecast_history', return_value=[]):
+            etag = client.get("/api/v1/forecast-history/SKU_001").headers["etag"]
+            assert client.get(
+                "/api/v1/forecast-history/SKU_001", headers={"If-None-Match": etag}
+            ).status_code == 304
+
+            client.post("/api/v1/forecast", json={"sku_id": "SKU_001", "period": "7"})
+
+            response = client.get("/api/v1/forecast-history/SKU_001", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+
+    def test_sku_list_304_from_cached_content_hash(self, client):
+        """The SKU list ETag is a content hash served from cache."""
+        from app.services.data_versions import data_versions
+
+        data_versions.on_ingest([])  # start from an empty SKU list cache
+        with patch('app.services.supabase_client.supabase_client.get_all_sku_ids', return_value=["A", "B"]) as mock_get:
+            etag = client.get("/api/v1/sku-list").headers["etag"]
+            response = client.get("/api/v1/sku-list", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+            assert response.status_code == 304
+            assert mock_get.call_count == 1
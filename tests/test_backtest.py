@@ -0,0 +1,92 @@
+"""Tests for rolling-origin backtesting."""
+
+import numpy as np
+import pytest
+
+from app.models.schemas import BacktestRequest
+from app.services.backtest import (
+    BacktestService, MODEL_REGISTRY, _evaluate_sku, _error_sums, _metrics_from_sums
+)
+from app.services.local_model import LocalForecastModel
+
+
+def _series(qty, temps):
+    """Build a weekly series in the backtest format."""
+    size = len(qty)
+    dates = np.arange(size) * 7 + np.datetime64("2024-01-01")
+    return {
+        "sku_id": "SKU_T",
+        "dates": dates.astype(str),
+        "qty": np.asarray(qty, dtype=float),
+        "temps": np.asarray(temps, dtype=float),
+        "clim_temps": np.asarray(temps, dtype=float),
+        "spacing_days": 7.0
+    }
+
+
+def test_metrics_from_error_sums():
+    """MAPE, WAPE and bias are computed from additive sums."""
+    sums = _error_sums(np.array([[12.0, 8.0]]), np.array([[10.0, 10.0]]))
+    metrics = _metrics_from_sums(sums)
+
+    assert metrics.mape == pytest.approx(20.0)
+    assert metrics.wape == pytest.approx(20.0)
+    assert metrics.bias == pytest.approx(0.0)
+    assert metrics.points == 2
+
+
+def test_vectorized_local_model_matches_per_cutoff_fit():
+    """Prefix-sum regression equals fitting each training window separately."""
+    rng = np.random.default_rng(0)
+    temps = rng.uniform(-25, 5, 20)
+    qty = np.clip(40 - 2 * temps + rng.normal(0, 3, 20), 0, None)
+    series = _series(qty, temps)
+    cutoffs = np.array([6, 10, 15])
+
+    forecasts = MODEL_REGISTRY["local"](series, cutoffs, 3)
+
+    model = LocalForecastModel()
+    for row, cutoff in enumerate(cutoffs):
+        params = model.fit_arrays(
+            series["dates"][:cutoff].astype("datetime64[D]"), qty[:cutoff], temps[:cutoff]
+        )
+        expected = np.clip(params["intercept"] + params["slope"] * temps[cutoff:cutoff + 3], 0, None) * 7
+        np.testing.assert_allclose(forecasts[row], expected)
+
+
+def test_evaluate_sku_rolls_cutoffs():
+    """Cutoffs start after min_train and keep only the latest max_cutoffs."""
+    series = _series(np.arange(1, 13), np.zeros(12))
+
+    sku_id, sums = _evaluate_sku((series, ["naive", "mean"], 2, 1, 4, 3))
+
+    assert sku_id == "SKU_T"
+    assert sums["naive"]["forecasts"] == 3
+    assert sums["naive"]["points"] == 6
+
+
+def test_mock_model_uses_rolling_7_mean():
+    """The mock baseline scales the mean of the last 7 training records."""
+    qty = [100, 100, 100, 2, 4, 6, 8, 10, 12, 14, 16]
+    series = _series(qty, [0.0] * len(qty))
+    forecasts = MODEL_REGISTRY["mock"](series, np.array([3, 10]), 3)
+
+    # Short prefixes average what they have; longer ones only the last 7
+    assert forecasts[0].tolist() == [80.0, 95.0, 110.0]
+    assert forecasts[1].tolist() == [np.floor(8 * 0.8), np.floor(8 * 0.95), np.floor(8 * 1.1)]
+
+
+def test_run_backtest_over_history():
+    """The service scores every requested model on stored history."""
+    response = BacktestService().run(BacktestRequest(models=["local", "naive", "mock"], horizon=2))
+
+    assert response.sku_count == 2
+    assert set(response.models) == {"local", "naive", "mock"}
+    # History is linear in temperature, so the local model should win
+    assert response.models["local"].wape < response.models["naive"].wape
+
+
+def test_unknown_model_is_rejected():
+    """Requesting an unregistered model raises ValueError."""
+    with pytest.raises(ValueError):
+        BacktestService().run(BacktestRequest(models=["prophet"]))
@@ -0,0 +1,89 @@
+"""Tests for the day-of-year temperature climatology."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from app.services.climatology import TemperatureClimatology, build_default_normals
+
+
+def test_default_normals_follow_khabarovsk_seasons():
+    """Built-in table is coldest in January and warmest in July."""
+    normals = build_default_normals()
+
+    assert normals.shape == (366,)
+    assert normals[14] == pytest.approx(-19.7)
+    assert normals.argmax() in range(181, 212)
+    # Wrap-around keeps late December close to early January
+    assert abs(normals[365] - normals[0]) < 2
+
+
+def test_horizon_uses_day_of_year_lookup():
+    """Horizon temperatures come from the table, one per day."""
+    table = TemperatureClimatology()
+
+    temps = table.horizon(date(2024, 7, 14), 3)
+
+    assert list(temps) == [table.temperature_for(date(2024, 7, 14 + i)) for i in range(3)]
+
+
+def test_update_from_history_blends_observations():
+    """Uploaded temperatures pull nearby days toward the observations."""
+    table = TemperatureClimatology()
+    before = table.temperature_for("2024-01-15")
+
+    used = table.update_from_history([
+        {"date": "2023-01-15", "avg_temp": -30.0},
+        {"date": "2022-01-15", "avg_temp": -30.0},
+        {"date": "2022-01-16", "avg_temp": None},
+    ])
+
+    assert used == 2
+    assert table.temperature_for("2024-01-15") < before
+    assert table.temperature_for("2024-01-19") < before
+    # Days far away from the observations keep the built-in normal
+    assert table.temperature_for("2024-07-15") == pytest.approx(21.4)
+
+
+def test_same_date_counts_once():
+    """Rows of one date (one per SKU) form a single, replaceable observation."""
+    once, repeated = TemperatureClimatology(), TemperatureClimatology()
+
+    once.update_from_history([{"date": "2023-01-15", "avg_temp": -30.0}])
+    repeated.update_from_history([{"date": "2023-01-15", "avg_temp": -30.0, "sku_id": s} for s in "ABC"])
+    repeated.update_from_history([{"date": "2023-01-15", "avg_temp": -30.0}])
+
+    assert repeated.temperature_for("2024-01-15") == once.temperature_for("2024-01-15")
+
+
+def test_load_stored_history():
+    """The table is built from temperatures already stored in sales_data."""
+    stored = [{"date": "2023-01-15", "avg_temp": -30.0}, {"date": "2023-01-15", "avg_temp": -30.0}]
+    loaded, ingested = TemperatureClimatology(), TemperatureClimatology()
+
+    with patch("app.services.climatology.supabase_client.get_temperature_history", return_value=stored):
+        assert loaded.load_stored_history() == 1
+
+    ingested.update_from_history(stored[:1])
+    assert loaded.temperature_for("2024-01-15") == ingested.temperature_for("2024-01-15")
+
+
+def test_temperature_history_reads_one_reference_sku():
+    """Stored temperatures come from one SKU's rows, not once per SKU."""
+    from unittest.mock import MagicMock
+
+    from app.services.supabase_client import SupabaseClient
+
+    client = SupabaseClient()
+    client.test_mode = False
+    client.rest_url, client.anon_key, client.service_key = "http://db/rest/v1", "anon", ""
+    oldest = MagicMock(status_code=200, content=b'[{"sku_id": "SKU_OLD"}]')
+    temps = MagicMock(status_code=200, content=b'[{"date": "2023-01-15", "avg_temp": -30.0}]')
+
+    with patch("app.services.supabase_client.requests.get", side_effect=[oldest, temps]) as mock_get:
+        rows = client.get_temperature_history()
+
+    assert rows == [{"date": "2023-01-15", "avg_temp": -30.0}]
+    assert mock_get.call_args_list[0].kwargs["params"]["limit"] == 1
+    assert mock_get.call_args_list[1].kwargs["params"]["sku_id"] == "eq.SKU_OLD"
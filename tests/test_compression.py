@@ -0,0 +1,128 @@
+"""Tests for the compression and Cache-Control middleware."""
+
+import asyncio
+import gzip
+from unittest.mock import patch
+
+from app.middleware.compression import (
+    CompressionMiddleware, accepted_encodings, is_compressible, parse_cache_control_rules
+)
+
+
+def _sales_rows(count):
+    """Sales rows as returned by Supabase."""
+    return [
+        {"id": i, "sku_id": "GZIP_SKU", "date": f"2024-01-{i % 28 + 1:02d}", "sales_quantity": 40 + i % 17,
+         "avg_temp": -20.0 + i % 30, "created_at": "2024-01-01T00:00:00+00:00"}
+        for i in range(count)
+    ]
+
+
+class TestHelpers:
+    """Tests for header parsing helpers."""
+
+    def test_accepted_encodings_with_quality(self):
+        """q-values are parsed; q=0 disables an encoding."""
+        assert accepted_encodings("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+    def test_is_compressible(self):
+        """JSON and text are compressed, images are not."""
+        assert is_compressible("application/json")
+        assert is_compressible("application/vnd.khabarovsk.forecast.v2+json")
+        assert is_compressible("text/csv; charset=utf-8")
+        assert not is_compressible("image/png")
+
+    def test_cache_control_rules_longest_prefix_first(self):
+        """Values may contain commas; longer prefixes win."""
+        rules = parse_cache_control_rules("/a=public, max-age=10;/a/b=no-store;broken")
+        assert rules == [("/a/b", "no-store"), ("/a", "public, max-age=10")]
+
+
+class TestCompressionMiddleware:
+    """Tests for response compression through the app."""
+
+    def test_large_json_is_gzipped(self, client):
+        """A 200-row sales response is sent gzip-encoded and much smaller."""
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=_sales_rows(200)):
+            response = client.get("/api/v1/data/GZIP_SKU?limit=200", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"].startswith('W/"')
+        assert int(response.headers["content-length"]) < len(response.content) / 4
+        assert response.json()["total_records"] == 200
+
+    def test_weak_etag_revalidates(self, client):
+        """The weakened ETag of a compressed response still yields 304."""
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=_sales_rows(200)):
+            etag = client.get("/api/v1/data/GZIP_SKU", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+            response = client.get(
+                "/api/v1/data/GZIP_SKU", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+            )
+
+        assert response.status_code == 304
+        assert "W/" + response.headers["etag"] == etag
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self, client):
+        """Bodies under the threshold and clients without gzip get identity."""
+        small = client.get("/", headers={"Accept-Encoding": "gzip"})
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=_sales_rows(200)):
+            identity = client.get("/api/v1/data/GZIP_SKU", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in identity.headers
+
+    def test_streaming_response_passes_through(self, client):
+        """NDJSON forecast streams are not buffered for compression."""
+        response = client.post(
+            "/api/v1/forecast/stream", json={"sku_id": "SKU_001", "period": "30"},
+            headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    def test_body_is_gzip_of_identity_body(self):
+        """The middleware sends the gzip of the app's body with a matching length."""
+        body = b'{"rows": [' + b",".join([b'{"sales_quantity": 42}'] * 200) + b"]}"
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"),
+                                    (b"content-length", str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+        asyncio.run(CompressionMiddleware(app)(scope, None, send))
+
+        headers = dict(sent[0]["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert int(headers[b"content-length"]) == len(sent[1]["body"])
+        assert gzip.decompress(sent[1]["body"]) == body
+
+
+class TestCacheControlMiddleware:
+    """Tests for per-route Cache-Control."""
+
+    def test_sample_csv_is_long_lived(self, client):
+        """The static sample CSV may be cached for a day."""
+        response = client.get("/api/v1/sample-csv")
+        assert response.headers["cache-control"] == "public, max-age=86400"
+
+    def test_data_endpoints_are_short_lived(self, client):
+        """Polled data endpoints get a short private max-age."""
+        with patch('app.services.supabase_client.supabase_client.get_sales_data', return_value=[]):
+            response = client.get("/api/v1/data/SKU_001")
+        assert response.headers["cache-control"] == "private, max-age=30"
+
+    def test_other_routes_untouched(self, client):
+        """Routes without a rule and POSTs get no Cache-Control."""
+        assert "cache-control" not in client.get("/").headers
+        response = client.post("/api/v1/forecast", json={"sku_id": "SKU_001", "period": "7"})
+        assert "cache-control" not in response.headers
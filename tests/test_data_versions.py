@@ -0,0 +1,78 @@
+"""Tests for per-SKU data versions and ETag matching."""
+
+from unittest.mock import MagicMock, patch
+
+from app.services.data_versions import DataVersions, SALES, FORECASTS
+from app.services.shared_cache import SharedCache
+
+
+def _versions(cache=None):
+    """DataVersions over a fresh memory cache, or over ``cache``."""
+    return DataVersions(cache or SharedCache(backend="memory"))
+
+
+class TestDataVersions:
+    """Tests for DataVersions."""
+
+    def test_bump_changes_only_that_sku_and_kind(self):
+        """Bumping one SKU's forecasts leaves other ETags unchanged."""
+        versions = _versions()
+        sales_tag = versions.etag(SALES, "A", 52)
+        other_tag = versions.etag(FORECASTS, "B", 10)
+        forecast_tag = versions.etag(FORECASTS, "A", 10)
+
+        versions.bump(FORECASTS, ["A", "A"])
+
+        assert versions.version(FORECASTS, "A") == 1
+        assert versions.etag(FORECASTS, "A", 10) != forecast_tag
+        assert versions.etag(SALES, "A", 52) == sales_tag
+        assert versions.etag(FORECASTS, "B", 10) == other_tag
+
+    def test_etags_differ_between_caches(self):
+        """A fresh cache does not reuse ETags issued against an older one."""
+        with patch("app.services.data_versions.time.time_ns", side_effect=[1, 2]):
+            first, second = _versions(), _versions()
+
+        assert first.etag(SALES, "A") != second.etag(SALES, "A")
+
+    def test_workers_sharing_a_cache_agree(self):
+        """Instances over one cache share epoch, versions and the SKU list."""
+        cache = SharedCache(backend="memory")
+        with patch("app.services.data_versions.time.time_ns", side_effect=[1, 2]):
+            first, second = _versions(cache), _versions(cache)
+        fetch = MagicMock(return_value=["A"])
+
+        tag = second.etag(SALES, "A", 52)
+        first.sku_list(fetch)
+        second.sku_list(fetch)
+        first.bump(SALES, ["A"])
+
+        assert first.epoch == second.epoch
+        assert second.etag(SALES, "A", 52) != tag
+        assert second.etag(SALES, "A", 52) == first.etag(SALES, "A", 52)
+        assert fetch.call_count == 1
+
+    def test_on_ingest_bumps_sales_and_drops_sku_list(self):
+        """Ingested rows bump sales versions and refetch the SKU list."""
+        versions = _versions()
+        fetch = MagicMock(return_value=["A"])
+        versions.sku_list(fetch)
+
+        assert versions.on_ingest([{"sku_id": "A"}, {"sku_id": "C"}, {"sku_id": "A"}]) == 2
+        versions.sku_list(fetch)
+
+        assert versions.version(SALES, "C") == 1
+        assert fetch.call_count == 2
+
+    def test_sku_list_etag_is_content_hash(self):
+        """Equal SKU lists get equal ETags; empty results are not cached."""
+        first, second = _versions(), _versions()
+        empty = MagicMock(return_value=[])
+
+        assert first.sku_list(lambda: ["A", "B"])[1] == second.sku_list(lambda: ["A", "B"])[1]
+        assert first.sku_list(lambda: ["X"])[0] == ["A", "B"]
+
+        versions = _versions()
+        versions.sku_list(empty)
+        versions.sku_list(empty)
+        assert empty.call_count == 2
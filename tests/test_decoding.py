@@ -0,0 +1,20 @@
+"""Tests for decoding Supabase response bodies."""
+
+from unittest.mock import MagicMock
+
+from app.services.supabase_client import SupabaseClient, parse_json_body
+
+
+def test_parse_json_body_wraps_objects_and_handles_empty():
+    """Lists pass through, single objects are wrapped, empty bodies are []."""
+    assert parse_json_body(b'[{"id": 1}]') == [{"id": 1}]
+    assert parse_json_body(b'{"id": 1}') == [{"id": 1}]
+    assert parse_json_body(b"  ") == []
+
+
+def test_handle_response_parses_body_once():
+    """The response body is decoded once, without response.json()."""
+    response = MagicMock(status_code=200, content=b'[{"id": 7}]')
+
+    assert SupabaseClient()._handle_response(response) == [{"id": 7}]
+    response.json.assert_not_called()
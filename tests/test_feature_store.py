@@ -0,0 +1,135 @@
+"""Tests for the per-SKU feature store."""
+
+import pytest
+
+from app.services.feature_store import FeatureStore
+from app.services.supabase_client import supabase_client
+
+
+def _rows(sku_id, quantities, temps=None, start_day=1):
+    """Daily rows for January 2024, oldest first."""
+    temps = temps or [None] * len(quantities)
+    return [
+        {"sku_id": sku_id, "date": f"2024-01-{start_day + i:02d}", "sales_quantity": qty, "avg_temp": temp}
+        for i, (qty, temp) in enumerate(zip(quantities, temps))
+    ]
+
+
+def test_running_aggregates():
+    """Counts, sums and extremes accumulate across updates."""
+    store = FeatureStore()
+    store.update(_rows("A", [10, 20]))
+    store.update(_rows("A", [30], start_day=3))
+
+    features = store.get("A")
+
+    assert features["count"] == 3
+    assert features["total_units"] == 60
+    assert features["avg_units"] == pytest.approx(20.0)
+    assert (features["min_units"], features["max_units"]) == (10, 30)
+
+
+def test_trend_compares_recent_and_older_records():
+    """Trend is the relative change of the last 7 records vs the 7 before."""
+    store = FeatureStore()
+    store.update(_rows("A", [10] * 7 + [15] * 7))
+
+    features = store.get("A")
+
+    assert features["rolling_7"] == pytest.approx(15.0)
+    assert features["rolling_14"] == pytest.approx(12.5)
+    assert features["trend_pct"] == pytest.approx(50.0)
+
+
+def test_out_of_order_rows_keep_most_recent_window():
+    """Late-arriving old rows do not displace recent ones."""
+    store = FeatureStore()
+    store.update(_rows("A", [15] * 14, start_day=15))
+    store.update(_rows("A", [1] * 7, start_day=1))
+
+    features = store.get("A")
+
+    assert features["rolling_14"] == pytest.approx(15.0)
+    assert features["last_date"] == "2024-01-28"
+
+
+def test_temperature_elasticity_and_last_temp():
+    """Elasticity is the least-squares slope of quantity on temperature."""
+    store = FeatureStore()
+    store.update(_rows("A", [50, 40, 30], temps=[-25.0, -20.0, -15.0]))
+
+    features = store.get("A")
+
+    assert features["temp_elasticity"] == pytest.approx(-2.0)
+    assert features["last_temp"] == -15.0
+    assert features["avg_temp"] == pytest.approx(-20.0)
+
+
+def test_features_for_seeds_unknown_sku_once():
+    """Fetched history seeds a SKU; later reads ignore it."""
+    store = FeatureStore()
+
+    seeded = store.features_for("A", _rows("A", [5, 7]))
+    again = store.features_for("A", _rows("A", [100]))
+
+    assert seeded["count"] == again["count"] == 2
+    assert store.features_for("B", [])["count"] == 0
+
+
+def test_upload_before_first_read_seeds_from_fetched_history():
+    """Rows ingested before a SKU is first read do not replace its history."""
+    store = FeatureStore()
+    history = _rows("A", [100] * 28)
+
+    # An upload of a date already in the fetched history
+    store.update(_rows("A", [100], start_day=28))
+    features = store.features_for("A", history)
+    assert features["count"] == 28
+    assert features["avg_units"] == pytest.approx(100.0)
+
+    # An upload newer than the fetched history is applied on top
+    store.invalidate("A")
+    store.update([{"sku_id": "A", "date": "2024-02-01", "sales_quantity": 1, "avg_temp": None}])
+    features = store.features_for("A", history)
+    assert features["count"] == 29
+    assert features["last_date"] == "2024-02-01"
+
+    # Once seeded, later uploads are folded in and history is not re-read
+    store.update([{"sku_id": "A", "date": "2024-02-02", "sales_quantity": 1, "avg_temp": None}])
+    assert store.features_for("A", history)["count"] == 30
+
+
+def test_ingest_in_another_worker_reseeds_features():
+    """A worker reseeds a SKU once another worker ingested rows for it, and
+    keeps its own ingests incremental."""
+    from app.services.data_versions import DataVersions
+    from app.services.shared_cache import SharedCache
+    from app.services.supabase_client import SupabaseClient
+
+    versions = DataVersions(SharedCache("memory"))
+    store_a, store_b = FeatureStore(versions), FeatureStore(versions)
+    client_a = SupabaseClient()
+    client_a.add_ingest_listener(versions.on_ingest)
+    client_a.add_ingest_listener(store_a.update)
+
+    history = _rows("A", [5, 7])
+    store_a.features_for("A", history)
+    store_b.features_for("A", history)
+
+    client_a.insert_sales_data(_rows("A", [9], start_day=3))
+    fresh_history = _rows("A", [5, 7, 9])
+
+    # The ingesting worker folded the row in and does not need the history
+    assert store_a.features_for("A", history)["count"] == 3
+    # The other worker rebuilds from the history fetched after the upload
+    assert store_b.features_for("A", fresh_history)["count"] == 3
+
+
+def test_global_store_updates_on_ingest():
+    """insert_sales_data feeds the global store through its listener."""
+    from app.services.feature_store import feature_store
+
+    feature_store.invalidate("SKU_INGEST")
+    supabase_client.insert_sales_data(_rows("SKU_INGEST", [3, 4]))
+
+    assert feature_store.get("SKU_INGEST")["count"] == 2
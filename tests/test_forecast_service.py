@@ -0,0 +1,166 @@
+"""Tests for forecast service orchestration.
+
+This module contains unit tests for latency-bounded forecasting and the
+local model fallback.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.models.schemas import GigaChatResponse
+from app.services.forecast_service import ForecastService
+from app.services.forecast_cache import ForecastCache, forecast_cache
+from app.services.local_model import LocalForecastModel
+
+
+HISTORY = [
+    {"date": "2024-01-22", "sales_quantity": 70, "avg_temp": -25.0},
+    {"date": "2024-01-15", "sales_quantity": 56, "avg_temp": -20.0},
+    {"date": "2024-01-08", "sales_quantity": 42, "avg_temp": -15.0},
+    {"date": "2024-01-01", "sales_quantity": 28, "avg_temp": -10.0},
+]
+
+
+def _llm_response(days: int) -> GigaChatResponse:
+    """Build a GigaChat-style response."""
+    return GigaChatResponse(
+        predictions=[{"date": f"2025-01-{i + 1:02d}", "predicted_units": 9, "confidence": 0.9} for i in range(days)],
+        explanation="llm",
+        confidence_scores=[0.9] * days
+    )
+
+
+class TestLocalModel:
+    """Tests for the local temperature-aware model."""
+
+    def test_fit_uses_daily_rate_of_weekly_history(self):
+        """Weekly totals are converted to daily rates before regression."""
+        params = LocalForecastModel().fit(HISTORY)
+
+        assert params["spacing_days"] == 7
+        # 4 + (-0.4) * temp: colder days sell more
+        assert params["slope"] == pytest.approx(-0.4)
+        assert params["intercept"] == pytest.approx(0.0, abs=1e-9)
+
+    def test_forecast_is_marked_local(self):
+        """Local forecasts have one prediction per day and are not LLM output."""
+        response = LocalForecastModel().forecast("SKU_A", HISTORY, 7)
+
+        assert len(response.predictions) == 7
+        assert response.generated_by_gigachat is False
+        assert all(pred["predicted_units"] >= 0 for pred in response.predictions)
+
+    def test_forecast_includes_ordered_intervals(self):
+        """Each prediction carries P10 <= P50 <= P90, stable across calls."""
+        model = LocalForecastModel()
+        noisy = HISTORY + [
+            {"date": f"2023-12-{day:02d}", "sales_quantity": qty, "avg_temp": -8.0}
+            for day, qty in [(4, 10), (11, 30), (18, 15), (25, 40)]
+        ]
+
+        first = model.forecast("SKU_A", noisy, 7).predictions
+        second = model.forecast("SKU_A", noisy, 7).predictions
+
+        assert all(pred["p10"] <= pred["p50"] <= pred["p90"] for pred in first)
+        assert any(pred["p10"] < pred["p90"] for pred in first)
+        assert first == second
+
+    def test_simulate_quantiles_is_vectorized_over_paths(self):
+        """Quantiles come from one simulation matrix of paths x horizon."""
+        model = LocalForecastModel()
+        point = np.full(30, 10.0)
+        residuals = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+
+        quantiles = model.simulate_quantiles(point, residuals, 1.4, seed=1)
+
+        assert quantiles.shape == (3, 30)
+        assert np.all(quantiles[0] >= 8) and np.all(quantiles[2] <= 12)
+        assert np.allclose(quantiles[1], 10.0)
+
+
+class TestHedgedForecast:
+    """Tests for deadline-aware hedging between GigaChat and the local model."""
+
+    def test_slow_llm_answers_locally_then_fills_cache(self):
+        """A slow GigaChat call is replaced by the local model and cached later."""
+        service = ForecastService()
+
+        async def slow_llm(**kwargs):
+            await asyncio.sleep(0.2)
+            return _llm_response(kwargs["forecast_period"])
+
+        async def scenario():
+            first = await service._hedged_forecast("HEDGE_SKU", HISTORY, 7, None, latency_budget=0.01)
+            # Let the background GigaChat call finish
+            await asyncio.gather(*service._inflight.values())
+            second = await service._hedged_forecast("HEDGE_SKU", HISTORY, 7, None, latency_budget=0.01)
+            return first, second
+
+        with patch("app.services.forecast_service.gigachat_service.generate_forecast", side_effect=slow_llm) as mock_llm:
+            first, second = asyncio.run(scenario())
+
+        assert first.generated_by_gigachat is False
+        assert second.generated_by_gigachat is True
+        assert second.explanation == "llm"
+        mock_llm.assert_called_once()
+        forecast_cache.invalidate_sku("HEDGE_SKU")
+
+    def test_fast_llm_answer_is_used(self):
+        """GigaChat answers within budget are returned directly."""
+        service = ForecastService()
+
+        with patch(
+            "app.services.forecast_service.gigachat_service.generate_forecast",
+            return_value=_llm_response(7)
+        ):
+            response = asyncio.run(service._hedged_forecast("FAST_SKU", HISTORY, 7, None, latency_budget=1))
+
+        assert response.generated_by_gigachat is True
+        forecast_cache.invalidate_sku("FAST_SKU")
+
+
+class TestForecastCache:
+    """Tests for cached GigaChat answers."""
+
+    def test_upload_invalidates_cached_forecasts(self):
+        """New sales for a SKU drop its cached answers, not other SKUs'."""
+        from app.services.supabase_client import supabase_client
+
+        fresh = forecast_cache.make_key("INGEST_SKU", 7)
+        other = forecast_cache.make_key("OTHER_SKU", 7)
+        forecast_cache.set(fresh, _llm_response(7))
+        forecast_cache.set(other, _llm_response(7))
+
+        supabase_client.insert_sales_data([
+            {"sku_id": "INGEST_SKU", "date": "2024-02-05", "sales_quantity": 10, "avg_temp": -5.0}
+        ])
+
+        assert forecast_cache.get(fresh) is None
+        assert forecast_cache.get(other) is not None
+        forecast_cache.invalidate_sku("OTHER_SKU")
+
+    def test_workers_share_answers_and_invalidations(self, tmp_path):
+        """An answer cached by one worker is served by another, and an upload
+        handled by either drops it for both."""
+        from app.services.shared_cache import SharedCache
+        from app.services.supabase_client import SupabaseClient
+
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a = ForecastCache(SharedCache("sqlite", path))
+        worker_b = ForecastCache(SharedCache("sqlite", path))
+        client_b = SupabaseClient()
+        client_b.add_ingest_listener(worker_b.on_ingest)
+
+        key = worker_a.make_key("SHARED_SKU", 7)
+        worker_a.set(key, _llm_response(7))
+        assert worker_b.get(key) is not None
+
+        client_b.insert_sales_data([
+            {"sku_id": "SHARED_SKU", "date": "2024-02-05", "sales_quantity": 10, "avg_temp": -5.0}
+        ])
+
+        assert worker_a.get(key) is None
+        assert worker_b.get(key) is None
@@ -0,0 +1,81 @@
+"""Tests for the GigaChat request scheduler.
+
+This module contains unit tests for rate limiting, priority lanes and
+429 backoff of the scheduler.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services.gigachat_scheduler import (
+    GigaChatScheduler, TokenBucket, SchedulerTimeoutError,
+    PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+
+
+@pytest.fixture
+def scheduler():
+    """Create a fast scheduler with a single concurrency slot."""
+    with patch.dict("os.environ", {
+        "GIGACHAT_RATE_LIMIT_RPS": "1000",
+        "GIGACHAT_RATE_LIMIT_BURST": "1000",
+        "GIGACHAT_MAX_CONCURRENCY": "1"
+    }):
+        yield GigaChatScheduler()
+
+
+def test_token_bucket_reports_wait_time():
+    """An empty bucket reports how long until the next token."""
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    assert bucket.try_acquire() == 0.0
+    assert 0 < bucket.try_acquire() <= 0.1
+
+
+def test_interactive_served_before_batch(scheduler):
+    """Queued interactive requests run before queued batch requests."""
+    order = []
+    release = threading.Event()
+
+    def holder():
+        with scheduler.slot(PRIORITY_BATCH):
+            release.wait(2)
+
+    def worker(priority, name):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = [threading.Thread(target=holder)]
+    threads[0].start()
+    time.sleep(0.05)
+
+    for priority, name in [(PRIORITY_BATCH, "batch"), (PRIORITY_INTERACTIVE, "interactive")]:
+        thread = threading.Thread(target=worker, args=(priority, name))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+
+    assert scheduler.get_metrics()["queue_depth"] == 2
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["interactive", "batch"]
+    assert scheduler.get_metrics()["lanes"]["batch"]["served"] == 2
+
+
+def test_rate_limit_pauses_queue_and_halves_rate(scheduler):
+    """A 429 with Retry-After blocks new requests and slows the bucket."""
+    scheduler.report_rate_limited(retry_after=5)
+
+    metrics = scheduler.get_metrics()
+    assert metrics["blocked_for_seconds"] > 4
+    assert metrics["current_rate"] == 500
+
+    with pytest.raises(SchedulerTimeoutError):
+        with scheduler.slot(timeout=0.1):
+            pass
+    assert scheduler.get_metrics()["timeouts"] == 1
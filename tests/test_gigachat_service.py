@@ -0,0 +1,264 @@
+"""Tests for GigaChat service helpers.
+
+This module contains unit tests for prompt building and response parsing
+that do not require access to the GigaChat API.
+"""
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from app.services.gigachat_service import GigaChatService
+from app.services.feature_store import feature_store
+
+
+@pytest.fixture
+def service():
+    """Create GigaChat service with real (non-mock) mode enabled."""
+    with patch.dict("os.environ", {"GIGACHAT_CREDENTIALS": "test-token"}):
+        yield GigaChatService()
+
+
+def _sku_answer(days: int) -> dict:
+    """Build a valid per-SKU answer with the given number of days."""
+    return {
+        "predictions": [
+            {"date": f"2025-01-{day + 1:02d}", "predicted_units": 4, "confidence": 0.8}
+            for day in range(days)
+        ],
+        "explanation": "ok"
+    }
+
+
+class TestBatchForecast:
+    """Tests for multi-SKU prompt batching."""
+
+    def test_parse_batch_response_splits_per_sku(self, service):
+        """Valid SKUs are parsed, invalid or missing ones map to None."""
+        answer = json.dumps({
+            "SKU_A": _sku_answer(7),
+            "SKU_B": {"predictions": [{"date": "2025-01-01"}]},
+        })
+
+        results = service._parse_batch_response(f"Ответ: {answer}", ["SKU_A", "SKU_B", "SKU_C"], 7)
+
+        assert len(results["SKU_A"].predictions) == 7
+        assert results["SKU_B"] is None
+        assert results["SKU_C"] is None
+
+    def test_batch_falls_back_per_sku(self, service):
+        """Only the SKUs missing from the answer get mock forecasts."""
+        answer = json.dumps({"SKU_A": _sku_answer(7)})
+
+        with patch.object(service, "_call_gigachat_api", return_value=answer) as mock_call:
+            results = asyncio.run(service.generate_forecasts_batch(
+                {"SKU_A": [], "SKU_B": []}, forecast_period=7
+            ))
+
+        mock_call.assert_called_once()
+        assert results["SKU_A"].generated_by_gigachat is True
+        assert results["SKU_B"].generated_by_gigachat is False
+        assert len(results["SKU_B"].predictions) == 7
+
+    def test_effective_batch_size_respects_max_tokens(self, service):
+        """Batch size shrinks when the completion budget is small."""
+        service.batch_size = 10
+        service.max_tokens = 2000
+        service.tokens_per_prediction = 40
+
+        assert service._effective_batch_size(7) == 5
+        assert service._effective_batch_size(30) == 1
+
+
+class TestPromptEncoding:
+    """Tests for compact prompt encoding and token accounting."""
+
+    def test_prompt_uses_sales_quantity_and_avg_temp(self, service):
+        """History rows are encoded as a date,qty,temp table."""
+        history = [
+            {"date": "2024-01-08", "sales_quantity": 12, "avg_temp": -18.5},
+            {"date": "2024-01-01", "sales_quantity": 8, "avg_temp": None},
+        ]
+
+        feature_store.invalidate("SKU_A")
+        prompt = service._build_forecast_prompt("SKU_A", history, 7)
+
+        assert "date,qty,temp\n2024-01-08,12,-18.5\n2024-01-01,8,\n" in prompt
+        assert "n=2;sum=20;mean=10.0;min=8;max=12" in prompt
+        assert "t_last=-18.5" in prompt
+
+    def test_prompt_reads_features_from_store(self, service):
+        """Summary comes from stored aggregates, not the fetched rows."""
+        feature_store.invalidate("SKU_B")
+        feature_store.features_for("SKU_B", [{"date": "2024-01-01", "sales_quantity": 40, "avg_temp": -30.0}])
+
+        prompt = service._build_forecast_prompt("SKU_B", [{"date": "2024-01-08", "sales_quantity": 1}], 7)
+
+        assert "n=1;sum=40;" in prompt
+        assert "t_last=-30.0" in prompt
+
+    def test_batch_prompt_encodes_each_sku_as_a_table(self, service):
+        """Each SKU gets a summary line and a date,qty,temp table under one instruction block."""
+        histories = {
+            "SKU_C": [{"date": "2024-01-08", "sales_quantity": 12, "avg_temp": -18.5}],
+            "SKU_D": [{"date": "2024-01-08", "sales_quantity": 3, "avg_temp": None}],
+        }
+        for sku_id in histories:
+            feature_store.invalidate(sku_id)
+
+        prompt = service._build_batch_forecast_prompt(histories, 7)
+
+        assert "SKU SKU_C. Итоги: n=1;sum=12;" in prompt
+        assert "date,qty,temp\n2024-01-08,12,-18.5\n" in prompt
+        assert "date,qty,temp\n2024-01-08,3,\n" in prompt
+        assert prompt.count("Ответ строго JSON") == 1
+
+    def test_call_records_token_usage(self, service):
+        """Prompt and completion token counts are recorded per call."""
+        response = MagicMock(status_code=200)
+        response.json.return_value = {
+            "choices": [{"message": {"content": "{}"}}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 80, "total_tokens": 200}
+        }
+
+        with patch.object(service.session, "post", return_value=response), \
+             patch("app.services.gigachat_service.usage_service.record_gigachat_call") as mock_record:
+            service._call_gigachat_api("prompt")
+
+        kwargs = mock_record.call_args.kwargs
+        assert kwargs["prompt_tokens"] == 120
+        assert kwargs["completion_tokens"] == 80
+
+
+class TestUsageService:
+    """Tests for batched usage persistence."""
+
+    @staticmethod
+    def _record(usage, prompt_tokens, completion_tokens=0, response_time_ms=100):
+        """Record a call and wait for the flush it may have started."""
+        usage.record_gigachat_call(prompt_tokens, completion_tokens, response_time_ms)
+        if usage._flush_thread is not None:
+            usage._flush_thread.join(timeout=5)
+
+    def test_flushes_in_batches(self):
+        """Records are written once the flush size is reached."""
+        from app.services.usage_service import UsageService
+
+        usage = UsageService()
+        usage.flush_size = 2
+
+        with patch("app.services.usage_service.supabase_client.insert_api_usage_stats") as mock_insert:
+            mock_insert.return_value = 2
+            self._record(usage, 100, 50, 900)
+            mock_insert.assert_not_called()
+            self._record(usage, 10, 5, 300)
+
+        rows = mock_insert.call_args.args[0]
+        assert [row["gigachat_tokens_used"] for row in rows] == [150, 15]
+        assert usage.get_stats()["total_tokens"] == 165
+        assert usage.get_stats()["pending_records"] == 0
+
+    def test_flush_does_not_block_the_call(self):
+        """A slow usage write does not hold up the GigaChat call path."""
+        from app.services.usage_service import UsageService
+
+        usage = UsageService()
+        usage.flush_size = 1
+        release = threading.Event()
+
+        with patch("app.services.usage_service.supabase_client.insert_api_usage_stats",
+                   side_effect=lambda rows: release.wait(5) and len(rows)) as mock_insert:
+            usage.record_gigachat_call(1, 0, 100)
+            assert usage._flush_thread.is_alive()
+            release.set()
+            usage._flush_thread.join(timeout=5)
+
+        mock_insert.assert_called_once()
+        assert usage.get_stats()["pending_records"] == 0
+
+    def test_failed_flush_keeps_newest_records_within_cap(self):
+        """Failed writes are retried later, but the buffer never exceeds its cap."""
+        from app.services.usage_service import UsageService
+
+        with patch.dict("os.environ", {"USAGE_FLUSH_SIZE": "2", "USAGE_MAX_BUFFER": "3"}):
+            usage = UsageService()
+
+        with patch("app.services.usage_service.supabase_client.insert_api_usage_stats",
+                   side_effect=Exception("Supabase down")):
+            for tokens in range(1, 6):
+                self._record(usage, tokens)
+
+        stats = usage.get_stats()
+        assert stats["pending_records"] == 3
+        assert stats["dropped_records"] == 2
+        assert stats["calls"] == 5
+
+        with patch("app.services.usage_service.supabase_client.insert_api_usage_stats") as mock_insert:
+            mock_insert.return_value = 3
+            assert usage.flush() == 3
+
+        rows = mock_insert.call_args.args[0]
+        assert [row["gigachat_tokens_used"] for row in rows] == [3, 4, 5]
+        assert usage.get_stats()["pending_records"] == 0
+
+
+class TestStreamingForecast:
+    """Tests for streamed GigaChat completions."""
+
+    def test_stream_emits_predictions_before_explanation(self, service):
+        """Predictions are yielded while the explanation is still pending."""
+        answer = json.dumps(_sku_answer(3), ensure_ascii=False)
+        chunks = [answer[i:i + 10] for i in range(0, len(answer), 10)]
+        seen_chunks = []
+
+        def fake_stream(prompt, priority=0):
+            for chunk in chunks:
+                seen_chunks.append(chunk)
+                yield chunk
+
+        with patch.object(service, "_stream_gigachat_api", side_effect=fake_stream):
+            events = []
+            for kind, payload in service.stream_forecast("SKU_A", [], 3):
+                events.append((kind, len(seen_chunks)))
+
+        assert [kind for kind, _ in events] == ["prediction"] * 3 + ["complete"]
+        # The first prediction arrives long before the stream is finished
+        assert events[0][1] < len(chunks)
+
+    def test_stream_failure_falls_back_for_remaining_days(self, service):
+        """Days not received before an error come from the mock generator."""
+        def broken_stream(prompt, priority=0):
+            yield '{"predictions": [{"date": "2025-01-01", "predicted_units": 4},'
+            raise ConnectionError("stream dropped")
+
+        with patch.object(service, "_stream_gigachat_api", side_effect=broken_stream):
+            events = list(service.stream_forecast("SKU_A", [], 3))
+
+        assert [kind for kind, _ in events] == ["prediction"] * 3 + ["complete"]
+        assert events[0][1]["predicted_units"] == 4
+        assert events[-1][1].generated_by_gigachat is False
+
+
+class TestSharedAccessToken:
+    """Tests for OAuth token reuse across worker processes."""
+
+    def test_token_obtained_by_one_worker_is_reused(self):
+        """A second service instance takes the token from the shared cache."""
+        env = {"GIGACHAT_CREDENTIALS": "", "GIGACHAT_CLIENT_ID": "id", "GIGACHAT_CLIENT_SECRET": "secret",
+               "GIGACHAT_SCOPE": "SHARED_TOKEN_TEST"}
+        with patch.dict("os.environ", env):
+            first, second = GigaChatService(), GigaChatService()
+
+        token_response = MagicMock(status_code=200)
+        token_response.json.return_value = {"access_token": "shared-token", "expires_in": 1800}
+
+        with patch.object(first.session, "post", return_value=token_response) as first_post, \
+             patch.object(second.session, "post") as second_post:
+            assert first._get_access_token() == "shared-token"
+            assert second._get_access_token() == "shared-token"
+
+        assert first_post.call_count == 1
+        second_post.assert_not_called()
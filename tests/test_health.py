@@ -14,11 +14,20 @@ from app.main import app
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def fresh_probe():
+    """Drop cached probe results so each test probes with its own mocks."""
+    from app.services.health_service import health_prober
+    health_prober.results = {}
+    yield health_prober
+    health_prober.results = {}
+
+
 def test_health_check_success():
     """Test successful health check."""
-    with patch('app.services.supabase_client.supabase_client.execute_query') as mock_query:
+    with patch('app.services.supabase_client.supabase_client.health_check') as mock_check:
         # Mock successful database connection
-        mock_query.return_value = [{'?column?': 1}]
+        mock_check.return_value = True
 
         response = client.get("/api/v1/health")
 
@@ -28,16 +37,18 @@ def test_health_check_success():
         assert data["status"] == "healthy"
         assert data["version"] == "1.0.0"
         assert "timestamp" in data
+        assert data["checks"]["supabase"]["ok"] is True
+        assert "latency_ms" in data["checks"]["supabase"]
 
-        # Verify database query was called
-        mock_query.assert_called_once_with("SELECT 1", fetch=True)
+        # Verify database was probed
+        mock_check.assert_called_once()
 
 
 def test_health_check_database_failure():
     """Test health check with database connection failure."""
-    with patch('app.services.supabase_client.supabase_client.execute_query') as mock_query:
+    with patch('app.services.supabase_client.supabase_client.health_check') as mock_check:
         # Mock database connection failure
-        mock_query.side_effect = Exception("Database connection failed")
+        mock_check.side_effect = Exception("Database connection failed")
 
         response = client.get("/api/v1/health")
 
@@ -47,6 +58,55 @@ def test_health_check_database_failure():
         assert "Service unavailable" in data["detail"]
 
 
+def test_health_check_answers_from_cache():
+    """Test that repeated health checks do not query the database."""
+    with patch('app.services.supabase_client.supabase_client.health_check', return_value=True) as mock_check:
+        for _ in range(5):
+            assert client.get("/api/v1/health").status_code == 200
+
+        mock_check.assert_called_once()
+
+
+def test_health_check_degraded_without_gigachat():
+    """Test that a GigaChat failure degrades but does not fail the health check."""
+    with patch('app.services.gigachat_service.gigachat_service.health_check', return_value=False):
+        response = client.get("/api/v1/health")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "degraded"
+    assert data["checks"]["gigachat"]["ok"] is False
+    assert data["checks"]["gigachat"]["consecutive_failures"] == 1
+
+
+def test_liveness():
+    """Test that liveness never probes dependencies."""
+    with patch('app.services.supabase_client.supabase_client.health_check') as mock_check:
+        response = client.get("/api/v1/health/live")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "alive"
+    mock_check.assert_not_called()
+
+
+def test_readiness(fresh_probe):
+    """Test readiness before and after services are loaded."""
+    app.state.services_ready = False
+    assert client.get("/api/v1/health/ready").status_code == 503
+
+    app.state.services_ready = True
+    try:
+        response = client.get("/api/v1/health/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+
+        with patch('app.services.supabase_client.supabase_client.health_check', return_value=False):
+            fresh_probe.results = {}
+            assert client.get("/api/v1/health/ready").status_code == 503
+    finally:
+        app.state.services_ready = False
+
+
 def test_root_endpoint():
     """Test root endpoint returns API information."""
     response = client.get("/")
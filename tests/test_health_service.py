@@ -0,0 +1,83 @@
+"""Tests for the background health prober."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from app.services.health_service import HealthProber
+
+
+def _prober(supabase=True, gigachat=True, **env):
+    """HealthProber with stub checks returning the given results."""
+    with patch.dict("os.environ", env):
+        prober = HealthProber()
+    prober.checks = {
+        "supabase": MagicMock(return_value=supabase),
+        "gigachat": MagicMock(return_value=gigachat),
+    }
+    return prober
+
+
+class TestHealthProber:
+    """Tests for HealthProber."""
+
+    def test_probe_records_results(self):
+        """Each dependency gets ok, latency and a timestamp; checks get the timeout."""
+        prober = _prober(HEALTH_PROBE_TIMEOUT="2")
+        results = prober.probe_once()
+
+        assert set(results) == {"supabase", "gigachat"}
+        assert results["supabase"]["ok"] is True
+        assert results["supabase"]["latency_ms"] >= 0
+        assert results["supabase"]["checked_at"] is not None
+        prober.checks["supabase"].assert_called_once_with(2.0)
+        assert prober.status == "healthy"
+
+    def test_status(self):
+        """Only a required dependency makes the service unhealthy."""
+        degraded = _prober(gigachat=False)
+        degraded.probe_once()
+        unhealthy = _prober(supabase=False)
+        unhealthy.probe_once()
+
+        assert degraded.status == "degraded"
+        assert unhealthy.status == "unhealthy"
+        assert _prober().status == "unhealthy"  # not probed yet
+
+    def test_exceptions_count_as_failures(self):
+        """A raising check fails, with the error and a failure streak."""
+        prober = _prober()
+        prober.checks["supabase"].side_effect = RuntimeError("timeout")
+        prober.probe_once()
+        prober._probed_at = 0.0
+        prober.probe_once()
+
+        result = prober.results["supabase"]
+        assert result["ok"] is False
+        assert result["error"] == "timeout"
+        assert result["consecutive_failures"] == 2
+
+    def test_ensure_fresh_probes_only_when_stale(self):
+        """Cached results are reused within the interval."""
+        prober = _prober(HEALTH_PROBE_INTERVAL="60")
+        asyncio.run(prober.ensure_fresh())
+        asyncio.run(prober.ensure_fresh())
+        assert prober.checks["supabase"].call_count == 1
+
+        prober._probed_at -= 61
+        asyncio.run(prober.ensure_fresh())
+        assert prober.checks["supabase"].call_count == 2
+
+    def test_periodic_probe(self):
+        """start() probes on the interval until stop()."""
+        prober = _prober(HEALTH_PROBE_INTERVAL="0.01")
+
+        async def run():
+            prober.start()
+            assert prober.running
+            await asyncio.sleep(0.1)
+            await prober.stop()
+
+        asyncio.run(run())
+
+        assert prober.checks["supabase"].call_count >= 2
+        assert not prober.running
@@ -0,0 +1,105 @@
+"""Tests for the whole-catalog matrix forecasting engine."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.matrix_forecast import CatalogMatrix, MatrixForecastEngine, forecast_catalog
+
+
+def _weekly_rows(sku_id, weeks, qty_fn, start=date(2024, 1, 1), skip=(), temp_fn=lambda week: -20.0 + week):
+    """Weekly history with quantity as a function of the week's temperature."""
+    rows = []
+    for week in range(weeks):
+        if week in skip:
+            continue
+        temp = temp_fn(week)
+        rows.append({
+            "sku_id": sku_id,
+            "date": (start + timedelta(weeks=week)).isoformat(),
+            "sales_quantity": qty_fn(temp),
+            "avg_temp": temp
+        })
+    return rows
+
+
+def test_matrix_aligns_skus_and_masks_missing_weeks():
+    """Each SKU is one row; weeks without data are masked out."""
+    rows = _weekly_rows("A", 6, lambda t: 10) + _weekly_rows("B", 6, lambda t: 5, skip={2, 3})
+
+    matrix = CatalogMatrix.from_rows(rows)
+
+    assert list(matrix.sku_ids) == ["A", "B"]
+    assert matrix.qty.shape == (2, 6)
+    assert matrix.mask[0].all()
+    assert list(matrix.mask[1]) == [True, True, False, False, True, True]
+    assert matrix.qty[1, 2] == 0
+
+
+def test_matrix_sums_records_in_the_same_week():
+    """Daily records are aggregated into their Monday-aligned week."""
+    rows = [
+        {"sku_id": "A", "date": "2024-01-01", "sales_quantity": 3, "avg_temp": -10.0},
+        {"sku_id": "A", "date": "2024-01-07", "sales_quantity": 4, "avg_temp": -20.0},
+        {"sku_id": "A", "date": "2024-01-08", "sales_quantity": 5, "avg_temp": None},
+    ]
+
+    matrix = CatalogMatrix.from_rows(rows)
+
+    assert list(matrix.qty[0]) == [7, 5]
+    assert matrix.temps[0, 0] == pytest.approx(-15.0)
+    assert np.isfinite(matrix.temps[0, 1])
+
+
+def test_fit_recovers_temperature_effect_for_all_skus():
+    """Vectorized fit matches each SKU's own temperature response."""
+    # Temperature must not move in lockstep with the trend to be identifiable
+    def temp_fn(week):
+        return -20.0 + (week % 5) * 4
+
+    rows = (
+        _weekly_rows("COLD", 30, lambda t: 100 - 2 * t, temp_fn=temp_fn)
+        + _weekly_rows("FLAT", 30, lambda t: 40, temp_fn=temp_fn)
+    )
+    engine = MatrixForecastEngine()
+    engine.ridge = 1e-6
+
+    params = engine.fit(CatalogMatrix.from_rows(rows))
+
+    # Temperature feature is scaled by 1/10
+    assert params["coef"][0, 1] == pytest.approx(-20.0, abs=0.5)
+    assert params["coef"][1, 1] == pytest.approx(0.0, abs=0.5)
+    assert params["residual_std"][1] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_forecast_catalog_returns_daily_forecast_per_sku():
+    """One call forecasts every SKU over the whole horizon."""
+    rows = _weekly_rows("A", 20, lambda t: 70) + _weekly_rows("B", 20, lambda t: 14)
+
+    catalog = forecast_catalog(rows, 10, start=date(2024, 6, 1))
+
+    assert catalog.daily.shape == (2, 10)
+    assert catalog.dates[0] == date(2024, 6, 1)
+    assert catalog.for_sku("A").mean() == pytest.approx(10.0, rel=0.05)
+    assert catalog.for_sku("B").mean() == pytest.approx(2.0, rel=0.05)
+    assert (catalog.daily >= 0).all()
+
+
+def test_catalog_forecast_converts_to_gigachat_shape():
+    """Per-SKU output has the same shape as a GigaChat answer."""
+    catalog = forecast_catalog(_weekly_rows("A", 12, lambda t: 21), 7)
+
+    answer = catalog.to_gigachat_response("A")
+
+    assert len(answer.predictions) == 7
+    assert answer.generated_by_gigachat is False
+    assert {"date", "predicted_units", "predicted_temp", "confidence"} <= set(answer.predictions[0])
+
+
+def test_empty_history_gives_empty_catalog():
+    """No rows yields an empty forecast rather than an error."""
+    catalog = forecast_catalog([], 7)
+
+    assert catalog.daily.shape == (0, 7)
+    assert "A" not in catalog
@@ -0,0 +1,110 @@
+"""Tests for forecast retention and compaction."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from app.services.retention_service import RetentionService
+
+
+NOW = datetime(2024, 6, 30, 12, 0, tzinfo=timezone.utc)
+
+
+def _header(forecast_id, age, sku_id="A", period=7):
+    """Forecast header created ``age`` (timedelta) before NOW."""
+    return {
+        "id": forecast_id,
+        "sku_id": sku_id,
+        "created_at": (NOW - age).isoformat(),
+        "key_factors": ["gigachat", f"period_{period}"]
+    }
+
+
+def _service(**settings):
+    service = RetentionService()
+    service.keep_latest = 2
+    service.full_days = 3
+    service.snapshot_days = 30
+    service.batch_pause = 0
+    for name, value in settings.items():
+        setattr(service, name, value)
+    return service
+
+
+def test_keeps_latest_and_recent_forecasts():
+    """The newest N and everything inside the full window survive."""
+    headers = [_header(i, timedelta(hours=i)) for i in range(1, 6)]
+
+    assert _service().select_for_deletion(headers, now=NOW) == []
+
+
+def test_old_forecasts_compacted_to_daily_snapshots():
+    """Beyond the full window only the newest forecast of each day is kept."""
+    headers = [
+        _header(1, timedelta(hours=1)),
+        _header(2, timedelta(hours=2)),
+        _header(10, timedelta(days=10, hours=1)),
+        _header(11, timedelta(days=10, hours=3)),
+        _header(12, timedelta(days=10, hours=5)),
+        _header(20, timedelta(days=40)),
+    ]
+
+    deleted = _service().select_for_deletion(headers, now=NOW)
+
+    # 10 is the day's snapshot; 20 is older than the snapshot horizon
+    assert sorted(forecast_id for forecast_id, _ in deleted) == [11, 12, 20]
+
+
+def test_groups_are_per_sku_and_period():
+    """Latest-N is counted separately for each SKU and period."""
+    headers = [
+        _header(1, timedelta(days=20), period=7),
+        _header(2, timedelta(days=20), period=30),
+        _header(3, timedelta(days=20), sku_id="B"),
+    ]
+
+    assert _service().select_for_deletion(headers, now=NOW) == []
+
+
+def test_run_once_deletes_in_bounded_batches():
+    """Deletes are issued in batches and deleted rows are reported as counted."""
+    headers = [_header(i, timedelta(days=10, minutes=i)) for i in range(1, 8)]
+    service = _service(keep_latest=1, delete_batch_size=2)
+
+    with patch("app.services.retention_service.supabase_client.iter_forecast_headers",
+               return_value=iter([headers[:3], headers[3:]])), \
+         patch("app.services.retention_service.supabase_client.delete_forecast_predictions",
+               side_effect=lambda ids: 5 * len(ids)), \
+         patch("app.services.retention_service.supabase_client.delete_forecasts", side_effect=len) as mock_delete:
+        report = service.run_once()
+
+    assert [len(call.args[0]) for call in mock_delete.call_args_list] == [2, 2, 2]
+    assert report["forecasts_deleted"] == 6
+    assert report["prediction_rows_deleted"] == 30
+    assert report["scanned"] == 7
+    assert service.last_report == report
+
+
+def test_scan_applies_policy_per_sku_across_pages():
+    """A SKU split over two pages is judged on all of its headers."""
+    headers = [_header(i, timedelta(days=10, minutes=i)) for i in range(1, 4)]
+    headers += [_header(i, timedelta(days=10, minutes=i), sku_id="B") for i in range(4, 6)]
+    service = _service(keep_latest=2)
+
+    with patch("app.services.retention_service.supabase_client.iter_forecast_headers",
+               return_value=iter([headers[:2], headers[2:4], headers[4:]])):
+        scanned, selected = service._scan(NOW)
+
+    assert scanned == 5
+    assert selected == [(3, "A")]
+
+
+def test_only_one_worker_claims_a_run():
+    """Within an interval only the first claim succeeds."""
+    from app.services.retention_service import shared_cache
+
+    shared_cache.delete("retention", "run")
+    first, second = _service(interval_hours=6), _service(interval_hours=6)
+
+    assert first.claim_run() is True
+    assert second.claim_run() is False
+    shared_cache.delete("retention", "run")
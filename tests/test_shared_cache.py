@@ -0,0 +1,132 @@
+"""Tests for the cross-worker shared cache."""
+
+import os
+import stat
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services.shared_cache import SharedCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    """Shared cache on each backend."""
+    return SharedCache(backend=request.param, path=str(tmp_path / "cache.sqlite3"))
+
+
+class TestSharedCache:
+    """Tests for SharedCache on both backends."""
+
+    def test_set_get_and_ttl(self, cache):
+        """Values expire after their TTL; values without TTL stay."""
+        cache.set("ns", "short", b"1", ttl=10)
+        cache.set("ns", "forever", b"2")
+
+        assert cache.get("ns", "short") == b"1"
+        with patch("app.services.shared_cache.time.time", return_value=time.time() + 11):
+            assert cache.get("ns", "short") is None
+            assert cache.get("ns", "forever") == b"2"
+        assert cache.get("other", "short") is None
+
+    def test_add_keeps_first_value(self, cache):
+        """add stores only when the key is absent and returns the stored value."""
+        assert cache.add("ns", "epoch", b"a") == b"a"
+        assert cache.add("ns", "epoch", b"b") == b"a"
+
+    def test_add_with_ttl_expires(self, cache):
+        """A value added with a TTL can be replaced once it expires."""
+        assert cache.add("ns", "lock", b"a", ttl=10) == b"a"
+        assert cache.add("ns", "lock", b"b", ttl=10) == b"a"
+        with patch("app.services.shared_cache.time.time", return_value=time.time() + 11):
+            assert cache.add("ns", "lock", b"b", ttl=10) == b"b"
+
+    def test_delete_and_prefix(self, cache):
+        """Keys are removed singly or by prefix within a namespace."""
+        for key in ('["A",7]', '["A",14]', '["AB",7]'):
+            cache.set("ns", key, b"x")
+        cache.set("other", '["A",7]', b"x")
+
+        assert cache.delete_prefix("ns", '["A",') == 2
+        assert cache.get("ns", '["AB",7]') == b"x"
+        assert cache.get("other", '["A",7]') == b"x"
+        cache.delete("ns", '["AB",7]')
+        assert cache.get("ns", '["AB",7]') is None
+
+    def test_update(self, cache):
+        """update replaces a value with fn(current); None leaves it unchanged."""
+        assert cache.update("ns", "k", lambda value: b"1" if value is None else value + b"1") == b"1"
+        assert cache.update("ns", "k", lambda value: value + b"2") == b"12"
+        assert cache.update("ns", "k", lambda value: None) == b"12"
+        assert cache.update("ns", "missing", lambda value: None) is None
+        assert cache.get("ns", "missing") is None
+
+    def test_update_rolls_back_on_error(self, cache):
+        """A failing fn leaves the value as it was."""
+        cache.set("ns", "k", b"1")
+
+        def fail(value):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.update("ns", "k", fail)
+        assert cache.get("ns", "k") == b"1"
+
+    def test_counters(self, cache):
+        """Counters start at zero and increment atomically."""
+        assert cache.counter("ns", "sales:A") == 0
+        assert cache.incr("ns", "sales:A") == 1
+        assert cache.incr("ns", "sales:A") == 2
+        assert cache.counter("ns", "sales:A") == 2
+
+
+class TestSQLiteSharing:
+    """Tests for visibility between processes sharing one SQLite file."""
+
+    def test_writes_and_invalidations_propagate(self, tmp_path):
+        """Two caches on one file, as two workers, see each other's changes."""
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a, worker_b = SharedCache("sqlite", path), SharedCache("sqlite", path)
+
+        worker_a.set("forecasts", "k", b"v", ttl=60)
+        worker_a.incr("data_versions", "sales:A")
+        assert worker_b.get("forecasts", "k") == b"v"
+        assert worker_b.counter("data_versions", "sales:A") == 1
+        assert worker_b.add("data_versions", "epoch", b"b") == worker_a.add("data_versions", "epoch", b"a")
+
+        worker_b.delete_prefix("forecasts", "k")
+        assert worker_a.get("forecasts", "k") is None
+
+    def test_wal_mode(self, tmp_path):
+        """The database runs in write-ahead-log mode."""
+        cache = SharedCache("sqlite", str(tmp_path / "cache.sqlite3"))
+        assert cache._backend._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_files_are_private(self, tmp_path):
+        """The database and its WAL and shared-memory files are owner-only,
+        whatever the process umask."""
+        path = str(tmp_path / "private" / "cache.sqlite3")
+        previous_umask = os.umask(0o022)
+        try:
+            cache = SharedCache("sqlite", path)
+            cache.set("gigachat_token", "token", b"secret")
+        finally:
+            os.umask(previous_umask)
+
+        for name in (path, path + "-wal", path + "-shm"):
+            assert stat.S_IMODE(os.stat(name).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+    def test_default_path_is_not_shared_tmp(self, tmp_path):
+        """Without SHARED_CACHE_PATH the file goes to the user's cache directory."""
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(tmp_path)}):
+            os.environ.pop("SHARED_CACHE_PATH", None)
+            cache = SharedCache("sqlite")
+
+        assert cache.path == str(tmp_path / "forecast_buddy" / "shared_cache.sqlite3")
+
+    def test_unknown_backend(self):
+        """Misconfigured backends fail loudly."""
+        with pytest.raises(ValueError):
+            SharedCache(backend="redis")
@@ -0,0 +1,81 @@
+"""Tests for lazy service loading and application start-up."""
+
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+
+class TestLazyStartup:
+    """Tests for deferred service construction."""
+
+    def test_import_does_not_load_services(self):
+        """Importing the app builds no services and imports no numpy or pandas."""
+        code = (
+            "import sys, app.main; "
+            "print(sorted(m for m in sys.modules if m.startswith('app.services.') "
+            "or m in ('numpy', 'pandas', 'requests')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            env={**os.environ, "ENVIRONMENT": "test"},
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+
+        assert result.stdout.strip().splitlines()[-1] == "['app.services.gigachat_scheduler']"
+
+    def test_service_modules_import_without_supabase_settings(self):
+        """The Supabase client reads its settings on first use, not on import."""
+        code = (
+            "import app.services.forecast_service\n"
+            "from app.services.supabase_client import supabase_client\n"
+            "try:\n"
+            "    supabase_client.rest_url\n"
+            "except ValueError as e:\n"
+            "    print(e)\n"
+        )
+        env = {
+            name: value for name, value in os.environ.items()
+            if name not in ("ENVIRONMENT", "SUPABASE_URL", "SUPABASE_ANON_KEY")
+        }
+        env["SHARED_CACHE_BACKEND"] = "memory"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+
+        assert result.stdout.strip().splitlines()[-1] == "SUPABASE_URL environment variable is required"
+
+    def test_lifespan_starts_services_in_background(self):
+        """The app serves at once; the forecast writer starts shortly after."""
+        from app.main import app
+        from app.services.forecast_service import forecast_service
+
+        with TestClient(app) as client:
+            assert client.get("/").status_code == 200
+            deadline = time.monotonic() + 5
+            while not forecast_service.writer.running and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert forecast_service.writer.running
+
+        assert not forecast_service.writer.running
+
+    def test_health_reports_ready_and_warm_separately(self):
+        """/health reports readiness and warm-up state once start-up finishes."""
+        from app.main import app
+        from app.services.warmup_service import warmup_service
+
+        # An earlier lifespan may have left a cancelled (partial) run behind
+        warmup_service.status = "pending"
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 5
+            while warmup_service.status in ("pending", "running") and time.monotonic() < deadline:
+                time.sleep(0.01)
+            data = client.get("/api/v1/health").json()
+
+        assert data["ready"] is True
+        assert data["warm"] is True
+        assert data["warmup"]["status"] == "done"
+        assert data["warmup"]["hot_skus"] == 2
@@ -0,0 +1,39 @@
+"""Tests for incremental parsing of streamed GigaChat answers."""
+
+import json
+
+from app.services.stream_parser import IncrementalPredictionParser
+
+
+ANSWER = (
+    'Вот прогноз:\n```json\n{"predictions": ['
+    '{"date": "2025-01-01", "predicted_units": 5, "note": "скидка {1}"},'
+    '{"date": "2025-01-02", "predicted_units": 7}'
+    '], "explanation": "Холодно, \\"predictions\\": [ ]"}\n```'
+)
+
+
+def test_emits_each_prediction_when_it_closes():
+    """Elements are returned by the chunk that closes them."""
+    parser = IncrementalPredictionParser()
+    first_end = ANSWER.index("}") + 1
+
+    assert parser.feed(ANSWER[:first_end - 1]) == []
+    first = parser.feed(ANSWER[first_end - 1:first_end + 5])
+    assert [p["date"] for p in first] == ["2025-01-01"]
+    assert first[0]["note"] == "скидка {1}"
+
+    rest = parser.feed(ANSWER[first_end + 5:])
+    assert [p["predicted_units"] for p in rest] == [7]
+
+
+def test_character_by_character_stream_matches_full_parse():
+    """Feeding one character at a time yields the same predictions."""
+    parser = IncrementalPredictionParser()
+    predictions = []
+    for char in ANSWER:
+        predictions.extend(parser.feed(char))
+
+    full = json.loads(ANSWER[ANSWER.index("{"):ANSWER.rindex("}") + 1])
+    assert predictions == full["predictions"]
+    assert parser.text == ANSWER
@@ -0,0 +1,90 @@
+"""Tests for the start-up cache warm-up."""
+
+from unittest.mock import patch
+
+from app.services.warmup_service import WarmupService
+
+
+def _service(**env):
+    """WarmupService configured from ``env`` on top of the defaults."""
+    with patch.dict("os.environ", env):
+        return WarmupService()
+
+
+class TestWarmupService:
+    """Tests for WarmupService."""
+
+    def test_run_warms_hot_skus(self):
+        """A run within budget covers every hot SKU and reports done."""
+        service = _service()
+        with patch("app.services.warmup_service.feature_store.features_for") as features_for:
+            report = service.run()
+
+        assert service.status == "done"
+        assert service.warm
+        assert report["hot_skus"] == 2
+        assert report["history_skus"] == features_for.call_count == 2
+        assert report["covered_skus"] == 2
+        assert report["catalog_skus"] >= 2
+
+    def test_history_fetched_in_chunks(self):
+        """History is fetched for at most WARMUP_HISTORY_CHUNK SKUs per query."""
+        service = _service(WARMUP_HISTORY_CHUNK="1")
+        with patch("app.services.warmup_service.supabase_client.get_sales_history",
+                   return_value=[]) as get_history:
+            service.run()
+
+        assert [c.kwargs["sku_ids"] for c in get_history.call_args_list] == [["SKU_001"], ["SKU_002"]]
+
+    def test_budget_exhausted_is_partial(self):
+        """Steps after the budget runs out are skipped and the run is partial."""
+        service = _service(WARMUP_BUDGET_SECONDS="0")
+        report = service.run()
+
+        assert service.status == "partial"
+        assert not service.warm
+        assert report["history_skus"] == 0
+        assert report["covered_skus"] == 0
+
+    def test_falls_back_to_catalog(self):
+        """Without recent activity the first catalog SKUs are warmed."""
+        service = _service(WARMUP_MAX_SKUS="1")
+        with patch("app.services.warmup_service.supabase_client.get_recent_sku_ids", return_value=[]):
+            report = service.run()
+
+        assert report["hot_skus"] == 1
+        assert service.status == "done"
+
+    def test_disabled(self):
+        """A disabled warm-up does nothing and never reports warm."""
+        service = _service(WARMUP_ENABLED="false")
+        with patch("app.services.warmup_service.supabase_client.get_recent_sku_ids") as recent:
+            assert service.run() == {}
+
+        recent.assert_not_called()
+        assert service.status == "disabled"
+        assert not service.warm
+
+    def test_cancel_stops_run(self):
+        """A cancelled run stops at the next step and is partial."""
+        service = _service(WARMUP_HISTORY_CHUNK="1")
+
+        def cancel_first(*args, **kwargs):
+            service.cancel()
+            return []
+
+        with patch("app.services.warmup_service.supabase_client.get_sales_history", side_effect=cancel_first):
+            report = service.run()
+
+        assert report["covered_skus"] == 1
+        assert service.status == "partial"
+
+    def test_failure_is_reported(self):
+        """An error fails the run without raising."""
+        service = _service()
+        with patch("app.services.warmup_service.supabase_client.get_recent_sku_ids",
+                   side_effect=RuntimeError("boom")):
+            report = service.run()
+
+        assert service.status == "failed"
+        assert report["error"] == "boom"
@@ -0,0 +1,139 @@
+"""Tests for the write-behind persistence queue."""
+
+import threading
+from unittest.mock import patch
+
+from app.services.write_behind import WriteBehindQueue
+
+
+def _queue(writer, **settings):
+    """Queue with fast retries and the given overrides."""
+    queue = WriteBehindQueue("test", writer)
+    queue.retry_backoff = 0.0
+    for name, value in settings.items():
+        setattr(queue, name, value)
+    return queue
+
+
+def test_items_are_written_in_batches_and_drained_on_stop():
+    """Backlog is written in batches of at most batch_size on shutdown."""
+    batches = []
+    queue = _queue(batches.append, batch_size=3)
+
+    for item in range(7):
+        queue.submit(item)
+    queue.start()
+    remaining = queue.stop(timeout=5)
+
+    assert remaining == 0
+    assert sum(batches, []) == list(range(7))
+    assert max(len(batch) for batch in batches) <= 3
+    assert queue.get_metrics()["written"] == 7
+
+
+def test_failed_batch_is_retried():
+    """A transient failure is retried and the batch is not lost."""
+    calls = []
+
+    def flaky(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            raise RuntimeError("supabase unavailable")
+
+    queue = _queue(flaky)
+    queue.start()
+    queue.submit("a")
+    queue.stop(timeout=5)
+
+    metrics = queue.get_metrics()
+    assert calls == [["a"], ["a"]]
+    assert metrics["retries"] == 1
+    assert metrics["written"] == 1
+
+
+def test_batch_dropped_after_max_retries():
+    """Persistent failures drop the batch and count it."""
+    def failing(batch):
+        raise RuntimeError("down")
+
+    queue = _queue(failing, max_retries=2)
+    queue.start()
+    queue.submit("a")
+    queue.stop(timeout=5)
+
+    metrics = queue.get_metrics()
+    assert metrics["dropped_write_failed"] == 1
+    assert metrics["retries"] == 2
+
+
+def test_full_queue_drops_new_items():
+    """Items beyond max_size are rejected and counted."""
+    queue = _queue(lambda batch: None, max_size=2)
+
+    results = [queue.submit(item) for item in range(3)]
+
+    assert results == [True, True, False]
+    assert queue.get_metrics()["dropped_queue_full"] == 1
+    assert queue.get_metrics()["backlog"] == 2
+
+
+def test_forecast_save_does_not_wait_for_database():
+    """With the queue running, saving a forecast only enqueues it."""
+    from app.services.forecast_service import ForecastService
+    from tests.test_accuracy_service import _forecast
+
+    service = ForecastService()
+    written = threading.Event()
+    service.writer.writer = lambda batch: written.set()
+    service.writer.start()
+
+    try:
+        with patch("app.services.forecast_service.supabase_client.insert_forecast") as mock_insert:
+            assert service._save_forecast(_forecast("A", [1, 2])) is None
+            mock_insert.assert_not_called()
+        assert written.wait(timeout=5)
+    finally:
+        service.writer.stop(timeout=5)
+
+
+def test_accuracy_is_registered_by_the_writer():
+    """Queued forecasts are registered for accuracy in the worker, not the caller."""
+    from app.services.forecast_service import ForecastService
+    from tests.test_accuracy_service import _forecast
+
+    service = ForecastService()
+    callers = []
+
+    with patch("app.services.forecast_service.accuracy_service.register_forecast",
+               side_effect=lambda forecast: callers.append(threading.current_thread())), \
+         patch("app.services.forecast_service.supabase_client.insert_forecasts", return_value=[1]), \
+         patch("app.services.forecast_service.supabase_client.insert_prediction_rows"):
+        service.writer.start()
+        try:
+            service._save_forecast(_forecast("A", [1, 2]))
+        finally:
+            service.writer.stop(timeout=5)
+
+    assert len(callers) == 1
+    assert callers[0] is not threading.current_thread()
+
+
+def test_failed_predictions_insert_is_retried_without_new_headers():
+    """A retry after the predictions insert failed reuses the stored headers."""
+    from app.services.forecast_service import ForecastService
+    from tests.test_accuracy_service import _forecast
+
+    service = ForecastService()
+    queue = _queue(service._persist_forecasts)
+    items = [{"forecast": _forecast(sku_id, [1, 2]), "forecast_id": None} for sku_id in ("A", "B")]
+
+    with patch("app.services.forecast_service.supabase_client.insert_forecasts",
+               return_value=[10, 11]) as mock_headers, \
+         patch("app.services.forecast_service.supabase_client.insert_prediction_rows",
+               side_effect=[Exception("timeout"), None]) as mock_rows:
+        queue._write_with_retry(items)
+
+    mock_headers.assert_called_once()
+    assert mock_rows.call_count == 2
+    assert {row["forecast_id"] for row in mock_rows.call_args.args[0]} == {10, 11}
+    assert queue.get_metrics()["written"] == 2